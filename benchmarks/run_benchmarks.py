@@ -0,0 +1,39 @@
+"""Run the glassgen benchmark suite and store the results for comparison.
+
+Results are written to benchmarks/results/<glassgen version>.json so runs of
+different versions can be compared with ``glassgen bench --compare``.
+
+    python benchmarks/run_benchmarks.py --records 20000
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+from glassgen.benchmark import run_benchmarks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=10000)
+    parser.add_argument("--sink-records", type=int, default=None)
+    parser.add_argument("--columnar", action="store_true")
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    report = run_benchmarks(
+        num_records=args.records,
+        columnar=args.columnar,
+        sink_records=args.sink_records,
+    )
+    output = args.output or (
+        Path(__file__).parent / "results" / f"{report['glassgen_version']}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
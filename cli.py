@@ -36,6 +36,14 @@ def generate_data(config: str):
             config_data = json.load(f)
 
         # Generate data
+        if "streams" in config_data:
+            click.echo(f"Generating {len(config_data['streams'])} streams...")
+            response = generate(config=config_data)
+            click.echo(
+                f"Data generation completed. {response['num_records']} records "
+                "generated."
+            )
+            return
         num_records = config_data.get("generator", {}).get("num_records", 1000)
         click.echo(f"Generating {num_records} records...")
         generate(config=config_data)
@@ -111,5 +119,73 @@ def init_config(type: str, output: Optional[str]):
         raise click.Abort() from e
 
 
+@cli.command()
+@click.option(
+    "--records",
+    "-n",
+    type=int,
+    default=10000,
+    show_default=True,
+    help="Records per generator and schema benchmark",
+)
+@click.option(
+    "--sink-records",
+    type=int,
+    help="Records per sink benchmark (defaults to --records)",
+)
+@click.option(
+    "--suite",
+    "-s",
+    "suites",
+    type=click.Choice(["generators", "schemas", "sinks"]),
+    multiple=True,
+    help="Suite to run (repeatable, defaults to all)",
+)
+@click.option(
+    "--columnar", is_flag=True, help="Generate columns instead of single records"
+)
+@click.option("--output", "-o", type=click.Path(), help="Write JSON results here")
+@click.option(
+    "--compare",
+    type=click.Path(exists=True),
+    help="Previous JSON results to compare records/sec against",
+)
+def bench(
+    records: int,
+    sink_records: Optional[int],
+    suites: tuple,
+    columnar: bool,
+    output: Optional[str],
+    compare: Optional[str],
+):
+    """Benchmark generators, schemas and sinks"""
+    from glassgen.benchmark import compare_results, run_benchmarks
+
+    report = run_benchmarks(
+        num_records=records,
+        suites=list(suites) or None,
+        columnar=columnar,
+        sink_records=sink_records,
+    )
+    for result in report["results"]:
+        click.echo(
+            f"{result['suite']:<11} {result['name']:<16} "
+            f"{result['records_per_sec']:>14,.1f} records/s "
+            f"{result['bytes_per_sec'] / 1e6:>10,.2f} MB/s"
+        )
+    if compare:
+        with open(compare, "r") as f:
+            baseline = json.load(f)
+        click.echo("\nChange in records/s against baseline:")
+        for row in compare_results(report, baseline):
+            click.echo(
+                f"{row['suite']:<11} {row['name']:<16} {row['change'] * 100:>+8.1f}%"
+            )
+    if output:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+        click.echo(f"Results written to {output}")
+
+
 if __name__ == "__main__":
     cli()
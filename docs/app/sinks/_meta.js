@@ -1,6 +1,7 @@
 export default {
   index: { title: 'Overview' },
   csv: { title: 'CSV Sink' },
+  binary: { title: 'Parquet, Arrow and Avro Sinks' },
   kafka: { title: 'Kafka Sink' },
   webhook: { title: 'Webhook Sink' },
   yield: { title: 'Yield Sink' },
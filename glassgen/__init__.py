@@ -1,5 +1,12 @@
 from .generator import Generator, GeneratorRegistry
-from .interface import generate, generate_one
+from .interface import (
+    AsyncGeneration,
+    agenerate,
+    agenerate_streams,
+    generate,
+    generate_one,
+    generate_streams,
+)
 from .schema import BaseSchema, ConfigSchema, SchemaField, UserSchema
 from .sinks import BaseSink, SinkFactory
 
@@ -14,6 +21,10 @@ __all__ = [
     "SinkFactory",
     "BaseSink",
     "generate",
+    "agenerate",
+    "AsyncGeneration",
+    "generate_streams",
+    "agenerate_streams",
     "generate_one",
     "GeneratorRegistry",
 ]
@@ -0,0 +1,334 @@
+"""Throughput benchmarks for generators, schemas and sinks.
+
+Each benchmark reports records/sec and bytes/sec, where bytes are the size of
+the records encoded as JSON (or the bytes written, for sinks). Results are
+plain dicts so they can be stored as JSON and compared across versions.
+"""
+
+import json
+import platform
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from glassgen.generator.generators import GeneratorType, registry
+from glassgen.schema import ConfigSchema
+from glassgen.schema.base import columns_to_records
+from glassgen.sinks import KafkaSink, SinkFactory
+
+# Generator expressions used to benchmark generators that need parameters;
+# generators keyed by entity are benchmarked with an entity field next to them
+GENERATOR_SAMPLES: Dict[str, Any] = {
+    GeneratorType.INTRANGE: "$intrange(1,1000)",
+    GeneratorType.CHOICE: "$choice(red,green,blue)",
+    GeneratorType.DATETIME: "$datetime(%Y-%m-%d %H:%M:%S)",
+    GeneratorType.PRICE: "$price(1.0, 100.0)",
+    GeneratorType.PREFIXED_ID: "$prefixed_id(item, 1, 1000)",
+    GeneratorType.ARRAY: "$array(int, 5)",
+    GeneratorType.POOL: "$pool(name, 1000)",
+    GeneratorType.TEMPLATE: "$template(/items/{intrange(1,100)}?q={string})",
+    GeneratorType.REF: "$ref(benchmark.id)",
+    GeneratorType.RANDOM_WALK: {
+        "entity": "$intrange(1,10000)",
+        "value": "$random_walk(entity, 20, 0.5)",
+    },
+    GeneratorType.MARKOV: {
+        "entity": "$intrange(1,10000)",
+        "value": "$markov(entity, home>product|search, search>product, product>home)",
+    },
+    GeneratorType.COUNTER: {
+        "entity": "$intrange(1,10000)",
+        "value": "$counter(entity)",
+    },
+}
+
+# Representative schemas
+SCHEMAS: Dict[str, Dict[str, Any]] = {
+    "flat": {
+        "id": "$uuid",
+        "name": "$name",
+        "email": "$email",
+        "age": "$intrange(18,65)",
+        "country": "$country",
+        "active": "$boolean",
+        "balance": "$price",
+        "created_at": "$timestamp",
+    },
+    "nested": {
+        "id": "$uuid",
+        "user": {
+            "name": "$name",
+            "email": "$email",
+            "address": {"city": "$city", "zipcode": "$zipcode"},
+        },
+        "order": {"amount": "$price", "currency": "$currency_name"},
+        "created_at": "$timestamp",
+    },
+    "array_heavy": {
+        "id": "$uuid",
+        "tags": "$array(string, 5)",
+        "scores": "$array(intrange, 10, 0, 100)",
+        "emails": "$array(email, 3)",
+    },
+}
+
+SINKS = ["csv", "ndjson", "kafka", "webhook"]
+
+
+def _result(
+    suite: str, name: str, num_records: int, num_bytes: int, seconds: float
+) -> Dict[str, Any]:
+    seconds = max(seconds, 1e-9)
+    return {
+        "suite": suite,
+        "name": name,
+        "records": num_records,
+        "bytes": num_bytes,
+        "seconds": round(seconds, 6),
+        "records_per_sec": round(num_records / seconds, 1),
+        "bytes_per_sec": round(num_bytes / seconds, 1),
+    }
+
+
+def _json_size(records: List[Dict[str, Any]]) -> int:
+    return sum(len(json.dumps(record, default=str)) + 1 for record in records)
+
+
+def _time_schema(
+    schema_dict: Dict[str, Any], num_records: int, columnar: bool
+) -> Dict[str, Any]:
+    schema = ConfigSchema.from_dict(schema_dict)
+    schema.validate()
+    start = time.perf_counter()
+    if columnar:
+        columns = schema._generate_columns(num_records)
+        seconds = time.perf_counter() - start
+        records = columns_to_records(columns)
+    else:
+        records = [schema._generate_record() for _ in range(num_records)]
+        seconds = time.perf_counter() - start
+    return {"seconds": seconds, "bytes": _json_size(records)}
+
+
+def bench_generators(num_records: int, columnar: bool = False) -> List[Dict]:
+    """Benchmark every built-in generator on its own"""
+    results = []
+    # Keys for $ref to draw from, as recorded from a parent stream
+    key_store = registry.create_key_store("benchmark.id", 100_000)
+    key_store.extend(list(range(100_000)))
+    try:
+        for generator_type in GeneratorType:
+            sample = GENERATOR_SAMPLES.get(generator_type, f"${generator_type.value}")
+            schema_dict = sample if isinstance(sample, dict) else {"value": sample}
+            timing = _time_schema(schema_dict, num_records, columnar)
+            results.append(
+                _result(
+                    "generators",
+                    generator_type.value,
+                    num_records,
+                    timing["bytes"],
+                    timing["seconds"],
+                )
+            )
+    finally:
+        registry.drop_key_store("benchmark.id")
+    return results
+
+
+def bench_schemas(num_records: int, columnar: bool = False) -> List[Dict]:
+    """Benchmark the representative flat, nested and array-heavy schemas"""
+    results = []
+    for name, schema_dict in SCHEMAS.items():
+        timing = _time_schema(schema_dict, num_records, columnar)
+        results.append(
+            _result("schemas", name, num_records, timing["bytes"], timing["seconds"])
+        )
+    return results
+
+
+class _StandInProducer:
+    """Local stand-in for a Kafka producer that only counts payload bytes"""
+
+    def __init__(self):
+        self.bytes = 0
+
+    def produce(self, topic, value=None, callback=None, **kwargs):
+        self.bytes += len(value)
+
+    def poll(self, timeout=None):
+        return 0
+
+    def flush(self, timeout=None):
+        return 0
+
+
+class _StandInWebhook:
+    """Local HTTP server that accepts every POST, counting request bytes"""
+
+    def __init__(self):
+        stand_in = self
+        self.bytes = 0
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                stand_in.bytes += len(self.rfile.read(length))
+                self.send_response(200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def bench_sink(
+    sink_type: str,
+    num_records: int,
+    batch_size: int = 5000,
+    schema_dict: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Benchmark publishing pre-generated records to one sink.
+
+    File sinks write to a temporary directory; Kafka and webhook sinks publish
+    to local stand-ins, so the numbers measure glassgen's own overhead.
+    """
+    schema = ConfigSchema.from_dict(schema_dict or SCHEMAS["nested"])
+    schema.validate()
+    records = [schema._generate_record() for _ in range(num_records)]
+    batches = [records[i : i + batch_size] for i in range(0, len(records), batch_size)]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        stand_in = None
+        byte_count: Callable[[], int]
+        if sink_type in ("csv", "ndjson"):
+            path = Path(tmp_dir) / f"bench.{sink_type}"
+            sink = SinkFactory.create(sink_type, {"path": str(path)})
+            byte_count = lambda: path.stat().st_size  # noqa: E731
+        elif sink_type == "kafka":
+            # No real producer is created, so nothing connects to a broker
+            stand_in = _StandInProducer()
+            sink = KafkaSink(
+                {"bootstrap.servers": "localhost:9092", "topic": "bench"},
+                producer=stand_in,
+            )
+            byte_count = lambda: stand_in.bytes  # noqa: E731
+        elif sink_type == "webhook":
+            stand_in = _StandInWebhook()
+            sink = SinkFactory.create("webhook", {"url": stand_in.url})
+            byte_count = lambda: stand_in.bytes  # noqa: E731
+        else:
+            raise ValueError(f"Unknown sink type for benchmark: {sink_type}")
+
+        try:
+            start = time.perf_counter()
+            for batch in batches:
+                sink.publish_bulk(batch)
+            sink.close()
+            seconds = time.perf_counter() - start
+            num_bytes = byte_count()
+        finally:
+            if isinstance(stand_in, _StandInWebhook):
+                stand_in.close()
+    return _result("sinks", sink_type, num_records, num_bytes, seconds)
+
+
+def bench_sinks(num_records: int, sinks: Optional[List[str]] = None) -> List[Dict]:
+    """Benchmark each sink with the nested schema"""
+    return [bench_sink(sink_type, num_records) for sink_type in sinks or SINKS]
+
+
+@contextmanager
+def _seeded_registry(seed: int) -> Iterator[None]:
+    """Seed the generator registry for a run, restoring the caller's random
+    state afterwards"""
+    faker_random = registry._faker.random
+    states = (
+        faker_random.getstate(),
+        registry.random.getstate(),
+        registry._uuid7_random.getstate(),
+        registry._rng.bit_generator.state if registry._rng is not None else None,
+    )
+    registry.seed(seed)
+    try:
+        yield
+    finally:
+        faker_state, random_state, uuid7_state, numpy_state = states
+        registry._faker.random = faker_random
+        faker_random.setstate(faker_state)
+        registry.random.setstate(random_state)
+        registry._uuid7_random.setstate(uuid7_state)
+        if numpy_state is not None:
+            registry._rng.bit_generator.state = numpy_state
+        # Pools filled during the run are refilled from the restored state
+        for pool in registry._pools.values():
+            pool.reset()
+
+
+def run_benchmarks(
+    num_records: int = 10000,
+    suites: Optional[List[str]] = None,
+    columnar: bool = False,
+    sink_records: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Run the selected benchmark suites and return machine-readable results"""
+    from glassgen import __version__
+
+    suites = suites or ["generators", "schemas", "sinks"]
+    results = []
+    with _seeded_registry(0):
+        if "generators" in suites:
+            results.extend(bench_generators(num_records, columnar=columnar))
+        if "schemas" in suites:
+            results.extend(bench_schemas(num_records, columnar=columnar))
+        if "sinks" in suites:
+            results.extend(bench_sinks(sink_records or num_records))
+    return {
+        "glassgen_version": __version__,
+        "python_version": platform.python_version(),
+        "platform": platform.platform(),
+        "num_records": num_records,
+        "columnar": columnar,
+        "results": results,
+    }
+
+
+def compare_results(
+    current: Dict[str, Any], baseline: Dict[str, Any]
+) -> List[Dict[str, Any]]:
+    """Compare records/sec of two benchmark runs, matching results by suite/name"""
+    baseline_rates = {
+        (r["suite"], r["name"]): r["records_per_sec"] for r in baseline["results"]
+    }
+    comparison = []
+    for result in current["results"]:
+        key = (result["suite"], result["name"])
+        if key not in baseline_rates:
+            continue
+        before = baseline_rates[key]
+        comparison.append(
+            {
+                "suite": result["suite"],
+                "name": result["name"],
+                "baseline_records_per_sec": before,
+                "records_per_sec": result["records_per_sec"],
+                "change": round(result["records_per_sec"] / max(before, 1e-9) - 1, 4),
+            }
+        )
+    return comparison
@@ -1,4 +1,5 @@
-from typing import Any, ClassVar, Dict, List, Literal, Optional
+import re
+from typing import Any, ClassVar, Dict, List, Literal, Optional, Tuple
 
 from pydantic import BaseModel, Field, ValidationError, model_validator
 
@@ -13,8 +14,9 @@ class ConfigError(Exception):
 
 def validate_config(config_data: Dict[str, Any]):
     """Validate configuration with graceful error handling"""
+    model = MultiStreamConfig if "streams" in config_data else GlassGenConfig
     try:
-        return GlassGenConfig.model_validate(config_data, context={"parent": None})
+        return model.model_validate(config_data, context={"parent": None})
     except ValidationError as e:
         errors = []
         for error in e.errors():
@@ -28,16 +30,22 @@ def validate_config(config_data: Dict[str, Any]):
 
 
 class SinkConfig(BaseModel):
-    type: Literal["csv", "kafka", "webhook", "yield"]
+    type: Literal[
+        "csv", "ndjson", "kafka", "webhook", "yield", "parquet", "arrow", "avro"
+    ]
     params: Optional[Dict[str, Any]] = None
     model_config = {"extra": "forbid"}
 
     # Required params for each sink type
     _SINK_REQUIRED_PARAMS: ClassVar[Dict[str, List[str]]] = {
         "csv": ["path"],
+        "ndjson": ["path"],
         "kafka": ["bootstrap.servers", "topic"],
         "webhook": ["url"],
         "yield": [],
+        "parquet": ["path"],
+        "arrow": ["path"],
+        "avro": ["path"],
     }
 
     @model_validator(mode="after")
@@ -58,6 +66,9 @@ class DuplicationConfig(BaseModel):
     ratio: float = Field(ge=0, le=1)
     key_field: str
     time_window: str = Field(default="1h")
+    max_size: int = Field(default=1000, ge=1)
+    # "record" repeats whole records, "key" only repeats the key_field value
+    mode: Literal["record", "key"] = Field(default="record")
     model_config = {"extra": "forbid"}
 
 
@@ -66,13 +77,104 @@ class EventOptions(BaseModel):
     model_config = {"extra": "forbid"}
 
 
+# Rate profile types that can start over once they reach their end
+_LOOPING_TYPES = ("ramp", "step", "replay")
+
+
+class RateProfileConfig(BaseModel):
+    """A target rate that varies over the run, in records per second"""
+
+    type: Literal["constant", "ramp", "step", "sine", "spike", "poisson", "replay"]
+    # constant, poisson, and the baseline of sine and spike
+    rps: Optional[float] = Field(default=None, ge=0)
+    # ramp
+    start_rps: Optional[float] = Field(default=None, ge=0)
+    end_rps: Optional[float] = Field(default=None, ge=0)
+    duration: Optional[float] = Field(default=None, gt=0)
+    # step: (seconds, rps) points, each rate held until the next point
+    steps: Optional[List[Tuple[float, float]]] = None
+    # sine
+    amplitude: Optional[float] = Field(default=None, ge=0)
+    period: Optional[float] = Field(default=None, gt=0)
+    phase: float = Field(default=0.0)
+    # spike
+    spike_rps: Optional[float] = Field(default=None, ge=0)
+    spike_every: Optional[float] = Field(default=None, gt=0)
+    spike_duration: Optional[float] = Field(default=None, gt=0)
+    # replay: a CSV file of (seconds, rps) points
+    path: Optional[str] = None
+    interpolate: bool = Field(default=True)
+    # ramp, step and replay start over once they reach their end
+    loop: bool = Field(default=False)
+    arrivals: Literal["uniform", "poisson"] = Field(default="uniform")
+    scale: float = Field(default=1.0, gt=0)
+    model_config = {"extra": "forbid"}
+
+    # Required fields for each profile type
+    _PROFILE_REQUIRED_FIELDS: ClassVar[Dict[str, List[str]]] = {
+        "constant": ["rps"],
+        "ramp": ["start_rps", "end_rps", "duration"],
+        "step": ["steps"],
+        "sine": ["rps", "amplitude", "period"],
+        "spike": ["rps", "spike_rps", "spike_every", "spike_duration"],
+        "poisson": ["rps"],
+        "replay": ["path"],
+    }
+
+    @model_validator(mode="after")
+    def validate_profile_fields(self) -> "RateProfileConfig":
+        required_fields = self._PROFILE_REQUIRED_FIELDS[self.type]
+        missing_fields = [f for f in required_fields if getattr(self, f) is None]
+        if missing_fields:
+            raise ValueError(
+                f"'{self.type}' rate profile requires the following fields: "
+                f"{missing_fields}"
+            )
+        if self.steps is not None:
+            if not self.steps:
+                raise ValueError("'steps' must contain at least one point")
+            if any(t < 0 or rps < 0 for t, rps in self.steps):
+                raise ValueError("'steps' times and rates must not be negative")
+        # Imported here: the profiles are built from this config
+        from glassgen.generator.rate_profile import build_rate_profile
+
+        try:
+            profile = build_rate_profile(self)
+        except OSError as e:
+            raise ValueError(f"Cannot read the rate profile file: {e}") from e
+        if profile.end is not None and profile.rate_at(profile.end) <= 0:
+            # A profile that settles at 0 rps would never finish
+            hint = ", set 'loop' to repeat it" if self.type in _LOOPING_TYPES else ""
+            raise ValueError(f"The rate profile ends at 0 rps{hint}")
+        return self
+
+
 class GeneratorConfig(BaseModel):
     rps: int = Field(default=0, ge=0)
+    rate_profile: Optional[RateProfileConfig] = None
     num_records: int = Field(default=100, ge=-1)
     bulk_size: int = Field(default=5000, ge=0)
     event_options: EventOptions = Field(default=EventOptions())
+    seed: Optional[int] = Field(default=None, ge=0)
+    workers: int = Field(default=1, ge=1)
+    prefetch_batches: int = Field(default=0, ge=0)
+    sharded_output: bool = Field(default=False)
+    # Most entities kept in state per entity field (see $random_walk etc.)
+    max_entities: int = Field(default=1_000_000, gt=0)
     model_config = {"extra": "forbid"}
 
+    @model_validator(mode="after")
+    def validate_rate(self) -> "GeneratorConfig":
+        if self.rps and self.rate_profile is not None:
+            raise ValueError("Set either 'rps' or 'rate_profile', not both")
+        return self
+
+    @model_validator(mode="after")
+    def validate_workers(self) -> "GeneratorConfig":
+        if self.sharded_output and self.workers == 1:
+            raise ValueError("sharded_output requires 'workers' greater than 1")
+        return self
+
 
 class GlassGenConfig(BaseModel):
     schema_config: Optional[Dict[str, Any]] = Field(alias="schema", default=None)
@@ -127,3 +229,119 @@ class GlassGenConfig(BaseModel):
             else:
                 paths.append(current_path)
         return paths
+
+
+# "$ref(stream.field)" or "$ref(stream.field, distribution)"
+_REF_PATTERN = re.compile(r"\$ref\(\s*([^,)\s]+)")
+
+
+class StreamConfig(GlassGenConfig):
+    """One stream of a multi-stream run: a named schema, sink and rate"""
+
+    name: str
+    generator: GeneratorConfig = Field(default_factory=GeneratorConfig)
+
+    @model_validator(mode="after")
+    def validate_stream(self) -> "StreamConfig":
+        if self.schema_config is None or self.sink is None:
+            raise ValueError(f"Stream '{self.name}' requires a schema and a sink")
+        if self.sink.type == "yield":
+            raise ValueError(
+                f"Stream '{self.name}': the yield sink is not supported in "
+                "multi-stream runs"
+            )
+        if self.generator.seed is not None:
+            raise ValueError(
+                f"Stream '{self.name}': streams share one generator registry, "
+                "set 'seed' on the multi-stream config instead"
+            )
+        return self
+
+    def references(self) -> Dict[str, str]:
+        """Map the path of every $ref field to the "stream.field" it references"""
+        refs = {}
+
+        def collect(schema: Dict[str, Any], prefix: str = "") -> None:
+            for key, value in schema.items():
+                path = f"{prefix}.{key}" if prefix else key
+                if isinstance(value, dict):
+                    collect(value, path)
+                elif isinstance(value, str):
+                    match = _REF_PATTERN.match(value)
+                    if match:
+                        refs[path] = match.group(1)
+
+        collect(self.schema_config or {})
+        return refs
+
+    def _resolve_field(self, field_path: str) -> Any:
+        """The schema value at a dotted field path, or None"""
+        value: Any = self.schema_config or {}
+        for part in field_path.split("."):
+            if not isinstance(value, dict):
+                return None
+            value = value.get(part)
+        return value
+
+    def referenced_fields(self, streams: List["StreamConfig"]) -> List[str]:
+        """Paths of this stream's fields referenced by any of ``streams``"""
+        prefix = f"{self.name}."
+        return sorted(
+            {
+                ref[len(prefix) :]
+                for stream in streams
+                for ref in stream.references().values()
+                if ref.startswith(prefix)
+            }
+        )
+
+
+class MultiStreamConfig(BaseModel):
+    streams: List[StreamConfig] = Field(min_length=1)
+    seed: Optional[int] = Field(default=None, ge=0)
+    # Most recent keys kept per field referenced with $ref
+    key_store_size: int = Field(default=1_000_000, gt=0)
+    model_config = {"extra": "forbid"}
+
+    @model_validator(mode="after")
+    def validate_stream_names(self) -> "MultiStreamConfig":
+        names = [stream.name for stream in self.streams]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise ValueError(f"Stream names must be unique: {duplicates}")
+        return self
+
+    @model_validator(mode="after")
+    def validate_references(self) -> "MultiStreamConfig":
+        streams = {stream.name: stream for stream in self.streams}
+        parents: Dict[str, set] = {}
+        for stream in self.streams:
+            parents[stream.name] = set()
+            for field, ref in stream.references().items():
+                parent_name, _, parent_field = ref.partition(".")
+                parent = streams.get(parent_name)
+                if parent is None or not parent_field:
+                    raise ValueError(
+                        f"Stream '{stream.name}': field '{field}' references "
+                        f"'{ref}', expected 'stream.field' with one of the "
+                        f"streams {sorted(streams)}"
+                    )
+                parent_value = parent._resolve_field(parent_field)
+                if not isinstance(parent_value, str):
+                    raise ValueError(
+                        f"Stream '{stream.name}': field '{field}' references "
+                        f"'{ref}', which is not a field of stream '{parent_name}'"
+                    )
+                parents[stream.name].add(parent_name)
+
+        # A stream waits for the keys of its parents, so references can't loop
+        def visit(name: str, path: List[str]) -> None:
+            if name in path:
+                cycle = " -> ".join(path[path.index(name) :] + [name])
+                raise ValueError(f"Stream references form a cycle: {cycle}")
+            for parent_name in parents[name]:
+                visit(parent_name, path + [name])
+
+        for name in parents:
+            visit(name, [])
+        return self
@@ -1,11 +1,13 @@
-from glassgen.generator.batch_controller import DynamicBatchController
 from glassgen.generator.duplication import DuplicateController
 from glassgen.generator.generator import Generator
 from glassgen.generator.generators import GeneratorRegistry
+from glassgen.generator.parallel import ParallelGenerator
+from glassgen.generator.rate_limiter import RateLimiter
 
 __all__ = [
     "Generator",
-    "DynamicBatchController",
     "DuplicateController",
     "GeneratorRegistry",
+    "ParallelGenerator",
+    "RateLimiter",
 ]
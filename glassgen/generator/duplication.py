@@ -1,22 +1,102 @@
-import copy
 import random
-from collections import deque
-from datetime import datetime, timedelta
-from typing import Any, Dict, Tuple
+import time
+from datetime import timedelta
+from typing import Any, Callable, Dict, Generic, List, Optional, TypeVar
+
+from glassgen.generator.generators import derive_seed
+
+T = TypeVar("T")
+
+
+class RingBuffer(Generic[T]):
+    """Fixed-capacity FIFO with O(1) append, popleft and random access.
+
+    Like a ``deque`` with ``maxlen``, appending to a full buffer drops the
+    oldest item, but items can also be read by position in constant time.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError(f"Capacity must be positive: {capacity}")
+        self.capacity = capacity
+        self.items: List[Optional[T]] = [None] * capacity
+        self.start = 0
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, index: int) -> T:
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError("ring buffer index out of range")
+        return self.items[(self.start + index) % self.capacity]
+
+    def append(self, item: T) -> None:
+        if self.size == self.capacity:
+            self.popleft()
+        self.items[(self.start + self.size) % self.capacity] = item
+        self.size += 1
+
+    def popleft(self) -> T:
+        if not self.size:
+            raise IndexError("pop from an empty ring buffer")
+        item = self.items[self.start]
+        self.items[self.start] = None
+        self.start = (self.start + 1) % self.capacity
+        self.size -= 1
+        return item
+
+
+def _snapshot(value: Any) -> Any:
+    """Copy the dicts and lists of a record, sharing its immutable leaves"""
+    if isinstance(value, dict):
+        return {k: _snapshot(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_snapshot(v) for v in value]
+    return value
 
 
 class DuplicateController:
-    def __init__(self, generator_config):
+    """Inject duplicates of recent records up to a target ratio.
+
+    Recent records (or, in ``key`` mode, their distinct ``key_field`` values)
+    are kept for ``time_window`` in a ring buffer of at most ``max_size``
+    entries, so storing a record and picking a random one to duplicate both
+    take constant time however large the window is. In ``key`` mode a
+    duplicate is a freshly generated record (from ``record_factory``) that
+    reuses a recent key, and a key stays in the window until ``time_window``
+    after it was last seen.
+    """
+
+    def __init__(
+        self,
+        generator_config,
+        record_factory: Optional[Callable[[], Dict[str, Any]]] = None,
+    ):
         self.generator_config = generator_config
-        self.duplicates: deque[Tuple[datetime, Dict[str, Any]]] = deque()
+        duplication = self.generator_config.event_options.duplication
         self.total_generated = 0
         self.total_duplicates = 0
-        self.time_window = self._parse_time_window(
-            self.generator_config.event_options.duplication.time_window
+        self.time_window = self._parse_time_window(duplication.time_window)
+        self.window_seconds = self.time_window.total_seconds()
+        self.target_ratio = duplication.ratio
+        self.max_size = duplication.max_size
+        self.key_field = duplication.key_field
+        self.mode = duplication.mode
+        if self.mode == "key" and record_factory is None:
+            raise ValueError("Key-only duplication needs a record factory")
+        self.record_factory = record_factory
+        self.duplicates: RingBuffer = RingBuffer(self.max_size)
+        # Time each key held in the buffer was last seen; every distinct key
+        # is stored once, and moved to the back of the buffer when it expires
+        # if it was seen again since it was stored
+        self.keys: Dict[Any, float] = {}
+        seed = self.generator_config.seed
+        self.random = random.Random(
+            derive_seed(seed, "duplication") if seed is not None else None
         )
-        self.target_ratio = self.generator_config.event_options.duplication.ratio
-        self.max_size = 1000  # You can make this configurable too
-        self.key_field = self.generator_config.event_options.duplication.key_field
 
     def _parse_time_window(self, time_window: str) -> timedelta:
         """Convert time_window string to timedelta"""
@@ -51,11 +131,45 @@ class DuplicateController:
         else:
             return None
 
+    def _set_nested_field_value(
+        self, record: Dict[str, Any], field_path: str, value: Any
+    ) -> None:
+        """Set a nested field value in a record using dot notation"""
+        *parents, last = field_path.split(".")
+        for part in parents:
+            record = record.setdefault(part, {})
+            if not isinstance(record, dict):
+                raise ValueError(
+                    f"Cannot set key_field '{field_path}': '{part}' is not an object"
+                )
+        record[last] = value
+
+    def _evict_oldest(self, cutoff_time: Optional[float] = None) -> None:
+        """Drop the oldest entry, keeping keys seen again since it was stored.
+
+        A key seen again goes back to the end of the buffer with the time it
+        was last seen instead, unless that time is before ``cutoff_time``.
+        """
+        while self.duplicates:
+            stored_at, entry = self.duplicates.popleft()
+            if self.mode != "key":
+                return
+            last_seen = self.keys[entry]
+            if last_seen > stored_at and (
+                cutoff_time is None or last_seen >= cutoff_time
+            ):
+                self.duplicates.append((last_seen, entry))
+                if cutoff_time is not None:
+                    return
+                continue
+            del self.keys[entry]
+            return
+
     def _cleanup_old_duplicates(self):
         """Remove duplicates older than time_window"""
-        cutoff_time = datetime.now() - self.time_window
+        cutoff_time = time.monotonic() - self.window_seconds
         while self.duplicates and self.duplicates[0][0] < cutoff_time:
-            self.duplicates.popleft()
+            self._evict_oldest(cutoff_time)
 
     def _get_if_duplication(self):
         current_ratio = self.total_duplicates / max(1, self.total_generated)
@@ -72,17 +186,39 @@ class DuplicateController:
         self._cleanup_old_duplicates()
         if not self.duplicates:
             return None
-        return random.choice([record for _, record in self.duplicates])
+        stored = self.duplicates[self.random.randrange(len(self.duplicates))][1]
+        if self.mode == "key":
+            record = self.record_factory()
+            self._set_nested_field_value(record, self.key_field, stored)
+            return record
+        # Records are copied once, when stored; like the generated records,
+        # duplicates are handed out as-is and must not be changed in place
+        return stored
 
     def add_record(self, record: Dict[str, Any]):
-        """Add a record to the deque with timestamp, enforce max size"""
-        now = datetime.now()
-        self.duplicates.append((now, copy.deepcopy(record)))
+        """Store a record (or its key) with a timestamp, enforce max size"""
         self.total_generated += 1
-
-        # Trim to max size
-        if len(self.duplicates) > self.max_size:
-            self.duplicates.popleft()
+        if self.mode == "key":
+            key = self._get_nested_field_value(record, self.key_field)
+            now = time.monotonic()
+            try:
+                if key is None:
+                    return
+                if key in self.keys:
+                    # Seen again: the key stays in the window from now on
+                    self.keys[key] = now
+                    return
+            except TypeError:
+                # Unhashable values (nested objects) cannot be used as keys
+                return
+            if len(self.duplicates) == self.max_size:
+                self._evict_oldest()
+            self.keys[key] = now
+            self.duplicates.append((now, key))
+            return
+        if len(self.duplicates) == self.max_size:
+            self._evict_oldest()
+        self.duplicates.append((time.monotonic(), _snapshot(record)))
 
     def get_results(self):
         return {
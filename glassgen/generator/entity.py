@@ -0,0 +1,194 @@
+import random
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class EntityIndex:
+    """Maps entity ids to slots of the per-entity state arrays.
+
+    Every stateful field keyed by the same entity field shares one index, and
+    keeps its own state in a typed array indexed by slot. At most ``capacity``
+    entities are held: once full, the entity seen first is evicted and its
+    slot handed to the new entity, whose state starts over.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError("Entity capacity must be greater than 0")
+        self.capacity = capacity
+        self.slots: Dict[Any, int] = {}
+        # Entity held by each slot, to evict it when the slot is reused
+        self.ids: List[Any] = []
+        self.next_evicted = 0
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def slot(self, entity_id: Any) -> Tuple[int, bool]:
+        """The slot of an entity, and whether its state must be (re)initialized"""
+        slot = self.slots.get(entity_id)
+        if slot is not None:
+            return slot, False
+        if len(self.ids) < self.capacity:
+            slot = len(self.ids)
+            self.ids.append(entity_id)
+        else:
+            slot = self.next_evicted
+            del self.slots[self.ids[slot]]
+            self.ids[slot] = entity_id
+            self.next_evicted = (slot + 1) % self.capacity
+        self.slots[entity_id] = slot
+        return slot, True
+
+
+class EntityGenerator(ABC):
+    """Base class of generators that keep one state per entity.
+
+    The state of every entity lives in ``values``, an array indexed by the
+    slot of the entity (see ``EntityIndex``). Calling the generator with a
+    slot advances that entity's state in O(1) and returns the field value.
+    """
+
+    typecode = "d"
+
+    def __init__(self):
+        self.values = array(self.typecode)
+
+    @abstractmethod
+    def _initial(self) -> Any:
+        """State of an entity on its first event"""
+        pass
+
+    @abstractmethod
+    def _next(self, state: Any) -> Any:
+        """State of an entity after ``state`` on its next event"""
+        pass
+
+    def _emit(self, state: Any) -> Any:
+        return state
+
+    def __call__(self, slot: int, is_new: bool) -> Any:
+        values = self.values
+        if slot == len(values):
+            values.append(self._initial())
+        elif is_new:
+            values[slot] = self._initial()
+        else:
+            values[slot] = self._next(values[slot])
+        return self._emit(values[slot])
+
+
+class RandomWalk(EntityGenerator):
+    """Gaussian random walk per entity, e.g. a sensor reading or a balance"""
+
+    def __init__(
+        self,
+        start: Any = 0,
+        step: Any = 1,
+        min_value: Optional[Any] = None,
+        max_value: Optional[Any] = None,
+        *,
+        rng: random.Random,
+    ):
+        super().__init__()
+        self.start = float(start)
+        self.step = float(step)
+        self.min_value = float(min_value) if min_value is not None else None
+        self.max_value = float(max_value) if max_value is not None else None
+        self.rng = rng
+
+    def _initial(self) -> float:
+        return self.start
+
+    def _next(self, state: float) -> float:
+        state += self.rng.gauss(0.0, self.step)
+        if self.min_value is not None and state < self.min_value:
+            state = self.min_value
+        if self.max_value is not None and state > self.max_value:
+            state = self.max_value
+        return state
+
+
+class EntityCounter(EntityGenerator):
+    """Monotonic counter per entity, e.g. an event number within a session"""
+
+    typecode = "q"
+
+    def __init__(self, start: Any = 1, step: Any = 1):
+        super().__init__()
+        self.start = int(start)
+        self.step = int(step)
+
+    def _initial(self) -> int:
+        return self.start
+
+    def _next(self, state: int) -> int:
+        return state + self.step
+
+
+class MarkovChain(EntityGenerator):
+    """Markov chain over a set of choice values, one current state per entity.
+
+    Each state is given as ``name`` or ``name>next|other*2``: the listed
+    targets are the states it can move to (with optional ``*weight``, 1 by
+    default), and a state without targets moves to any state with equal
+    weight. Entities start in the first state.
+    """
+
+    # Index of the current state, so up to 65536 states
+    typecode = "H"
+    MAX_STATES = 65536
+
+    def __init__(self, *state_specs: str, rng: random.Random):
+        super().__init__()
+        if not state_specs:
+            raise ValueError("Markov generator requires at least one state")
+        if len(state_specs) > self.MAX_STATES:
+            raise ValueError(
+                f"Markov generator supports at most {self.MAX_STATES} states, "
+                f"got {len(state_specs)}"
+            )
+        self.rng = rng
+        specs = [str(spec).partition(">") for spec in state_specs]
+        self.states = [name.strip() for name, _, _ in specs]
+        if len(set(self.states)) != len(self.states):
+            raise ValueError(f"Markov states must be unique: {self.states}")
+        positions = {name: i for i, name in enumerate(self.states)}
+        # (target state indices, cumulative weights) of every state
+        self.transitions: List[Tuple[List[int], List[float]]] = []
+        for name, _, targets in specs:
+            if not targets.strip():
+                targets_weights = [(i, 1.0) for i in range(len(self.states))]
+            else:
+                targets_weights = []
+                for target in targets.split("|"):
+                    target_name, _, weight = target.partition("*")
+                    target_name = target_name.strip()
+                    if target_name not in positions:
+                        raise ValueError(
+                            f"Markov state '{name.strip()}' moves to unknown "
+                            f"state '{target_name}'"
+                        )
+                    targets_weights.append(
+                        (positions[target_name], float(weight) if weight else 1.0)
+                    )
+            self.transitions.append(
+                (
+                    [i for i, _ in targets_weights],
+                    list(accumulate(w for _, w in targets_weights)),
+                )
+            )
+
+    def _initial(self) -> int:
+        return 0
+
+    def _next(self, state: int) -> int:
+        targets, cum_weights = self.transitions[state]
+        draw = self.rng.random() * cum_weights[-1]
+        return targets[bisect_right(cum_weights, draw)]
+
+    def _emit(self, state: int) -> str:
+        return self.states[state]
@@ -1,30 +1,78 @@
+import asyncio
+import random
 import time
-from typing import Any, Dict, List
+from concurrent.futures import Executor
+from typing import Any, Dict, List, Optional, Union
 
 from glassgen.config import GeneratorConfig
-from glassgen.generator.batch_controller import DynamicBatchController
 from glassgen.generator.duplication import DuplicateController
-from glassgen.schema import BaseSchema
+from glassgen.generator.generators import derive_seed, registry
+from glassgen.generator.rate_limiter import RateLimiter
+from glassgen.generator.rate_profile import build_rate_profile
+from glassgen.schema import BaseSchema, ConfigSchema
+from glassgen.schema.base import Columns
 
 
 class Generator:
-    def __init__(self, generator_config: GeneratorConfig, schema: BaseSchema):
+    def __init__(
+        self,
+        generator_config: GeneratorConfig,
+        schema: BaseSchema,
+        columnar: bool = False,
+    ):
         self.generator_config = generator_config
         self.schema = schema
-        self.batch_controller = (
-            DynamicBatchController(self.generator_config.rps)
-            if self.generator_config.rps > 0
-            else None
-        )
+        # The registry is shared by every run of the process: seeding here
+        # resets concurrent runs too, so seeded runs are only reproducible
+        # when run alone
+        if self.generator_config.seed is not None:
+            registry.seed(self.generator_config.seed)
+        self.rate_limiter = self._create_rate_limiter()
         self.max_bulk_size = generator_config.bulk_size
+        self._validate_key_field()
         self.duplicate_controller = (
-            DuplicateController(self.generator_config)
+            DuplicateController(self.generator_config, self.schema._generate_record)
             if self.generator_config.event_options.duplication
             and self.generator_config.event_options.duplication.enabled
             else None
         )
+        # Duplication works on individual records, so it disables columnar batches
+        self.columnar = columnar and self.duplicate_controller is None
+        # Final response of the last run
+        self.response: Optional[Dict[str, Any]] = None
+
+    def _validate_key_field(self) -> None:
+        """Check up front that the duplication key_field is a schema field"""
+        duplication = self.generator_config.event_options.duplication
+        if not (
+            duplication
+            and duplication.enabled
+            and duplication.key_field
+            and isinstance(self.schema, ConfigSchema)
+        ):
+            return
+        if self.schema._resolve_field(duplication.key_field) is None:
+            raise ValueError(f"key_field '{duplication.key_field}' not found in schema")
+
+    def _create_rate_limiter(self) -> Optional[RateLimiter]:
+        config = self.generator_config
+        if config.rate_profile is None:
+            return RateLimiter(config.rps) if config.rps > 0 else None
+        profile_config = config.rate_profile
+        seed = config.seed
+        return RateLimiter(
+            build_rate_profile(profile_config),
+            poisson=(
+                profile_config.type == "poisson" or profile_config.arrivals == "poisson"
+            ),
+            rng=random.Random(
+                derive_seed(seed, "rate_profile") if seed is not None else None
+            ),
+        )
 
-    def _generate_batch(self, num_records: int) -> List[Dict[str, Any]]:
+    def _generate_batch(self, num_records: int) -> Union[List[Dict[str, Any]], Columns]:
+        if self.columnar:
+            return self.schema._generate_columns(num_records)
         if not self.duplicate_controller:
             return [self.schema._generate_record() for _ in range(num_records)]
         records = []
@@ -36,74 +84,78 @@ class Generator:
             records.append(record)
         return records
 
-    def generate(self):
-        if self.generator_config.rps > 2500:
-            return self.generate_simple()
-        else:
-            return self.generate_optimized()
+    def _events_to_send(self) -> float:
+        events_to_send = self.generator_config.num_records
+        return float("inf") if events_to_send == -1 else int(events_to_send)
+
+    def _next_batch_size(self, count: int, events_to_send: float) -> int:
+        batch_size = (
+            self.rate_limiter.batch_size(self.max_bulk_size)
+            if self.rate_limiter
+            else self.max_bulk_size
+        )
+        return min(batch_size, events_to_send - count)
 
-    def generate_optimized(self):
+    def _response(self, start_time: float, count: int) -> Dict[str, Any]:
+        response = {
+            "time_taken_ms": round((time.time() - start_time) * 1000),
+            "num_records": count,
+        }
+        if self.rate_limiter:
+            response.update(self.rate_limiter.stats())
+        if self.duplicate_controller:
+            response.update(self.duplicate_controller.get_results())
+        return response
+
+    def generate(self):
         """
-        Generate records and publish them to the sink.
+        Generate records in batches, paced by the rate limiter when rps or a
+        rate profile is set.
         """
-        # print("Glassgen: Generating records with presice rps control")
         start_time = time.time()
         count = 0
-        events_to_send = self.generator_config.num_records
-        if events_to_send == -1:
-            events_to_send = float("inf")
-        else:
-            events_to_send = int(events_to_send)
+        events_to_send = self._events_to_send()
 
         while True:
-            batch_size = (
-                self.batch_controller.get_batch_size(self.max_bulk_size)
-                if self.batch_controller
-                else min(self.max_bulk_size, events_to_send - count)
-            )
-            actual_batch_size = min(batch_size, events_to_send - count)
+            actual_batch_size = self._next_batch_size(count, events_to_send)
             records = self._generate_batch(actual_batch_size)
-            count += len(records)
+            count += actual_batch_size
+            if self.rate_limiter:
+                # Release the batch when it is due, after generating it
+                self.rate_limiter.acquire(actual_batch_size)
 
             yield records
 
-            # print(f"Generated {count} records")
-            # print(f"Actual batch size: {actual_batch_size}")
-            if self.batch_controller:
-                self.batch_controller.record_sent(actual_batch_size)
-
             if count >= events_to_send:
                 break
 
-        response = {
-            "time_taken_ms": round((time.time() - start_time) * 1000),
-            "num_records": count,
-        }
-        if self.duplicate_controller:
-            response.update(self.duplicate_controller.get_results())
-        return response
+        self.response = self._response(start_time, count)
+        return self.response
 
-    def generate_simple(self):
+    async def agenerate(self, executor: Optional[Executor] = None):
+        """
+        Async counterpart of ``generate()``: batches are built in ``executor``
+        (the loop's default executor if None) and paced with ``asyncio.sleep``,
+        so the event loop stays free. Async generators cannot return a value,
+        so the final response is left in ``self.response``.
+        """
+        loop = asyncio.get_running_loop()
         start_time = time.time()
         count = 0
-        events_to_send = self.generator_config.num_records
-        if events_to_send == -1:
-            events_to_send = float("inf")
-        else:
-            events_to_send = int(events_to_send)
+        events_to_send = self._events_to_send()
+
         while True:
-            actual_batch_size = min(self.max_bulk_size, events_to_send - count)
-            records = self._generate_batch(actual_batch_size)
-            count += len(records)
+            actual_batch_size = self._next_batch_size(count, events_to_send)
+            records = await loop.run_in_executor(
+                executor, self._generate_batch, actual_batch_size
+            )
+            count += actual_batch_size
+            if self.rate_limiter:
+                await self.rate_limiter.acquire_async(actual_batch_size)
+
             yield records
 
             if count >= events_to_send:
                 break
 
-        response = {
-            "time_taken_ms": round((time.time() - start_time) * 1000),
-            "num_records": count,
-        }
-        if self.duplicate_controller:
-            response.update(self.duplicate_controller.get_results())
-        return response
+        self.response = self._response(start_time, count)
@@ -1,12 +1,42 @@
+import hashlib
 import random
+import sys
 import time
+from array import array
+from bisect import bisect_right
 from datetime import datetime
 from enum import Enum
-from typing import Any, Callable, Dict, List
+from functools import partial
+from itertools import accumulate
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
 from urllib.parse import quote
 
 from faker import Faker
 
+from glassgen.generator.entity import EntityCounter, MarkovChain, RandomWalk
+
+if TYPE_CHECKING:
+    from glassgen.schema.template import TemplateGenerator
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is an optional dependency
+    np = None
+
+
+# Default random source for generators called outside of a registry
+_random = random.Random()
+
+
+def derive_seed(seed: int, *keys: Any) -> int:
+    """Derive an independent 64-bit seed for a substream of ``seed``.
+
+    The same seed and keys (e.g. a worker or partition index) always give the
+    same substream seed, so parallel runs can be reproduced exactly.
+    """
+    digest = hashlib.blake2b(repr((seed,) + keys).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
 
 class GeneratorType(str, Enum):
     """Supported generator types"""
@@ -44,25 +74,56 @@ class GeneratorType(str, Enum):
     PREFIXED_ID = "prefixed_id"
     ARRAY = "array"
     QUERY_STRING = "query_string"
-
-
-def choice_generator(choices: List[str]) -> str:
+    POOL = "pool"
+    TEMPLATE = "template"
+    SEQUENCE = "sequence"
+    UUID7 = "uuid7"
+    REF = "ref"
+    RANDOM_WALK = "random_walk"
+    MARKOV = "markov"
+    COUNTER = "counter"
+
+
+# Type of the values produced by built-in generators, used by sinks that need
+# a typed schema up front. Array and pool fields take the type of the generator
+# they wrap; everything not listed produces strings.
+GENERATOR_VALUE_TYPES: Dict[str, str] = {
+    **{generator_type: "string" for generator_type in GeneratorType},
+    GeneratorType.INT: "int",
+    GeneratorType.INTRANGE: "int",
+    GeneratorType.TIMESTAMP: "int",
+    GeneratorType.SEQUENCE: "int",
+    GeneratorType.COUNTER: "int",
+    GeneratorType.FLOAT: "float",
+    GeneratorType.RANDOM_WALK: "float",
+    GeneratorType.PRICE: "float",
+    GeneratorType.BOOLEAN: "bool",
+}
+
+
+def choice_generator(choices: List[str], *, rng: random.Random = _random) -> str:
     """Generate a random choice from a list of strings"""
-    return random.choice(choices)
+    return rng.choice(choices)
 
 
-def intrange_generator(min_val: int, max_val: int) -> int:
+def intrange_generator(
+    min_val: int, max_val: int, *, rng: random.Random = _random
+) -> int:
     """Generate a random integer between min_val and max_val"""
-    return random.randint(min_val, max_val)
+    return rng.randint(min_val, max_val)
 
 
-def greeting_generator() -> str:
+def greeting_generator(*, rng: random.Random = _random) -> str:
     """Generate a random greeting from a list of strings"""
-    return random.choice(["Hello", "Hi", "Hey", "Greetings", "Welcome"])
+    return rng.choice(["Hello", "Hi", "Hey", "Greetings", "Welcome"])
 
 
 def price_generator(
-    min_price: float = 0.99, max_price: float = 9999.99, decimal_places: int = 2
+    min_price: float = 0.99,
+    max_price: float = 9999.99,
+    decimal_places: int = 2,
+    *,
+    rng: random.Random = _random,
 ) -> float:
     """Generate a random price value with specified decimal places
 
@@ -70,11 +131,12 @@ def price_generator(
         min_price: Minimum price value
         max_price: Maximum price value
         decimal_places: Number of decimal places (default: 2)
+        rng: Random source to draw from
 
     Returns:
         A random price value rounded to the specified decimal places
     """
-    return round(random.uniform(min_price, max_price), decimal_places)
+    return round(rng.uniform(min_price, max_price), decimal_places)
 
 
 def datetime_generator(format_str: str = None) -> str:
@@ -86,7 +148,11 @@ def datetime_generator(format_str: str = None) -> str:
 
 
 def prefixed_id_generator(
-    prefix: str = "item", min_val: int = 1, max_val: int = 1000
+    prefix: str = "item",
+    min_val: int = 1,
+    max_val: int = 1000,
+    *,
+    rng: random.Random = _random,
 ) -> str:
     """Generate a prefixed ID with random number in range
 
@@ -94,15 +160,21 @@ def prefixed_id_generator(
         prefix: The prefix for the ID (e.g., 'cat', 'prod')
         min_val: Minimum value for the number part
         max_val: Maximum value for the number part
+        rng: Random source to draw from
 
     Returns:
         A string in format prefix_number (e.g., 'cat_1', 'prod_42')
     """
-    number = random.randint(min_val, max_val)
+    number = rng.randint(min_val, max_val)
     return f"{prefix}_{number}"
 
 
-def array_generator(generator_name: str, count: int, *generator_params) -> List[Any]:
+def array_generator(
+    generator_name: str,
+    count: int,
+    *generator_params,
+    generator_registry: Optional["GeneratorRegistry"] = None,
+) -> List[Any]:
     """Generate an array of values using a specified generator
 
     Args:
@@ -110,6 +182,8 @@ def array_generator(generator_name: str, count: int, *generator_params) -> List[
         (e.g., 'string', 'email')
         count: Number of elements to generate in the array
         *generator_params: Parameters to pass to the underlying generator
+        generator_registry: Registry to look the generator up in (default: the
+        global registry)
 
     Returns:
         A list of generated values
@@ -118,7 +192,7 @@ def array_generator(generator_name: str, count: int, *generator_params) -> List[
         raise ValueError("Array count must be greater than 0")
 
     # Get the generator function from the registry
-    generator_func = registry.get_generator(generator_name)
+    generator_func = (generator_registry or registry).get_generator(generator_name)
 
     # Generate the array
     result = []
@@ -135,74 +209,536 @@ def array_generator(generator_name: str, count: int, *generator_params) -> List[
     return result
 
 
-def query_string_generator() -> str:
+# GA4-style event query string, expressed as a template (see template_generator)
+QUERY_STRING_TEMPLATE = "&".join(
+    [
+        "v=2",
+        "cid={intrange(100000000,999999999)}.{intrange(1000000000000,9999999999999)}",
+        "sid={intrange(1000000000,9999999999)}",
+        "sct={intrange(1,10)}",
+        "seg={choice(0,1)}",
+        "_et={intrange(0,30000)}",
+        "en={choice(page_view,scroll,click,purchase,add_to_cart)}",
+        "ep.event_id={intrange(1000000000000,9999999999999)}.{intrange(1,9)}",
+        "dt={choice(%s)}"
+        % ",".join(
+            quote(title)
+            for title in [
+                "Home Page",
+                "Product Page",
+                "Checkout",
+                "About Us",
+                "Test Page Title",
+            ]
+        ),
+        "ul={choice(en-us,de-de,fr-fr,es-es)}",
+        # US state codes
+        "ur={choice(US-CA,US-NY,US-TX,US-FL,US-IL,US-PA,US-OH,US-GA,US-NC,US-MI)}",
+    ]
+)
+
+
+def template_generator(
+    template: str, *, generator_registry: Optional["GeneratorRegistry"] = None
+) -> str:
+    """Render a string template whose {slots} are filled by other generators
+
+    Args:
+        template: Template text, e.g. 'user={name}&page={intrange(1,10)}'
+        generator_registry: Registry that compiles and caches the template
+        (default: the global registry)
+
+    Returns:
+        The rendered string
+    """
+    return (generator_registry or registry).get_template(template)()
+
+
+def template_batch_generator(
+    num_records: int,
+    template: str,
+    *,
+    generator_registry: Optional["GeneratorRegistry"] = None,
+) -> List[str]:
+    """Render a string template for a whole column"""
+    return (generator_registry or registry).get_template(template).batch(num_records)
+
+
+def query_string_generator(
+    *, generator_registry: Optional["GeneratorRegistry"] = None
+) -> str:
     """
     Generate a query string in the format:
     v=2&cid=...&sid=...&sct=...&seg=...&_et=...&en=...&ep.event_id=...&dt=...&ul=...&ur=...
 
+    Args:
+        generator_registry: Registry that renders the query string template
+        (default: the global registry)
+
     Returns:
         A query string with dynamically generated values
     """
-    # Generate random values
-    cid_part1 = random.randint(100000000, 999999999)
-    cid_part2 = random.randint(1000000000000, 9999999999999)
-    cid = f"{cid_part1}.{cid_part2}"
-
-    sid = random.randint(1000000000, 9999999999)
-    sct = random.randint(1, 10)
-    seg = random.choice([0, 1])
-    _et = random.randint(0, 30000)
-
-    en_choices = ["page_view", "scroll", "click", "purchase", "add_to_cart"]
-    en = random.choice(en_choices)
-
-    event_id_part1 = random.randint(1000000000000, 9999999999999)
-    event_id_part2 = random.randint(1, 9)
-    ep_event_id = f"{event_id_part1}.{event_id_part2}"
-
-    page_titles = [
-        "Home Page",
-        "Product Page",
-        "Checkout",
-        "About Us",
-        "Test Page Title",
-    ]
-    dt = quote(random.choice(page_titles))
-
-    ul_choices = ["en-us", "de-de", "fr-fr", "es-es"]
-    ul = random.choice(ul_choices)
-
-    # US state codes
-    us_states = [
-        "US-CA",
-        "US-NY",
-        "US-TX",
-        "US-FL",
-        "US-IL",
-        "US-PA",
-        "US-OH",
-        "US-GA",
-        "US-NC",
-        "US-MI",
+    return template_generator(
+        QUERY_STRING_TEMPLATE, generator_registry=generator_registry
+    )
+
+
+def intrange_batch_generator(
+    rng: "np.random.Generator", num_records: int, min_val: int, max_val: int
+) -> List[int]:
+    """Generate a column of random integers between min_val and max_val"""
+    return rng.integers(min_val, max_val, size=num_records, endpoint=True).tolist()
+
+
+def int_batch_generator(
+    rng: "np.random.Generator",
+    num_records: int,
+    min: int = 0,
+    max: int = 9999,
+    step: int = 1,
+) -> List[int]:
+    """Generate a column of random integers like Faker.random_int"""
+    steps = rng.integers(0, (max - min) // step, size=num_records, endpoint=True)
+    return (steps * step + min).tolist()
+
+
+def price_batch_generator(
+    rng: "np.random.Generator",
+    num_records: int,
+    min_price: float = 0.99,
+    max_price: float = 9999.99,
+    decimal_places: int = 2,
+) -> List[float]:
+    """Generate a column of random prices with specified decimal places"""
+    values = rng.uniform(min_price, max_price, size=num_records)
+    return np.round(values, decimal_places).tolist()
+
+
+def boolean_batch_generator(
+    rng: "np.random.Generator", num_records: int, chance_of_getting_true: int = 50
+) -> List[bool]:
+    """Generate a column of random booleans like Faker.boolean"""
+    return (rng.random(num_records) * 100 < chance_of_getting_true).tolist()
+
+
+def float_batch_generator(
+    rng: "np.random.Generator",
+    num_records: int,
+    left_digits: Optional[int] = None,
+    right_digits: Optional[int] = None,
+    positive: Optional[bool] = None,
+    min_value: Optional[float] = None,
+    max_value: Optional[float] = None,
+) -> List[float]:
+    """Generate a column of random floats shaped like Faker.pyfloat
+
+    Digit counts follow Faker's defaults (a random number of fractional digits
+    and up to ``sys.float_info.dig`` digits in total), but every value is drawn
+    from NumPy in a single pass.
+    """
+    max_digits = sys.float_info.dig
+    if right_digits is None:
+        right = rng.integers(
+            1, max_digits - (left_digits or 1), size=num_records, endpoint=True
+        )
+    else:
+        right = np.full(num_records, right_digits)
+    if left_digits is None:
+        left = np.maximum(1, max_digits - right)
+    else:
+        left = np.full(num_records, left_digits)
+
+    if min_value is not None or max_value is not None:
+        low = min_value if min_value is not None else -(10.0**left)
+        high = max_value if max_value is not None else 10.0**left
+        if positive and min_value is None:
+            low = 0.0
+        values = rng.uniform(low, high, size=num_records)
+    else:
+        values = np.floor(rng.random(num_records) * 10.0**left)
+        values += rng.random(num_records)
+        if positive is None:
+            values *= rng.choice(np.array([-1.0, 1.0]), size=num_records)
+        elif positive is False:
+            values = -values
+    scale = 10.0**right
+    return (np.round(values * scale) / scale).tolist()
+
+
+def timestamp_batch_generator(
+    rng: "np.random.Generator", num_records: int
+) -> List[int]:
+    """Generate a column of current unix timestamps"""
+    return [int(time.time())] * num_records
+
+
+def _format_uuids(raw: bytearray, version: int) -> List[str]:
+    """Stamp version/variant bits into 16-byte UUIDs and format them as strings"""
+    raw[6::16] = bytes((b & 0x0F) | (version << 4) for b in raw[6::16])
+    raw[8::16] = bytes((b & 0x3F) | 0x80 for b in raw[8::16])
+    hex_str = raw.hex()
+    return [
+        f"{hex_str[i : i + 8]}-{hex_str[i + 8 : i + 12]}-{hex_str[i + 12 : i + 16]}-"
+        f"{hex_str[i + 16 : i + 20]}-{hex_str[i + 20 : i + 32]}"
+        for i in range(0, len(hex_str), 32)
     ]
-    ur = random.choice(us_states)
 
-    # Build query string
-    query_parts = [
-        "v=2",
-        f"cid={cid}",
-        f"sid={sid}",
-        f"sct={sct}",
-        f"seg={seg}",
-        f"_et={_et}",
-        f"en={en}",
-        f"ep.event_id={ep_event_id}",
-        f"dt={dt}",
-        f"ul={ul}",
-        f"ur={ur}",
-    ]
 
-    return "&".join(query_parts)
+def uuid4_batch_generator(rng: random.Random, num_records: int) -> List[str]:
+    """Generate a column of random UUID4 strings from one bulk draw of bytes"""
+    if num_records <= 0:
+        return []
+    raw = bytearray(
+        rng.getrandbits(128 * num_records).to_bytes(16 * num_records, "big")
+    )
+    return _format_uuids(raw, 4)
+
+
+def prefixed_id_batch_generator(
+    rng: "np.random.Generator",
+    num_records: int,
+    prefix: str = "item",
+    min_val: int = 1,
+    max_val: int = 1000,
+) -> List[str]:
+    """Generate a column of prefixed IDs with random numbers in range"""
+    numbers = rng.integers(min_val, max_val, size=num_records, endpoint=True)
+    return [f"{prefix}_{number}" for number in numbers.tolist()]
+
+
+class SequenceGenerator:
+    """Monotonic integer sequence, one instance per schema field.
+
+    In a parallel run every worker takes an interleaved slice of the sequence
+    (worker i of n emits start + (i + k * n) * step), so values stay unique.
+    """
+
+    def __init__(
+        self,
+        start: int = 1,
+        step: int = 1,
+        generator_registry: Optional["GeneratorRegistry"] = None,
+    ):
+        generator_registry = generator_registry or registry
+        self.step = int(step) * generator_registry.partition_count
+        self.next_value = int(start) + generator_registry.partition_index * int(step)
+
+    def __call__(self) -> int:
+        value = self.next_value
+        self.next_value += self.step
+        return value
+
+    def batch(self, num_records: int) -> List[int]:
+        start = self.next_value
+        self.next_value += self.step * num_records
+        return list(range(start, self.next_value, self.step))
+
+
+class UUID7Generator:
+    """Time-ordered UUIDv7 strings.
+
+    The 48-bit millisecond timestamp is followed by a 12-bit counter (RFC 9562,
+    method 1), so IDs generated by one instance are strictly increasing even
+    within the same millisecond.
+    """
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self.last_ms = 0
+        self.counter = 0
+
+    def _next(self) -> Tuple[int, int]:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms > self.last_ms:
+            self.last_ms = now_ms
+            self.counter = self.rng.getrandbits(11)
+        else:
+            self.counter += 1
+            if self.counter > 0xFFF:
+                # Counter overflow: borrow the next millisecond
+                self.last_ms += 1
+                self.counter = 0
+        return self.last_ms, self.counter
+
+    def __call__(self) -> str:
+        return self.batch(1)[0]
+
+    def batch(self, num_records: int) -> List[str]:
+        if num_records <= 0:
+            return []
+        random_bits = self.rng.getrandbits(64 * num_records)
+        raw = bytearray()
+        for _ in range(num_records):
+            ms, counter = self._next()
+            value = (ms << 80) | (counter << 64) | (random_bits & 0xFFFFFFFFFFFFFFFF)
+            random_bits >>= 64
+            raw += value.to_bytes(16, "big")
+        return _format_uuids(raw, 7)
+
+
+class ValuePool:
+    """A bounded pool of pre-generated values sampled with a fast index draw.
+
+    The pool is filled lazily on first use, so it follows the registry's seed,
+    and is refilled after the registry is reseeded.
+    """
+
+    DISTRIBUTIONS = ("uniform", "zipf")
+
+    def __init__(
+        self,
+        generator_func: Callable[..., Any],
+        size: int,
+        distribution: str = "uniform",
+        generator_params: Tuple[Any, ...] = (),
+        generator_registry: Optional["GeneratorRegistry"] = None,
+    ):
+        if size <= 0:
+            raise ValueError("Pool size must be greater than 0")
+        if distribution not in self.DISTRIBUTIONS:
+            raise ValueError(
+                f"Unknown pool distribution: {distribution}. "
+                f"Supported distributions are: {', '.join(self.DISTRIBUTIONS)}"
+            )
+        self.generator_func = generator_func
+        self.size = size
+        self.distribution = distribution
+        self.generator_params = generator_params
+        self.registry = generator_registry or registry
+        self.values: Optional[List[Any]] = None
+        # Cumulative Zipf weights (rank r has weight 1 / r)
+        self._cum_weights: Optional[List[float]] = None
+        self._np_cum_weights = None
+
+    def reset(self) -> None:
+        """Drop the generated values; the pool is refilled on next use"""
+        self.values = None
+
+    def _fill(self) -> List[Any]:
+        self.values = [
+            self.generator_func(*self.generator_params) for _ in range(self.size)
+        ]
+        if self.distribution == "zipf" and self._cum_weights is None:
+            self._cum_weights = list(
+                accumulate(1.0 / rank for rank in range(1, self.size + 1))
+            )
+            if np is not None:
+                self._np_cum_weights = np.array(self._cum_weights)
+        return self.values
+
+    def sample(self) -> Any:
+        """Draw one value from the pool"""
+        values = self.values if self.values is not None else self._fill()
+        draw = self.registry.random.random()
+        if self._cum_weights is None:
+            return values[int(draw * self.size)]
+        return values[bisect_right(self._cum_weights, draw * self._cum_weights[-1])]
+
+    def sample_batch(self, num_records: int) -> List[Any]:
+        """Draw a column of values from the pool"""
+        values = self.values if self.values is not None else self._fill()
+        rng = self.registry._rng
+        if rng is None:
+            return [self.sample() for _ in range(num_records)]
+        if self._np_cum_weights is None:
+            indices = rng.integers(0, self.size, size=num_records)
+        else:
+            draws = rng.random(num_records) * self._np_cum_weights[-1]
+            indices = np.searchsorted(self._np_cum_weights, draws, side="right")
+        return [values[i] for i in indices.tolist()]
+
+
+def pool_generator(
+    generator_name: str,
+    size: int,
+    distribution: str = "uniform",
+    *generator_params,
+    generator_registry: Optional["GeneratorRegistry"] = None,
+) -> Any:
+    """Draw a value from a pool of pre-generated values
+
+    Args:
+        generator_name: The name of the generator that fills the pool
+        size: Number of distinct values in the pool
+        distribution: How values are drawn from the pool ('uniform' or 'zipf')
+        *generator_params: Parameters to pass to the underlying generator
+        generator_registry: Registry that owns the pool (default: the global
+        registry)
+
+    Returns:
+        A value from the pool
+    """
+    return (
+        (generator_registry or registry)
+        .get_pool(generator_name, size, distribution, *generator_params)
+        .sample()
+    )
+
+
+def pool_batch_generator(
+    num_records: int,
+    generator_name: str,
+    size: int,
+    distribution: str = "uniform",
+    *generator_params,
+    generator_registry: Optional["GeneratorRegistry"] = None,
+) -> List[Any]:
+    """Draw a column of values from a pool of pre-generated values"""
+    return (
+        (generator_registry or registry)
+        .get_pool(generator_name, size, distribution, *generator_params)
+        .sample_batch(num_records)
+    )
+
+
+class KeyStore:
+    """A bounded store of the keys emitted by a parent stream, for ``$ref``.
+
+    Only the key values are kept: integer keys are packed into an
+    ``array('q')`` (8 bytes per key), anything else falls back to a list. Once
+    ``capacity`` keys are held the oldest key is overwritten, and draws cost
+    O(1) (uniform) or one bisect over the cumulative weights (zipf, where the
+    oldest key held is the most popular).
+    """
+
+    DISTRIBUTIONS = ValuePool.DISTRIBUTIONS
+
+    def __init__(
+        self,
+        capacity: int = 1_000_000,
+        generator_registry: Optional["GeneratorRegistry"] = None,
+    ):
+        if capacity <= 0:
+            raise ValueError("Key store capacity must be greater than 0")
+        self.capacity = capacity
+        self.registry = generator_registry or registry
+        self.values: Any = array("q")
+        # Slot of the oldest key once the store is full
+        self.start = 0
+        self._cum_weights = array("d")
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def _unpack(self) -> None:
+        """Switch to a list for keys that do not fit a 64-bit integer"""
+        self.values = list(self.values)
+
+    def add(self, key: Any) -> None:
+        """Record one emitted key"""
+        if len(self.values) < self.capacity:
+            try:
+                self.values.append(key)
+            except (TypeError, OverflowError):
+                self._unpack()
+                self.values.append(key)
+            return
+        try:
+            self.values[self.start] = key
+        except (TypeError, OverflowError):
+            self._unpack()
+            self.values[self.start] = key
+        self.start = (self.start + 1) % self.capacity
+
+    def extend(self, keys: List[Any]) -> None:
+        """Record a batch of emitted keys"""
+        size = len(self.values)
+        if size + len(keys) > self.capacity:
+            for key in keys:
+                self.add(key)
+            return
+        try:
+            self.values.extend(keys)
+        except (TypeError, OverflowError):
+            # array.extend stops at the first bad key: undo the partial extend
+            del self.values[size:]
+            self._unpack()
+            self.values.extend(keys)
+
+    def _check_distribution(self, distribution: str) -> None:
+        if distribution not in self.DISTRIBUTIONS:
+            raise ValueError(
+                f"Unknown ref distribution: {distribution}. "
+                f"Supported distributions are: {', '.join(self.DISTRIBUTIONS)}"
+            )
+
+    def _zipf_weights(self, size: int) -> Any:
+        # Grown as the store fills, so each weight is computed once
+        weights = self._cum_weights
+        total = weights[-1] if weights else 0.0
+        for rank in range(len(weights) + 1, size + 1):
+            total += 1.0 / rank
+            weights.append(total)
+        return weights
+
+    def _key_at(self, index: int) -> Any:
+        """The key at a position counted from the oldest key held"""
+        slot = self.start + index
+        return self.values[slot - self.capacity if slot >= self.capacity else slot]
+
+    def sample(self, distribution: str = "uniform") -> Any:
+        """Draw one of the recorded keys"""
+        size = len(self.values)
+        if size == 0:
+            raise ValueError("No keys have been recorded to draw references from")
+        draw = self.registry.random.random()
+        if distribution == "uniform":
+            return self.values[int(draw * size)]
+        self._check_distribution(distribution)
+        weights = self._zipf_weights(size)
+        return self._key_at(bisect_right(weights, draw * weights[size - 1], 0, size))
+
+    def sample_batch(
+        self, num_records: int, distribution: str = "uniform"
+    ) -> List[Any]:
+        """Draw a column of recorded keys"""
+        rng = self.registry._rng
+        size = len(self.values)
+        if rng is None or size == 0:
+            return [self.sample(distribution) for _ in range(num_records)]
+        self._check_distribution(distribution)
+        if distribution == "uniform":
+            values = self.values
+            return [values[i] for i in rng.integers(0, size, num_records).tolist()]
+        weights = np.frombuffer(self._zipf_weights(size), dtype=np.float64)[:size]
+        draws = rng.random(num_records) * weights[-1]
+        indices = np.searchsorted(weights, draws, side="right")
+        return [self._key_at(i) for i in indices.tolist()]
+
+
+def ref_generator(
+    ref: str,
+    distribution: str = "uniform",
+    *,
+    generator_registry: Optional["GeneratorRegistry"] = None,
+) -> Any:
+    """Draw a key recorded from another stream's field
+
+    Args:
+        ref: The referenced field as "stream.field"
+        distribution: How keys are drawn ('uniform' or 'zipf')
+        generator_registry: Registry that owns the key store (default: the
+        global registry)
+
+    Returns:
+        A key emitted by the referenced field
+    """
+    return (generator_registry or registry).get_key_store(ref).sample(distribution)
+
+
+def ref_batch_generator(
+    num_records: int,
+    ref: str,
+    distribution: str = "uniform",
+    *,
+    generator_registry: Optional["GeneratorRegistry"] = None,
+) -> List[Any]:
+    """Draw a column of keys recorded from another stream's field"""
+    return (
+        (generator_registry or registry)
+        .get_key_store(ref)
+        .sample_batch(num_records, distribution)
+    )
 
 
 class GeneratorRegistry:
@@ -210,16 +746,31 @@ class GeneratorRegistry:
 
     def __init__(self):
         self._faker = Faker()
+        self.random = random.Random()
+        # UUID7 draws depend on the clock (one per new millisecond), so they
+        # come from their own stream to keep seeded draws of ``random`` intact
+        self._uuid7_random = random.Random()
+        self._rng = np.random.default_rng() if np is not None else None
         self._generators: Dict[str, Callable[..., Any]] = {}
+        self._batch_generators: Dict[str, Callable[..., List[Any]]] = {}
+        self._pools: Dict[Tuple[Any, ...], ValuePool] = {}
+        self._templates: Dict[str, "TemplateGenerator"] = {}
+        self._key_stores: Dict[str, KeyStore] = {}
+        self._stateful_generators: Dict[str, Callable[..., Callable[[], Any]]] = {}
+        self._entity_generators: Dict[str, Callable[..., Callable[..., Any]]] = {}
+        # Position of this process in a parallel run (see ParallelGenerator)
+        self.partition_index = 0
+        self.partition_count = 1
         self._register_default_generators()
+        self._register_default_batch_generators()
 
     def _register_default_generators(self):
         """Register default generators"""
         self._generators = {
             GeneratorType.STRING: self._faker.word,
             GeneratorType.INT: self._faker.random_int,
-            GeneratorType.INTRANGE: intrange_generator,
-            GeneratorType.CHOICE: choice_generator,
+            GeneratorType.INTRANGE: partial(intrange_generator, rng=self.random),
+            GeneratorType.CHOICE: partial(choice_generator, rng=self.random),
             GeneratorType.DATETIME: datetime_generator,
             GeneratorType.TIMESTAMP: lambda: int(time.time()),
             GeneratorType.EMAIL: self._faker.email,
@@ -245,17 +796,208 @@ class GeneratorRegistry:
             GeneratorType.CURRENCY_NAME: self._faker.currency_name,
             GeneratorType.COLOR_NAME: self._faker.color_name,
             GeneratorType.COMPANY_EMAIL: self._faker.company_email,
-            GeneratorType.GREETING: greeting_generator,
+            GeneratorType.GREETING: partial(greeting_generator, rng=self.random),
             GeneratorType.FLOAT: self._faker.pyfloat,
-            GeneratorType.PRICE: price_generator,
-            GeneratorType.PREFIXED_ID: prefixed_id_generator,
-            GeneratorType.ARRAY: array_generator,
-            GeneratorType.QUERY_STRING: query_string_generator,
+            GeneratorType.PRICE: partial(price_generator, rng=self.random),
+            GeneratorType.PREFIXED_ID: partial(prefixed_id_generator, rng=self.random),
+            GeneratorType.ARRAY: partial(array_generator, generator_registry=self),
+            GeneratorType.QUERY_STRING: partial(
+                query_string_generator, generator_registry=self
+            ),
+            GeneratorType.TEMPLATE: partial(
+                template_generator, generator_registry=self
+            ),
+            GeneratorType.POOL: partial(pool_generator, generator_registry=self),
+            GeneratorType.UUID7: UUID7Generator(self._uuid7_random),
+            GeneratorType.REF: partial(ref_generator, generator_registry=self),
         }
+        self.register_stateful_generator(
+            GeneratorType.SEQUENCE,
+            partial(SequenceGenerator, generator_registry=self),
+        )
+        self.register_entity_generator(
+            GeneratorType.RANDOM_WALK, partial(RandomWalk, rng=self.random)
+        )
+        self.register_entity_generator(
+            GeneratorType.MARKOV, partial(MarkovChain, rng=self.random)
+        )
+        self.register_entity_generator(GeneratorType.COUNTER, EntityCounter)
+
+    def seed(self, seed: Optional[int]) -> None:
+        """Reseed the random sources behind the registered generators.
+
+        Each source (Faker, ``random``, UUID7 and NumPy) gets its own substream of
+        ``seed``; ``None`` reseeds them from fresh entropy.
+        """
+
+        def substream(name: str) -> Optional[int]:
+            return derive_seed(seed, name) if seed is not None else None
+
+        self._faker.seed_instance(substream("faker"))
+        self.random.seed(substream("random"))
+        self._uuid7_random.seed(substream("uuid7"))
+        if self._rng is not None:
+            # Reseed in place: batch generators are bound to this instance
+            self._rng.bit_generator.state = np.random.default_rng(
+                substream("numpy")
+            ).bit_generator.state
+        # Pools are refilled from the new seed on next use
+        for pool in self._pools.values():
+            pool.reset()
+
+    def get_pool(
+        self,
+        generator_name: str,
+        size: int,
+        distribution: str = "uniform",
+        *generator_params,
+    ) -> ValuePool:
+        """Get the value pool for a generator, creating it on first request"""
+        key = (generator_name, size, distribution) + tuple(generator_params)
+        if key not in self._pools:
+            generator_func = self.get_generator(generator_name)
+            if generator_name == GeneratorType.CHOICE and generator_params:
+                generator_params = (list(generator_params),)
+            self._pools[key] = ValuePool(
+                generator_func, size, distribution, tuple(generator_params), self
+            )
+        return self._pools[key]
+
+    def get_key_store(self, ref: str) -> KeyStore:
+        """Get the store of keys recorded for a "stream.field" reference,
+        creating an empty one on first request"""
+        if ref not in self._key_stores:
+            self._key_stores[ref] = KeyStore(generator_registry=self)
+        return self._key_stores[ref]
+
+    def create_key_store(self, ref: str, capacity: int) -> KeyStore:
+        """Replace the store of a reference with a new, empty one"""
+        self._key_stores[ref] = KeyStore(capacity, generator_registry=self)
+        return self._key_stores[ref]
+
+    def drop_key_store(self, ref: str) -> None:
+        """Release the store of a reference, once its run is over"""
+        self._key_stores.pop(ref, None)
+
+    def get_template(self, template: str) -> "TemplateGenerator":
+        """Get the compiled formatter for a template, compiling it on first use.
+
+        Templates with stateful slots (e.g. ``{sequence}``) are not cached, so
+        they never share state; schema fields compile their own template.
+        """
+        if template in self._templates:
+            return self._templates[template]
+        # Imported here: templates are compiled with the schema machinery,
+        # which itself depends on this module
+        from glassgen.schema.template import TemplateGenerator
+
+        compiled = TemplateGenerator(template)
+        if not compiled.stateful:
+            # Templates with stateful slots are compiled per schema field
+            self._templates[template] = compiled
+        return compiled
+
+    def _register_default_batch_generators(self):
+        """Register batch generators; numeric ones need NumPy to be installed"""
+        self._batch_generators = {
+            GeneratorType.POOL: partial(pool_batch_generator, generator_registry=self),
+            GeneratorType.UUID: partial(uuid4_batch_generator, self.random),
+            GeneratorType.UUID4: partial(uuid4_batch_generator, self.random),
+            GeneratorType.UUID7: self._generators[GeneratorType.UUID7].batch,
+            GeneratorType.REF: partial(ref_batch_generator, generator_registry=self),
+            GeneratorType.TEMPLATE: partial(
+                template_batch_generator, generator_registry=self
+            ),
+            GeneratorType.QUERY_STRING: partial(
+                template_batch_generator,
+                template=QUERY_STRING_TEMPLATE,
+                generator_registry=self,
+            ),
+        }
+        if self._rng is None:
+            return
+        self._batch_generators.update(
+            {
+                GeneratorType.INT: partial(int_batch_generator, self._rng),
+                GeneratorType.INTRANGE: partial(intrange_batch_generator, self._rng),
+                GeneratorType.TIMESTAMP: partial(timestamp_batch_generator, self._rng),
+                GeneratorType.BOOLEAN: partial(boolean_batch_generator, self._rng),
+                GeneratorType.FLOAT: partial(float_batch_generator, self._rng),
+                GeneratorType.PRICE: partial(price_batch_generator, self._rng),
+                GeneratorType.PREFIXED_ID: partial(
+                    prefixed_id_batch_generator, self._rng
+                ),
+            }
+        )
 
     def register_generator(self, name: str, generator: Callable[..., Any]) -> None:
         """Register a new generator"""
         self._generators[name] = generator
+        # A replaced generator must not keep a stale batch or stateful version
+        self._batch_generators.pop(name, None)
+        self._stateful_generators.pop(name, None)
+        self._entity_generators.pop(name, None)
+
+    def register_stateful_generator(
+        self, name: str, factory: Callable[..., Callable[[], Any]]
+    ) -> None:
+        """Register a generator that keeps state per schema field.
+
+        ``factory(*params)`` is called once per field when a schema is compiled
+        and returns a callable producing one value per call; it may also
+        provide ``batch(num_records)``. Direct lookups through
+        ``get_generator`` share a single instance created without params.
+        """
+        self.register_generator(name, factory())
+        self._stateful_generators[name] = factory
+
+    def get_stateful_generator(
+        self, name: str
+    ) -> Optional[Callable[..., Callable[[], Any]]]:
+        """Get the per-field factory of a stateful generator, or None"""
+        return self._stateful_generators.get(name)
+
+    def register_entity_generator(
+        self, name: str, factory: Callable[..., Callable[..., Any]]
+    ) -> None:
+        """Register a generator that keeps state per entity.
+
+        In a schema the field is written ``$name(entity_field, *params)``.
+        ``factory(*params)`` is called once per field and returns a callable
+        taking ``(slot, is_new)`` (see ``EntityGenerator``), called once per
+        record with the slot of the record's entity in an ``EntityIndex``.
+        """
+
+        def unbound(*args: Any, **kwargs: Any) -> Any:
+            raise ValueError(
+                f"The {name} generator keeps state per entity: use it in a "
+                f"schema as ${name}(entity_field, ...)"
+            )
+
+        self.register_generator(name, unbound)
+        self._entity_generators[name] = factory
+
+    def get_entity_generator(
+        self, name: str
+    ) -> Optional[Callable[..., Callable[..., Any]]]:
+        """Get the per-field factory of an entity generator, or None"""
+        return self._entity_generators.get(name)
+
+    def register_batch_generator(
+        self, name: str, generator: Callable[..., List[Any]]
+    ) -> None:
+        """Register a batch version of a generator.
+
+        A batch generator is called as ``generator(num_records, *params)`` and
+        returns a list holding one value per record.
+        """
+        if name not in self._generators:
+            raise ValueError(f"Unknown generator type: {name}")
+        self._batch_generators[name] = generator
+
+    def get_batch_generator(self, name: str) -> Optional[Callable[..., List[Any]]]:
+        """Get the batch version of a generator, or None if it has none"""
+        return self._batch_generators.get(name)
 
     def get_generator(self, name: str) -> Callable[..., Any]:
         """Get a generator by name"""
@@ -0,0 +1,275 @@
+import multiprocessing
+import random
+import time
+import traceback
+from collections import deque
+from pathlib import Path
+from queue import Empty
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from glassgen.config import GeneratorConfig
+from glassgen.generator.generator import Generator
+from glassgen.generator.generators import derive_seed, registry
+from glassgen.schema import BaseSchema, ConfigSchema
+
+# Messages sent from workers to the parent process
+_BATCH = "batch"
+_DONE = "done"
+_ERROR = "error"
+
+# How often the parent checks that workers are still alive while waiting
+_POLL_INTERVAL = 1.0
+
+
+def shard_path(path: str, worker_index: int) -> str:
+    """Return the per-worker shard path, e.g. out.ndjson -> out.part-0003.ndjson"""
+    filepath = Path(path)
+    return str(
+        filepath.with_name(f"{filepath.stem}.part-{worker_index:04d}{filepath.suffix}")
+    )
+
+
+def split_evenly(total: int, parts: int) -> List[int]:
+    """Split total into parts that differ by at most one"""
+    base, remainder = divmod(total, parts)
+    return [base + (1 if i < remainder else 0) for i in range(parts)]
+
+
+class ParallelGenerator:
+    """Run generation across a pool of worker processes.
+
+    Each worker reseeds its own copy of the generator registry with a
+    substream of the configured ``seed`` (so seeded runs with the same number
+    of workers are reproducible) and produces its share of ``num_records``
+    (and of ``rps`` or the ``rate_profile``). Batches are either sent back to
+    the parent, where ``generate()`` yields them like ``Generator`` does, or,
+    with ``sharded_output``, written by each worker straight to its own shard
+    of the configured file sink.
+    """
+
+    def __init__(
+        self,
+        generator_config: GeneratorConfig,
+        schema: BaseSchema,
+        sink_config: Optional[Tuple[str, Dict[str, Any]]] = None,
+        columnar: bool = False,
+    ):
+        self.generator_config = generator_config
+        self.schema = schema
+        self.sink_config = sink_config
+        self.columnar = columnar
+        self.workers = generator_config.workers
+        rps = generator_config.rps
+        if generator_config.rate_profile is None and 0 < rps < self.workers:
+            # Every worker paces at 1 rps or more, so only rps workers are
+            # started to keep the combined rate at rps
+            self.workers = rps
+        if generator_config.sharded_output:
+            if sink_config is None or "path" not in (sink_config[1] or {}):
+                raise ValueError("sharded_output requires a file sink with a 'path'")
+        self.context = multiprocessing.get_context()
+
+    def _worker_seeds(self) -> List[int]:
+        """Give every worker its own substream of the configured seed"""
+        seed = self.generator_config.seed
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(64)
+        return [derive_seed(seed, "worker", i) for i in range(self.workers)]
+
+    def _worker_configs(self) -> List[GeneratorConfig]:
+        num_records = self.generator_config.num_records
+        if num_records == -1:
+            records = [-1] * self.workers
+        else:
+            records = split_evenly(num_records, self.workers)
+        rps = self.generator_config.rps
+        rates = split_evenly(rps, self.workers) if rps else None
+        profile = self.generator_config.rate_profile
+        if profile is not None:
+            # Each worker follows the same curve at its share of the rate
+            profile = profile.model_copy(update={"scale": profile.scale / self.workers})
+        seeds = self._worker_seeds()
+        return [
+            self.generator_config.model_copy(
+                update={
+                    "num_records": records[i],
+                    "rps": rates[i] if rates else 0,
+                    "rate_profile": profile,
+                    "workers": 1,
+                    "seed": seeds[i],
+                }
+            )
+            for i in range(self.workers)
+        ]
+
+    def generate(self):
+        start_time = time.time()
+        queue = self.context.Queue(maxsize=self.workers * 2)
+        processes = [
+            self.context.Process(
+                target=_run_worker,
+                args=(
+                    index,
+                    self.workers,
+                    config,
+                    self.schema,
+                    self.sink_config if self.generator_config.sharded_output else None,
+                    self.columnar,
+                    queue,
+                ),
+                daemon=True,
+            )
+            for index, config in enumerate(self._worker_configs())
+        ]
+        for process in processes:
+            process.start()
+
+        responses = []
+        # Messages drained from the queue, not handled yet
+        pending: Deque[Tuple[str, Any]] = deque()
+        try:
+            while len(responses) < self.workers:
+                if pending:
+                    kind, payload = pending.popleft()
+                else:
+                    try:
+                        kind, payload = queue.get(timeout=_POLL_INTERVAL)
+                    except Empty:
+                        failure = self._worker_failure(processes, responses)
+                        if failure is None:
+                            continue
+                        # Workers that exited may have left messages (their
+                        # DONE, or an error) in the pipe after the get above
+                        pending.extend(_drain(queue))
+                        if not pending:
+                            raise RuntimeError(failure) from None
+                        continue
+                if kind == _BATCH:
+                    yield payload
+                elif kind == _DONE:
+                    responses.append(payload)
+                else:
+                    raise RuntimeError(f"Generation worker failed:\n{payload}")
+        finally:
+            for process in processes:
+                if process.is_alive() and len(responses) < self.workers:
+                    process.terminate()
+                process.join()
+
+        return self._merge_responses(responses, start_time)
+
+    def _worker_failure(
+        self, processes: List[Any], responses: List[Dict[str, Any]]
+    ) -> Optional[str]:
+        """Why the run cannot finish if a worker died (e.g. was killed) before
+        reporting back, or None while it still can"""
+        finished = {r["worker"] for r in responses}
+        running = False
+        for index, process in enumerate(processes):
+            if index in finished:
+                continue
+            if process.is_alive():
+                running = True
+            elif process.exitcode != 0:
+                return f"Generation worker {index} exited with code {process.exitcode}"
+        if not running:
+            return "Generation workers exited without reporting back"
+        return None
+
+    def _merge_responses(
+        self, responses: List[Dict[str, Any]], start_time: float
+    ) -> Dict[str, Any]:
+        responses = sorted(responses, key=lambda r: r["worker"])
+        response = {
+            "time_taken_ms": round((time.time() - start_time) * 1000),
+            "num_records": sum(r["num_records"] for r in responses),
+            "workers": self.workers,
+        }
+        if any("total_duplicates" in r for r in responses):
+            total_generated = sum(r.get("total_generated", 0) for r in responses)
+            total_duplicates = sum(r.get("total_duplicates", 0) for r in responses)
+            response.update(
+                {
+                    "total_generated": total_generated,
+                    "total_duplicates": total_duplicates,
+                    "duplication_ratio": round(
+                        total_duplicates / max(1, total_generated), 2
+                    ),
+                }
+            )
+        if any("achieved_rps" in r for r in responses):
+            response["target_rps"] = round(
+                sum(r.get("target_rps", 0) for r in responses), 2
+            )
+            response["achieved_rps"] = round(
+                sum(r.get("achieved_rps", 0) for r in responses), 2
+            )
+        if self.generator_config.sharded_output:
+            # Files each worker wrote: one shard, or the parts of a rolling sink
+            response["shards"] = [path for r in responses for path in r["shards"]]
+            if any("files_written" in r for r in responses):
+                response["files_written"] = sum(
+                    r.get("files_written", 0) for r in responses
+                )
+        return response
+
+
+def _drain(queue) -> List[Tuple[str, Any]]:
+    """Every message already in the queue"""
+    messages = []
+    while True:
+        try:
+            messages.append(queue.get_nowait())
+        except Empty:
+            return messages
+
+
+def _run_worker(
+    index: int,
+    workers: int,
+    generator_config: GeneratorConfig,
+    schema: BaseSchema,
+    sink_config: Optional[Tuple[str, Dict[str, Any]]],
+    columnar: bool,
+    queue,
+) -> None:
+    """Entry point of a generation worker process"""
+    try:
+        # Stateful generators (e.g. sequences) take this worker's slice
+        registry.partition_index = index
+        registry.partition_count = workers
+        if isinstance(schema, ConfigSchema):
+            # Recompile in the worker; a forked child inherits the parent's plan
+            schema._reset_plan()
+        sink = None
+        if sink_config is not None:
+            # Imported here: sinks are only needed by sharded workers
+            from glassgen.sinks import SinkFactory
+
+            sink_type, sink_params = sink_config
+            path = shard_path(sink_params["path"], index)
+            sink = SinkFactory.create(sink_type, {**sink_params, "path": path})
+            sink.set_schema(schema)
+            columnar = sink.supports_columns
+
+        generator = Generator(generator_config, schema, columnar=columnar)
+        gen = generator.generate()
+        if sink is None:
+            publish = lambda batch: queue.put((_BATCH, batch))  # noqa: E731
+        elif generator.columnar:
+            publish = sink.publish_columns
+        else:
+            publish = sink.publish_bulk
+        try:
+            while True:
+                publish(next(gen))
+        except StopIteration as e:
+            response = e.value
+        if sink is not None:
+            sink.close()
+            response.update(sink.stats())
+            response["shards"] = getattr(sink, "files", [path])
+        response["worker"] = index
+        queue.put((_DONE, response))
+    except Exception:
+        queue.put((_ERROR, traceback.format_exc()))
@@ -0,0 +1,64 @@
+import queue
+import threading
+from typing import Any, Dict, Generator, TypeVar
+
+T = TypeVar("T")
+
+# Markers sent from the producer thread to the consumer
+_BATCH = "batch"
+_DONE = "done"
+_ERROR = "error"
+
+
+def prefetch(
+    gen: Generator[T, None, Dict[str, Any]], depth: int
+) -> Generator[T, None, Dict[str, Any]]:
+    """Run a batch generator in a producer thread, up to ``depth`` batches ahead.
+
+    Batch N+1 is generated while the caller publishes batch N. The bounded
+    queue applies backpressure: once ``depth`` batches are waiting, generation
+    pauses until the sink catches up. The wrapped generator's return value
+    (the final response) is returned unchanged and producer errors are
+    re-raised in the caller.
+    """
+    batches: "queue.Queue" = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        # Wake up regularly so an abandoned pipeline does not block forever
+        while not stop.is_set():
+            try:
+                batches.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            while True:
+                try:
+                    batch = next(gen)
+                except StopIteration as e:
+                    put((_DONE, e.value))
+                    return
+                if not put((_BATCH, batch)):
+                    gen.close()
+                    return
+        except Exception as e:
+            put((_ERROR, e))
+
+    producer = threading.Thread(target=produce, name="glassgen-producer", daemon=True)
+    producer.start()
+    try:
+        while True:
+            kind, payload = batches.get()
+            if kind == _BATCH:
+                yield payload
+            elif kind == _DONE:
+                return payload
+            else:
+                raise payload
+    finally:
+        stop.set()
+        producer.join()
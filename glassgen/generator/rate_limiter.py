@@ -0,0 +1,147 @@
+import asyncio
+import math
+import random
+import time
+from typing import Any, Callable, Dict, Optional, Union
+
+from glassgen.generator.rate_profile import ConstantProfile, RateProfile
+
+# Below this much waiting time the limiter spins instead of sleeping, since
+# time.sleep may overshoot short waits by tens of microseconds
+SPIN_THRESHOLD = 0.0005
+
+
+class RateLimiter:
+    """Token-bucket rate limiter pacing records on a monotonic clock.
+
+    Every record is due one ``1 / rate`` interval after the previous one, on
+    an absolute schedule, so time spent generating or publishing does not add
+    up to drift. Records are released in small paced steps of roughly
+    ``pace_interval`` seconds worth of records (one record at a time at low
+    rates), giving smooth inter-arrival times instead of a burst at the start
+    of every second. When the caller falls behind, at most ``burst`` records
+    of credit are kept to catch up with; the rest of the idle time is lost.
+
+    ``rate`` is either a constant or a ``RateProfile`` giving the target rate
+    over time; the schedule then follows the integral of the profile and step
+    sizes track the instantaneous rate. With ``poisson`` set, the gaps between
+    records are exponentially distributed (drawn from ``rng``) instead of
+    even, modelling independent arrivals at the target rate.
+    """
+
+    def __init__(
+        self,
+        rate: Union[float, RateProfile],
+        burst: Optional[int] = None,
+        pace_interval: float = 0.01,
+        clock: Callable[[], float] = time.perf_counter,
+        sleep: Callable[[float], None] = time.sleep,
+        poisson: bool = False,
+        rng: Optional[random.Random] = None,
+    ):
+        profile = rate if isinstance(rate, RateProfile) else ConstantProfile(rate)
+        if profile.end is not None and profile.rate_at(profile.end) <= 0:
+            raise ValueError(
+                "Rate must be positive: the rate profile ends at 0 rps, "
+                "set 'loop' to repeat it"
+            )
+        self.profile = profile
+        self.pace_interval = pace_interval
+        self.burst = burst
+        self.clock = clock
+        self.sleep = sleep
+        self.rng = (rng or random.Random()) if poisson else None
+        self.started_at: Optional[float] = None
+        self.next_due: Optional[float] = None
+        self.released = 0
+        self.last_released_at = 0.0
+        self.last_gap = 0.0
+
+    def _rate(self, at: float) -> float:
+        elapsed = at - self.started_at if self.started_at is not None else 0.0
+        return self.profile.rate_at(elapsed)
+
+    def _step(self, rate: float) -> int:
+        return max(1, math.ceil(rate * self.pace_interval))
+
+    def batch_size(self, max_batch_size: int) -> int:
+        """Number of records to release in the next paced step"""
+        return max(1, min(max_batch_size, self._step(self._rate(self.clock()))))
+
+    def _advance(self, due: float, records: float) -> float:
+        """Time at which ``records`` more records are due after ``due``"""
+        while True:
+            rate = self._rate(due)
+            if rate > 0 and records <= rate * self.pace_interval:
+                return due + records / rate
+            # Walk through changing (or paused) stretches of the profile
+            records -= rate * self.pace_interval
+            due += self.pace_interval
+
+    def _schedule(self) -> float:
+        """Time at which the next step is due"""
+        now = self.clock()
+        if self.next_due is None:
+            self.started_at = self.next_due = now
+        rate = self._rate(now)
+        if rate > 0:
+            # Idle time only earns up to a burst of credit
+            burst = self.burst if self.burst is not None else self._step(rate)
+            self.next_due = max(self.next_due, now - burst / rate)
+        self.next_due = self._first_due(self.next_due)
+        return self.next_due
+
+    def _release(self, count: int) -> None:
+        work = self.rng.gammavariate(count, 1.0) if self.rng else count
+        due = self.next_due
+        self.next_due = self._advance(due, work)
+        self.released += count
+        self.last_released_at = self.clock()
+        self.last_gap = self.next_due - due
+
+    def acquire(self, count: int) -> None:
+        """Wait until ``count`` more records may be released"""
+        self._wait_until(self._schedule())
+        self._release(count)
+
+    async def acquire_async(self, count: int) -> None:
+        """Like ``acquire``, but waits with ``asyncio.sleep``"""
+        deadline = self._schedule()
+        while True:
+            remaining = deadline - self.clock()
+            if remaining <= 0:
+                break
+            # No spinning here, it would block the loop: waits are as precise
+            # as the loop's timer
+            await asyncio.sleep(remaining)
+        self._release(count)
+
+    def _first_due(self, due: float) -> float:
+        """Move ``due`` past any stretch where the profile is paused at 0 rps"""
+        while self._rate(due) <= 0:
+            due += self.pace_interval
+        return due
+
+    def _wait_until(self, deadline: float) -> None:
+        while True:
+            remaining = deadline - self.clock()
+            if remaining <= 0:
+                return
+            if remaining > SPIN_THRESHOLD:
+                self.sleep(remaining - SPIN_THRESHOLD)
+            else:
+                self.sleep(0)
+
+    def stats(self) -> Dict[str, Any]:
+        """Target and achieved rate so far"""
+        if self.started_at is None:
+            return {
+                "target_rps": round(self.profile.rate_at(0), 2),
+                "achieved_rps": 0.0,
+            }
+        # The last step counts as taking its scheduled share of time
+        elapsed = self.last_released_at - self.started_at + self.last_gap
+        return {
+            "target_rps": round(self.profile.mean_rate(elapsed), 2),
+            "achieved_rps": round(self.released / elapsed, 2),
+        }
@@ -0,0 +1,208 @@
+import bisect
+import csv
+import math
+from abc import ABC, abstractmethod
+from typing import List, Optional, Sequence, Tuple
+
+from glassgen.config import RateProfileConfig
+
+# Number of samples used to average a profile over a stretch of time
+MEAN_SAMPLES = 1000
+
+
+class RateProfile(ABC):
+    """Target rate in records per second as a function of elapsed seconds"""
+
+    def __init__(self, scale: float = 1.0):
+        self.scale = scale
+
+    def rate_at(self, t: float) -> float:
+        """Target rate ``t`` seconds into the run"""
+        return max(0.0, self.scale * self._rate(t))
+
+    @abstractmethod
+    def _rate(self, t: float) -> float:
+        """Unscaled target rate ``t`` seconds into the run"""
+        pass
+
+    @property
+    def end(self) -> Optional[float]:
+        """Time after which the rate no longer changes, None if it never ends"""
+        return None
+
+    def mean_rate(self, duration: float) -> float:
+        """Average target rate over the first ``duration`` seconds"""
+        if duration <= 0:
+            return self.rate_at(0)
+        step = duration / MEAN_SAMPLES
+        total = sum(self.rate_at((i + 0.5) * step) for i in range(MEAN_SAMPLES))
+        return total / MEAN_SAMPLES
+
+
+class ConstantProfile(RateProfile):
+    def __init__(self, rps: float, scale: float = 1.0):
+        super().__init__(scale)
+        if rps <= 0:
+            raise ValueError("A constant rate profile needs a rate above 0 rps")
+        self.rps = rps
+
+    def _rate(self, t: float) -> float:
+        return self.rps
+
+    @property
+    def end(self) -> Optional[float]:
+        return 0.0
+
+    def mean_rate(self, duration: float) -> float:
+        return self.rate_at(0)
+
+
+class PiecewiseProfile(RateProfile):
+    """A rate through (seconds, rps) points, held or linearly interpolated.
+
+    Before the first point the first rate applies and after the last point
+    the last one does, unless ``loop`` is set: the profile then starts over
+    at the time of the last point.
+    """
+
+    def __init__(
+        self,
+        points: Sequence[Tuple[float, float]],
+        interpolate: bool = True,
+        loop: bool = False,
+        scale: float = 1.0,
+    ):
+        super().__init__(scale)
+        if not points:
+            raise ValueError("A rate profile needs at least one (t, rps) point")
+        times = [float(t) for t, _ in points]
+        if any(b < a for a, b in zip(times, times[1:])):
+            raise ValueError("Rate profile points must be in time order")
+        self.times = times
+        self.rates = [float(rps) for _, rps in points]
+        if max(self.rates) <= 0:
+            raise ValueError("A rate profile needs at least one rate above 0 rps")
+        self.interpolate = interpolate
+        self.loop = loop and times[-1] > 0
+
+    def _rate(self, t: float) -> float:
+        if self.loop:
+            t %= self.times[-1]
+        i = bisect.bisect_right(self.times, t) - 1
+        if i < 0:
+            return self.rates[0]
+        if i == len(self.times) - 1 or not self.interpolate:
+            return self.rates[i]
+        t0, t1 = self.times[i], self.times[i + 1]
+        r0, r1 = self.rates[i], self.rates[i + 1]
+        return r0 + (r1 - r0) * (t - t0) / (t1 - t0)
+
+    @property
+    def end(self) -> Optional[float]:
+        return None if self.loop else self.times[-1]
+
+
+class SineProfile(RateProfile):
+    """A rate oscillating around ``rps``, e.g. a diurnal curve.
+
+    ``phase`` shifts the curve by that many seconds into its period.
+    """
+
+    def __init__(
+        self,
+        rps: float,
+        amplitude: float,
+        period: float,
+        phase: float = 0.0,
+        scale: float = 1.0,
+    ):
+        super().__init__(scale)
+        if rps + amplitude <= 0:
+            raise ValueError("A sine rate profile needs a peak above 0 rps")
+        self.rps = rps
+        self.amplitude = amplitude
+        self.period = period
+        self.phase = phase
+
+    def _rate(self, t: float) -> float:
+        angle = 2 * math.pi * (t + self.phase) / self.period
+        return self.rps + self.amplitude * math.sin(angle)
+
+
+class SpikeProfile(RateProfile):
+    """A baseline rate with a burst of ``spike_rps`` every ``spike_every`` seconds"""
+
+    def __init__(
+        self,
+        rps: float,
+        spike_rps: float,
+        spike_every: float,
+        spike_duration: float,
+        scale: float = 1.0,
+    ):
+        super().__init__(scale)
+        if max(rps, spike_rps) <= 0:
+            raise ValueError("A spike rate profile needs a rate above 0 rps")
+        self.rps = rps
+        self.spike_rps = spike_rps
+        self.spike_every = spike_every
+        self.spike_duration = spike_duration
+
+    def _rate(self, t: float) -> float:
+        if t >= self.spike_every and t % self.spike_every < self.spike_duration:
+            return self.spike_rps
+        return self.rps
+
+
+def load_rate_points(path: str) -> List[Tuple[float, float]]:
+    """Read (seconds, rps) points from a two-column CSV file.
+
+    A header row, or any other row that does not start with a number, is
+    skipped.
+    """
+    points = []
+    with open(path, newline="") as f:
+        for row in csv.reader(f):
+            if len(row) < 2:
+                continue
+            try:
+                points.append((float(row[0]), float(row[1])))
+            except ValueError:
+                continue
+    if not points:
+        raise ValueError(f"No (t, rps) points found in rate profile file: {path}")
+    return points
+
+
+def build_rate_profile(config: RateProfileConfig) -> RateProfile:
+    """Create the rate profile described by a generator config"""
+    if config.type in ("constant", "poisson"):
+        return ConstantProfile(config.rps, config.scale)
+    if config.type == "ramp":
+        return PiecewiseProfile(
+            [(0.0, config.start_rps), (config.duration, config.end_rps)],
+            loop=config.loop,
+            scale=config.scale,
+        )
+    if config.type == "step":
+        return PiecewiseProfile(
+            config.steps, interpolate=False, loop=config.loop, scale=config.scale
+        )
+    if config.type == "sine":
+        return SineProfile(
+            config.rps, config.amplitude, config.period, config.phase, config.scale
+        )
+    if config.type == "spike":
+        return SpikeProfile(
+            config.rps,
+            config.spike_rps,
+            config.spike_every,
+            config.spike_duration,
+            config.scale,
+        )
+    return PiecewiseProfile(
+        load_rate_points(config.path),
+        interpolate=config.interpolate,
+        loop=config.loop,
+        scale=config.scale,
+    )
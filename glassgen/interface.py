@@ -1,13 +1,25 @@
-from typing import Any, Dict, Optional, Union
+import asyncio
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 from typing import Generator as PyGenerator
 
-from pydantic import ValidationError
+from pydantic import BaseModel, ValidationError
 
-from glassgen.config import ConfigError, GlassGenConfig, SinkConfig, validate_config
-from glassgen.generator import Generator
+from glassgen.config import (
+    ConfigError,
+    GlassGenConfig,
+    MultiStreamConfig,
+    SinkConfig,
+    StreamConfig,
+    validate_config,
+)
+from glassgen.generator import Generator, ParallelGenerator
+from glassgen.generator.generators import KeyStore, registry
+from glassgen.generator.pipeline import prefetch
 from glassgen.schema import BaseSchema
 from glassgen.schema.schema import ConfigSchema
-from glassgen.sinks import BaseSink, SinkFactory, YieldSink
+from glassgen.sinks import BaseSink, KafkaSink, SinkFactory, WebHookSink, YieldSink
 
 
 def generate_one(schema_dict: Dict[str, Any]):
@@ -16,45 +28,56 @@ def generate_one(schema_dict: Dict[str, Any]):
     return schema._generate_record()
 
 
-def generate(
-    config: Union[Dict[str, Any], GlassGenConfig],
-    schema: Optional[BaseSchema] = None,
-    sink: Optional[Union[BaseSink, Dict[str, Any]]] = None,
-) -> Union[Dict[str, Any], PyGenerator[Dict[str, Any], None, Dict[str, Any]]]:
-    """
-    Generate data based on the provided configuration.
-
-    Args:
-        config: Configuration dictionary or GlassGenConfig object
-        schema: Optional schema object to use for generating data
-        sink: Optional sink object or sink config dict to use for sending generated data
-
-    Returns:
-        If using a yield sink: A generator that yields events
-        Otherwise: A dictionary containing the final response
-    """
-    # Convert dict to Pydantic model if needed
+def _validate(config: Union[Dict[str, Any], BaseModel]) -> Any:
+    """Convert a config dict to its Pydantic model, exiting on errors"""
     if isinstance(config, dict):
         try:
-            config = validate_config(config)
+            return validate_config(config)
         except ConfigError as e:
             print("Configuration Error:")
             for error in e.details["errors"]:
                 print(f"- {error}")
             exit(1)
+    return config
+
+
+def _is_multi_stream(config: Union[Dict[str, Any], BaseModel]) -> bool:
+    return isinstance(config, MultiStreamConfig) or (
+        isinstance(config, dict) and "streams" in config
+    )
+
+
+def _setup(
+    config: Union[Dict[str, Any], GlassGenConfig],
+    schema: Optional[BaseSchema],
+    sink: Optional[Union[BaseSink, Dict[str, Any]]],
+) -> Tuple[GlassGenConfig, Union[Generator, ParallelGenerator], BaseSink, str]:
+    """Validate the config and create the schema, sink and batch generator"""
+    config = _validate(config)
 
     # Create schema if not provided
     if schema is None:
         schema = ConfigSchema.from_dict(config.schema_config)
+        schema.max_entities = config.generator.max_entities
         schema.validate()
+    elif (
+        isinstance(schema, ConfigSchema)
+        and "max_entities" in config.generator.model_fields_set
+        and schema.max_entities != config.generator.max_entities
+    ):
+        # Per-entity state is sized when the plan is compiled
+        schema.max_entities = config.generator.max_entities
+        schema._reset_plan()
 
     sink_type_name = config.sink.type if config.sink else type(sink).__name__
+    sink_config = None
     if sink is None:
         if config.sink is None:
             raise ConfigError(
                 "No sink provided",
                 {"errors": ["Sink must be provided either in config or as parameter"]},
             )
+        sink_config = config.sink
         sink = SinkFactory.create(config.sink.type, config.sink.params)
     elif isinstance(sink, dict):
         # Validate sink dict using SinkConfig validator
@@ -65,9 +88,72 @@ def generate(
         except (ValidationError, ConfigError) as e:
             raise ConfigError("Sink validation failed", {"errors": [str(e)]}) from e
 
-    # Create and run generator
-    generator = Generator(config.generator, schema)
+    # Custom sinks need not derive from BaseSink, so its hooks are optional
+    set_schema = getattr(sink, "set_schema", None)
+    if set_schema is not None:
+        set_schema(schema)
+    columnar = getattr(sink, "supports_columns", False)
+
+    # Create and run generator; sinks that accept columns get columnar batches
+    if config.generator.workers > 1:
+        if config.generator.sharded_output and sink_config is None:
+            raise ConfigError(
+                "Sharded output requires a sink config",
+                {"errors": ["sharded_output needs the sink given as a config dict"]},
+            )
+        generator = ParallelGenerator(
+            config.generator,
+            schema,
+            sink_config=(
+                (sink_config.type, sink_config.params or {}) if sink_config else None
+            ),
+            columnar=columnar,
+        )
+    else:
+        generator = Generator(config.generator, schema, columnar=columnar)
+    return config, generator, sink, sink_type_name
+
+
+def _add_sink_stats(response: Dict[str, Any], sink: BaseSink) -> None:
+    """Merge the statistics of a sink, if it reports any, into a response.
+
+    Keys the generator already reported are kept: with sharded output the
+    workers report the stats of the sinks that wrote the data.
+    """
+    stats = getattr(sink, "stats", None)
+    if stats is not None:
+        for key, value in stats().items():
+            response.setdefault(key, value)
+
+
+def generate(
+    config: Union[Dict[str, Any], GlassGenConfig],
+    schema: Optional[BaseSchema] = None,
+    sink: Optional[Union[BaseSink, Dict[str, Any]]] = None,
+) -> Union[Dict[str, Any], PyGenerator[Dict[str, Any], None, Dict[str, Any]]]:
+    """
+    Generate data based on the provided configuration.
+
+    Args:
+        config: Configuration dictionary or GlassGenConfig object
+        schema: Optional schema object to use for generating data
+        sink: Optional sink object or sink config dict to use for sending generated data
+
+    Returns:
+        If using a yield sink: A generator that yields events (or batches of
+            events, with the sink's batch or columns mode)
+        Otherwise: A dictionary containing the final response (with the
+            response of every stream for a multi-stream config)
+    """
+    if _is_multi_stream(config):
+        return generate_streams(config)
+    config, generator, sink, sink_type_name = _setup(config, schema, sink)
     gen = generator.generate()
+    if config.generator.prefetch_batches > 0:
+        # Overlap generating the next batches with publishing the current one
+        gen = prefetch(gen, config.generator.prefetch_batches)
+
+    publish = sink.publish_columns if generator.columnar else sink.publish_bulk
 
     # If using a yield sink, return a generator
     if isinstance(sink, YieldSink):
@@ -75,13 +161,13 @@ def generate(
         def event_generator():
             try:
                 while True:
-                    events = next(gen)
-                    for event in events:
-                        yield event
+                    # Records, or whole batches in batch and columns mode
+                    yield from publish(next(gen))
             except StopIteration as e:
                 response = e.value
                 response["sink"] = sink_type_name
                 sink.close()
+                _add_sink_stats(response, sink)
                 return response
 
         return event_generator()
@@ -90,10 +176,313 @@ def generate(
     try:
         while True:
             events = next(gen)
-            sink.publish_bulk(events)
+            publish(events)
     except StopIteration as e:
         response = e.value
 
     response["sink"] = sink_type_name
     sink.close()
+    _add_sink_stats(response, sink)
     return response
+
+
+# Batches of every agenerate() run are built on this thread by default: the
+# generators share one registry, and generation holds the GIL anyway
+_async_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _default_async_executor() -> ThreadPoolExecutor:
+    global _async_executor
+    if _async_executor is None:
+        _async_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="glassgen-async"
+        )
+    return _async_executor
+
+
+def _step(gen: PyGenerator) -> Tuple[bool, Any]:
+    """Advance a generator, returning (finished, batch or return value)"""
+    try:
+        return False, next(gen)
+    except StopIteration as e:
+        return True, e.value
+
+
+class AsyncGeneration:
+    """
+    A run started by ``agenerate()``.
+
+    Await it to run to completion and get the final response. With a yield
+    sink, iterate over it with ``async for`` instead; the final response is
+    then available as ``response`` once the iteration is over.
+    """
+
+    def __init__(
+        self,
+        generator: Union[Generator, ParallelGenerator],
+        sink: BaseSink,
+        sink_type_name: str,
+        executor: Optional[Executor],
+        on_publish: Optional[Callable[[Any], None]] = None,
+    ):
+        self.generator = generator
+        self.sink = sink
+        self.sink_type_name = sink_type_name
+        self.executor = executor or _default_async_executor()
+        # Called with every batch once the sink has published it
+        self.on_publish = on_publish
+        self.response: Optional[Dict[str, Any]] = None
+        self._generator_response: Dict[str, Any] = {}
+
+    async def _batches(self):
+        if isinstance(self.generator, Generator):
+            async for batch in self.generator.agenerate(self.executor):
+                yield batch
+            self._generator_response = self.generator.response
+            return
+        # Worker processes are waited on in a thread of the default executor
+        loop = asyncio.get_running_loop()
+        gen = self.generator.generate()
+        while True:
+            finished, value = await loop.run_in_executor(None, _step, gen)
+            if finished:
+                self._generator_response = value
+                return
+            yield value
+
+    def _finish(self) -> Dict[str, Any]:
+        response = dict(self._generator_response)
+        response["sink"] = self.sink_type_name
+        _add_sink_stats(response, self.sink)
+        self.response = response
+        return response
+
+    def __aiter__(self):
+        if not isinstance(self.sink, YieldSink):
+            raise TypeError(
+                "Only runs with a yield sink can be iterated, await the run instead"
+            )
+        return self._events()
+
+    async def _events(self):
+        publish = (
+            self.sink.publish_columns
+            if self.generator.columnar
+            else self.sink.publish_bulk
+        )
+        try:
+            async for batch in self._batches():
+                for event in publish(batch):
+                    yield event
+        finally:
+            await self.sink.aclose()
+        self._finish()
+
+    async def _run(self) -> Dict[str, Any]:
+        if isinstance(self.sink, YieldSink):
+            async for _ in self._events():
+                pass
+            return self.response
+        publish = (
+            self.sink.apublish_columns
+            if self.generator.columnar
+            else self.sink.apublish_bulk
+        )
+        try:
+            async for batch in self._batches():
+                await publish(batch)
+                if self.on_publish is not None:
+                    self.on_publish(batch)
+        finally:
+            # The sink is closed even when the run fails or is cancelled
+            await self.sink.aclose()
+        return self._finish()
+
+    def __await__(self):
+        return self._run().__await__()
+
+
+def agenerate(
+    config: Union[Dict[str, Any], GlassGenConfig],
+    schema: Optional[BaseSchema] = None,
+    sink: Optional[Union[BaseSink, Dict[str, Any]]] = None,
+    executor: Optional[Executor] = None,
+) -> AsyncGeneration:
+    """
+    Generate data from an asyncio application without blocking its loop.
+
+    Batches are built in ``executor`` (by default a thread shared by all
+    runs), the rate limiter waits with ``asyncio.sleep`` and sinks publish
+    through their async methods, so many runs can share one event loop.
+
+    Args:
+        config: Configuration dictionary or GlassGenConfig object
+        schema: Optional schema object to use for generating data
+        sink: Optional sink object or sink config dict to use for sending generated data
+        executor: Optional executor to build batches in
+
+    Returns:
+        An ``AsyncGeneration``: ``await`` it for the final response, or, with
+        a yield sink, iterate over it with ``async for``
+    """
+    _, generator, sink, sink_type_name = _setup(config, schema, sink)
+    return AsyncGeneration(generator, sink, sink_type_name, executor)
+
+
+class _SharedClients:
+    """Kafka producers and HTTP sessions shared by the sinks of a multi-stream
+    run, so streams going to the same cluster or endpoint share connections"""
+
+    def __init__(self):
+        self.producers: Dict[str, Any] = {}
+        self.sessions: Dict[str, Any] = {}
+
+    def create_sink(self, sink_config: SinkConfig) -> BaseSink:
+        params = sink_config.params or {}
+        if sink_config.type == "kafka":
+            return KafkaSink(params, producers=self.producers)
+        if sink_config.type == "webhook":
+            return WebHookSink(params, sessions=self.sessions)
+        return SinkFactory.create(sink_config.type, params)
+
+    def close(self) -> None:
+        for session in self.sessions.values():
+            session.close()
+
+
+def _key_recorder(
+    key_stores: Dict[str, KeyStore], columnar: bool, ready: asyncio.Event
+) -> Callable[[Any], None]:
+    """Build the callback recording the referenced keys of published batches"""
+    paths = [(field_path.split("."), store) for field_path, store in key_stores.items()]
+
+    def record(batch: Any) -> None:
+        for parts, store in paths:
+            if columnar:
+                column = batch
+                for part in parts:
+                    column = column[part]
+                store.extend(column)
+            else:
+                keys = []
+                for event in batch:
+                    for part in parts:
+                        event = event[part]
+                    keys.append(event)
+                store.extend(keys)
+        ready.set()
+
+    return record
+
+
+async def _run_stream(
+    stream: StreamConfig,
+    clients: _SharedClients,
+    executor: Optional[Executor],
+    key_stores: Dict[str, KeyStore],
+    parents: List[str],
+    ready: Dict[str, asyncio.Event],
+) -> Dict[str, Any]:
+    """Run one stream once every stream it references has published keys"""
+    try:
+        for parent in parents:
+            await ready[parent].wait()
+        for ref in set(stream.references().values()):
+            if not len(registry.get_key_store(ref)):
+                raise ValueError(
+                    f"Stream '{stream.name}' references '{ref}', but stream "
+                    f"'{ref.split('.')[0]}' published no records"
+                )
+        run = agenerate(
+            stream, sink=clients.create_sink(stream.sink), executor=executor
+        )
+        if key_stores:
+            run.on_publish = _key_recorder(
+                key_stores, run.generator.columnar, ready[stream.name]
+            )
+        return await run
+    finally:
+        # Children of a stream that failed or published nothing must not hang
+        ready[stream.name].set()
+
+
+async def agenerate_streams(
+    config: Union[Dict[str, Any], MultiStreamConfig],
+    executor: Optional[Executor] = None,
+) -> Dict[str, Any]:
+    """
+    Run every stream of a multi-stream config concurrently on one event loop.
+
+    The streams share the generator registry, the thread batches are built
+    on, and the Kafka producers and HTTP sessions of sinks with the same
+    client settings. Each stream keeps its own rate and sink.
+
+    Fields referenced by ``$ref(stream.field)`` record the keys their stream
+    publishes into a bounded key store; a stream referencing another one
+    starts once that stream has published its first batch, and draws its
+    foreign keys from the keys published so far.
+
+    Args:
+        config: Multi-stream configuration dictionary or MultiStreamConfig
+        executor: Optional executor to build batches in
+
+    Returns:
+        The combined totals, with the response of every stream under "streams"
+    """
+    config = _validate(config)
+    if config.seed is not None:
+        registry.seed(config.seed)
+    # Fresh key stores, created before the streams bind their $ref fields
+    key_stores = {
+        stream.name: {
+            field: registry.create_key_store(
+                f"{stream.name}.{field}", config.key_store_size
+            )
+            for field in stream.referenced_fields(config.streams)
+        }
+        for stream in config.streams
+    }
+    ready = {stream.name: asyncio.Event() for stream in config.streams}
+    start_time = time.time()
+    clients = _SharedClients()
+    try:
+        runs = [
+            asyncio.ensure_future(
+                _run_stream(
+                    stream,
+                    clients,
+                    executor,
+                    key_stores[stream.name],
+                    sorted({ref.split(".")[0] for ref in stream.references().values()}),
+                    ready,
+                )
+            )
+            for stream in config.streams
+        ]
+        try:
+            responses = await asyncio.gather(*runs)
+        except BaseException:
+            # Stop the other streams, so that every sink is closed
+            for run in runs:
+                run.cancel()
+            await asyncio.gather(*runs, return_exceptions=True)
+            raise
+    finally:
+        clients.close()
+        for stream in config.streams:
+            for field in key_stores[stream.name]:
+                registry.drop_key_store(f"{stream.name}.{field}")
+    return {
+        "time_taken_ms": round((time.time() - start_time) * 1000),
+        "num_records": sum(response["num_records"] for response in responses),
+        "streams": {
+            stream.name: response for stream, response in zip(config.streams, responses)
+        },
+    }
+
+
+def generate_streams(
+    config: Union[Dict[str, Any], MultiStreamConfig],
+) -> Dict[str, Any]:
+    """Blocking counterpart of ``agenerate_streams()``"""
+    return asyncio.run(agenerate_streams(config))
@@ -1,5 +1,52 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
+
+# A batch stored column by column: each key maps to a list holding one value per
+# record, or to a nested column dict for nested fields.
+Columns = Dict[str, Any]
+
+
+def records_to_columns(records: List[Dict[str, Any]]) -> Columns:
+    """Transpose a list of records into columns, following the first record's shape"""
+    if not records:
+        return {}
+    columns = {}
+    for key, value in records[0].items():
+        values = [record.get(key) for record in records]
+        if isinstance(value, dict):
+            columns[key] = records_to_columns(values)
+        else:
+            columns[key] = values
+    return columns
+
+
+def columns_length(columns: Columns) -> int:
+    """Return the number of records held by a batch of columns"""
+    for column in columns.values():
+        if isinstance(column, dict):
+            return columns_length(column)
+        return len(column)
+    return 0
+
+
+def slice_columns(columns: Columns, start: int, stop: int) -> Columns:
+    """Return records ``start`` to ``stop`` of a batch of columns"""
+    return {
+        key: slice_columns(column, start, stop)
+        if isinstance(column, dict)
+        else column[start:stop]
+        for key, column in columns.items()
+    }
+
+
+def columns_to_records(columns: Columns) -> List[Dict[str, Any]]:
+    """Transpose a batch of columns back into a list of records"""
+    keys = list(columns.keys())
+    values = [
+        columns_to_records(column) if isinstance(column, dict) else column
+        for column in columns.values()
+    ]
+    return [dict(zip(keys, row)) for row in zip(*values)]
 
 
 class BaseSchema(ABC):
@@ -14,3 +61,21 @@ class BaseSchema(ABC):
     def _generate_record(self) -> Dict[str, Any]:
         """Generate a single record based on the schema"""
         pass
+
+    def _generate_columns(self, num_records: int) -> Columns:
+        """Generate a batch of records column by column.
+
+        Schemas that can fill each column in a tight loop should override this;
+        the default generates records one at a time and transposes them.
+        """
+        return records_to_columns([self._generate_record() for _ in range(num_records)])
+
+    def value_types(self) -> Optional[Dict[str, Any]]:
+        """Describe the type of every field, for sinks that need a typed schema.
+
+        Returns a dict mapping each field to "int", "float", "bool" or
+        "string", a nested dict for nested fields, a one-item list for arrays,
+        or None when unknown. Returning None (the default) lets sinks infer
+        types from the generated data instead.
+        """
+        return None
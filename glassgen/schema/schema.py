@@ -1,10 +1,26 @@
 import re
-from typing import Any, Dict, List, Union
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
-from glassgen.generator.generators import GeneratorType, registry
-from glassgen.schema.base import BaseSchema
+from glassgen.generator.entity import EntityIndex
+from glassgen.generator.generators import (
+    GENERATOR_VALUE_TYPES,
+    GeneratorType,
+    registry,
+)
+from glassgen.schema.base import BaseSchema, Columns
+
+# (field name, callable producing one value, callable producing a column of N)
+PlanEntry = Tuple[str, Callable[[], Any], Callable[[int], Any]]
+# (path of the entity field, index of its entities, and the stateful fields
+# keyed by it as (path of the parent record, field name, entity generator))
+EntityPlanEntry = Tuple[
+    List[str], EntityIndex, List[Tuple[List[str], str, Callable[[int, bool], Any]]]
+]
+# (path of the parent record, field name, entity field path, entity generator)
+EntityField = Tuple[List[str], str, str, Callable[[int, bool], Any]]
 
 
 class SchemaField(BaseModel):
@@ -24,6 +40,24 @@ class ConfigSchema(BaseSchema, BaseModel):
     """Schema implementation that can be created from a configuration"""
 
     fields: Dict[str, Union[SchemaField, NestedSchemaField]]
+    # Most entities kept in state per entity field ($random_walk etc.)
+    max_entities: int = Field(default=1_000_000, gt=0)
+    _plan: Optional[List[PlanEntry]] = PrivateAttr(default=None)
+    _entity_plan: List[EntityPlanEntry] = PrivateAttr(default_factory=list)
+    # The compiled record generator lives in a slot: reading a pydantic
+    # private attribute goes through BaseModel.__getattr__, which costs more
+    # per record than generating it. Slots are neither pickled nor copied.
+    __slots__ = ("_record_generator",)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # The compiled plan holds bound generators; it is rebuilt after unpickling
+        state = super().__getstate__()
+        state["__pydantic_private__"] = {
+            **(state.get("__pydantic_private__") or {}),
+            "_plan": None,
+            "_entity_plan": [],
+        }
+        return state
 
     @classmethod
     def from_dict(cls, schema_dict: Dict[str, Any]) -> "ConfigSchema":
@@ -31,6 +65,85 @@ class ConfigSchema(BaseSchema, BaseModel):
         fields = cls._schema_dict_to_fields(schema_dict)
         return cls(fields=fields)
 
+    @staticmethod
+    def _parse_field(name: str, value: str) -> SchemaField:
+        """Parse a generator string such as '$intrange(1,10)' into a SchemaField"""
+        # Handle flat generator string
+        match = re.match(r"\$(\w+)(?:\((.*)\))?", value)
+        if not match:
+            raise ValueError(f"Invalid generator format: {value}")
+
+        generator_name = match.group(1)
+        params_str = match.group(2)
+
+        params = []
+        if params_str:
+            if generator_name == GeneratorType.TEMPLATE:
+                # The template is passed through verbatim, commas included
+                params = [params_str]
+            # Handle choice generator specially
+            elif generator_name == GeneratorType.CHOICE:
+                # Split by comma but preserve quoted strings
+                params = [p.strip().strip("\"'") for p in params_str.split(",")]
+            elif generator_name in (GeneratorType.ARRAY, GeneratorType.POOL):
+                # Handle array and pool generators: format is
+                # "generator_name, count, param1, param2, ..." for arrays and
+                # "generator_name, size, distribution, param1, ..." for pools
+                kind = generator_name.capitalize()
+                size_label = (
+                    "count" if generator_name == GeneratorType.ARRAY else "size"
+                )
+                param_parts = [p.strip() for p in params_str.split(",")]
+                if len(param_parts) < 2:
+                    raise ValueError(
+                        f"{kind} generator requires at least generator name "
+                        f"and {size_label}: {value}"
+                    )
+
+                # First parameter is the generator name (without $)
+                generator_name_param = param_parts[0].strip("$")
+                # Second parameter is the count
+                try:
+                    count = int(param_parts[1])
+                except ValueError as e:
+                    raise ValueError(
+                        f"{kind} {size_label} must be an integer: {param_parts[1]}"
+                    ) from e
+
+                # Remaining parameters are for the nested generator
+                nested_params = []
+                for p in param_parts[2:]:
+                    # Convert numeric parameters
+                    if p.isdigit():
+                        nested_params.append(int(p))
+                    else:
+                        nested_params.append(p)
+
+                params = [generator_name_param, count] + nested_params
+            else:
+                # Simple parameter parsing for other generators
+                params = [p.strip() for p in params_str.split(",")]
+                # Convert numeric parameters
+                if generator_name == GeneratorType.PRICE:
+                    # Handle price generator specifically -
+                    # convert first two params to float, third to int
+                    converted_params = []
+                    for i, p in enumerate(params):
+                        try:
+                            if i < 2:  # First two parameters are min_price and
+                                # max_price (float)
+                                converted_params.append(float(p))
+                            else:  # Third parameter is decimal_places (int)
+                                converted_params.append(int(p))
+                        except ValueError:
+                            converted_params.append(p)
+                    params = converted_params
+                else:
+                    # Original logic for other generators
+                    params = [int(p) if p.isdigit() else p for p in params]
+
+        return SchemaField(name=name, generator=generator_name, params=params)
+
     @staticmethod
     def _schema_dict_to_fields(
         schema_dict: Dict[str, Any],
@@ -45,74 +158,7 @@ class ConfigSchema(BaseSchema, BaseModel):
                 fields[name] = NestedSchemaField(name=name, fields=nested_fields)
             elif isinstance(value, str):
                 # Handle flat generator string
-                match = re.match(r"\$(\w+)(?:\((.*)\))?", value)
-                if not match:
-                    raise ValueError(f"Invalid generator format: {value}")
-
-                generator_name = match.group(1)
-                params_str = match.group(2)
-
-                params = []
-                if params_str:
-                    # Handle choice generator specially
-                    if generator_name == GeneratorType.CHOICE:
-                        # Split by comma but preserve quoted strings
-                        params = [p.strip().strip("\"'") for p in params_str.split(",")]
-                    elif generator_name == GeneratorType.ARRAY:
-                        # Handle array generator: format is "generator_name, count,
-                        # param1, param2, ..."
-                        param_parts = [p.strip() for p in params_str.split(",")]
-                        if len(param_parts) < 2:
-                            raise ValueError(
-                                f"Array generator requires at least generator name and \
-                                    count: {value}"
-                            )
-
-                        # First parameter is the generator name (without $)
-                        generator_name_param = param_parts[0].strip("$")
-                        # Second parameter is the count
-                        try:
-                            count = int(param_parts[1])
-                        except ValueError as e:
-                            raise ValueError(
-                                f"Array count must be an integer: {param_parts[1]}"
-                            ) from e
-
-                        # Remaining parameters are for the nested generator
-                        nested_params = []
-                        for p in param_parts[2:]:
-                            # Convert numeric parameters
-                            if p.isdigit():
-                                nested_params.append(int(p))
-                            else:
-                                nested_params.append(p)
-
-                        params = [generator_name_param, count] + nested_params
-                    else:
-                        # Simple parameter parsing for other generators
-                        params = [p.strip() for p in params_str.split(",")]
-                        # Convert numeric parameters
-                        if generator_name == GeneratorType.PRICE:
-                            # Handle price generator specifically -
-                            # convert first two params to float, third to int
-                            converted_params = []
-                            for i, p in enumerate(params):
-                                try:
-                                    if i < 2:  # First two parameters are min_price and
-                                        # max_price (float)
-                                        converted_params.append(float(p))
-                                    else:  # Third parameter is decimal_places (int)
-                                        converted_params.append(int(p))
-                                except ValueError:
-                                    converted_params.append(p)
-                            params = converted_params
-                        else:
-                            # Original logic for other generators
-                            params = [int(p) if p.isdigit() else p for p in params]
-
-                fields[name] = SchemaField(
-                    name=name, generator=generator_name, params=params
-                )
+                fields[name] = ConfigSchema._parse_field(name, value)
             else:
                 raise ValueError(
                     f"Invalid schema value type for field '{name}': {type(value)}"
@@ -120,7 +166,7 @@ class ConfigSchema(BaseSchema, BaseModel):
         return fields
 
     def validate(self) -> None:
-        """Validate that all generators are supported"""
+        """Validate that all generators are supported and compile the record plan"""
         supported_generators = set(registry.get_supported_generators().keys())
 
         def validate_fields(
@@ -138,32 +184,290 @@ class ConfigSchema(BaseSchema, BaseModel):
                     validate_fields(field.fields)
 
         validate_fields(self.fields)
+        self._compile()
+
+    def _compile(self) -> Callable[[], Dict[str, Any]]:
+        """Compile the record plan and the plan of the per-entity fields,
+        returning the bound record generator"""
+        entity_fields: List[EntityField] = []
+        self._plan = self._compile_plan(self.fields, entity_fields)
+        self._entity_plan = self._compile_entity_plan(entity_fields)
+        if self._entity_plan:
+            record_generator = partial(
+                _run_plan_with_entities, self._plan, self._entity_plan
+            )
+        else:
+            record_generator = partial(_run_plan, self._plan)
+        self._record_generator = record_generator
+        return record_generator
+
+    def _reset_plan(self) -> None:
+        """Drop the compiled plan, so it is compiled again on next use"""
+        self._plan = None
+        self._entity_plan = []
+        if hasattr(self, "_record_generator"):
+            del self._record_generator
+
+    @staticmethod
+    def _compile_field(field: SchemaField) -> Callable[[], Any]:
+        """Bind a field's generator and parameters into a zero-argument callable"""
+        generator = registry.get_generator(field.generator)
+        if not field.params:
+            return generator
+        if field.generator == GeneratorType.CHOICE:
+            # For choice generator, pass the list directly
+            return partial(generator, list(field.params))
+        # For other generators (including array), unpack the parameters
+        return partial(generator, *field.params)
+
+    @staticmethod
+    def _compile_plan(
+        fields_dict: Dict[str, Union[SchemaField, NestedSchemaField]],
+        entity_fields: Optional[List[EntityField]] = None,
+        path: Tuple[str, ...] = (),
+    ) -> List[PlanEntry]:
+        """Compile the field tree into a flat list of plan entries.
+
+        Each entry is (field name, record callable, column callable). Nested
+        fields are compiled into callables that run their own sub-plan, so
+        generating records never has to inspect the field tree again. Fields
+        with per-entity state get a placeholder and are added to
+        ``entity_fields``, to be filled once the rest of the record exists.
+        """
+        plan = []
+        for field_name, field in fields_dict.items():
+            if isinstance(field, SchemaField) and registry.get_entity_generator(
+                field.generator
+            ):
+                if not field.params or entity_fields is None:
+                    raise ValueError(
+                        f"{field.generator} generator requires an entity field "
+                        f"of the record: {field_name}"
+                    )
+                factory = registry.get_entity_generator(field.generator)
+                entity_fields.append(
+                    (
+                        list(path),
+                        field_name,
+                        str(field.params[0]),
+                        factory(*field.params[1:]),
+                    )
+                )
+                plan.append((field_name, _placeholder, partial(_repeat, _placeholder)))
+            elif (
+                isinstance(field, SchemaField) and field.generator == GeneratorType.POOL
+            ):
+                # Bind the field straight to its pool, skipping the pool lookup
+                if len(field.params) < 2:
+                    raise ValueError(
+                        f"Pool generator requires at least generator name and size: "
+                        f"{field_name}"
+                    )
+                pool = registry.get_pool(*field.params)
+                plan.append((field_name, pool.sample, pool.sample_batch))
+            elif (
+                isinstance(field, SchemaField)
+                and field.generator == GeneratorType.TEMPLATE
+                and field.params
+            ):
+                # Each field gets its own template, so stateful slots such as
+                # {sequence} keep a counter per field and per schema
+                from glassgen.schema.template import TemplateGenerator
+
+                template = TemplateGenerator(field.params[0])
+                plan.append((field_name, template, template.batch))
+            elif (
+                isinstance(field, SchemaField) and field.generator == GeneratorType.REF
+            ):
+                # Bind the field straight to the key store it draws from
+                if not field.params:
+                    raise ValueError(
+                        f"Ref generator requires a 'stream.field' reference: "
+                        f"{field_name}"
+                    )
+                store = registry.get_key_store(field.params[0])
+                distribution = field.params[1] if len(field.params) > 1 else "uniform"
+                if distribution not in store.DISTRIBUTIONS:
+                    raise ValueError(
+                        f"Unknown ref distribution: {distribution}. Supported "
+                        f"distributions are: {', '.join(store.DISTRIBUTIONS)}"
+                    )
+                plan.append(
+                    (
+                        field_name,
+                        partial(store.sample, distribution),
+                        partial(store.sample_batch, distribution=distribution),
+                    )
+                )
+            elif isinstance(field, SchemaField) and registry.get_stateful_generator(
+                field.generator
+            ):
+                # Stateful generators get their own instance per field
+                factory = registry.get_stateful_generator(field.generator)
+                func = factory(*field.params)
+                batch_func = getattr(func, "batch", None) or partial(_repeat, func)
+                plan.append((field_name, func, batch_func))
+            elif isinstance(field, SchemaField):
+                func = ConfigSchema._compile_field(field)
+                batch_generator = registry.get_batch_generator(field.generator)
+                if batch_generator is not None:
+                    # Vectorized generators fill the whole column in one call
+                    batch_func = partial(_call_batch, batch_generator, field.params)
+                else:
+                    batch_func = partial(_repeat, func)
+                plan.append((field_name, func, batch_func))
+            elif isinstance(field, NestedSchemaField):
+                nested_plan = ConfigSchema._compile_plan(
+                    field.fields, entity_fields, path + (field_name,)
+                )
+                plan.append(
+                    (
+                        field_name,
+                        partial(_run_plan, nested_plan),
+                        partial(_run_plan_columns, nested_plan),
+                    )
+                )
+        return plan
+
+    def value_types(self) -> Dict[str, Any]:
+        """Describe the type of every field from its generator"""
+        return _value_types(self.fields)
+
+    def _compile_entity_plan(
+        self, entity_fields: List[EntityField]
+    ) -> List[EntityPlanEntry]:
+        """Group the per-entity fields by entity field, one index per entity"""
+        entity_plan: Dict[str, EntityPlanEntry] = {}
+        for parent_path, field_name, entity_path, generator in entity_fields:
+            if entity_path not in entity_plan:
+                entity_field = self._resolve_field(entity_path)
+                if (
+                    not isinstance(entity_field, SchemaField)
+                    or entity_field.generator == GeneratorType.ARRAY
+                    or registry.get_entity_generator(entity_field.generator)
+                ):
+                    raise ValueError(
+                        f"Entity field of '{field_name}' must be a field holding "
+                        f"a single, stateless value: {entity_path}"
+                    )
+                entity_plan[entity_path] = (
+                    entity_path.split("."),
+                    EntityIndex(self.max_entities),
+                    [],
+                )
+            entity_plan[entity_path][2].append((parent_path, field_name, generator))
+        return list(entity_plan.values())
+
+    def _resolve_field(
+        self, field_path: str
+    ) -> Optional[Union[SchemaField, NestedSchemaField]]:
+        """The field at a dotted path, or None"""
+        field: Optional[Union[SchemaField, NestedSchemaField]] = None
+        fields: Optional[Dict[str, Any]] = self.fields
+        for part in field_path.split("."):
+            if fields is None:
+                return None
+            field = fields.get(part)
+            fields = field.fields if isinstance(field, NestedSchemaField) else None
+        return field
+
+    def _get_plan(self) -> List[PlanEntry]:
+        if self._plan is None:
+            self._compile()
+        return self._plan
 
     def _generate_record(self) -> Dict[str, Any]:
         """Generate a single record based on the schema"""
+        try:
+            record_generator = self._record_generator
+        except AttributeError:
+            # Not compiled yet, or unpickled/copied from a compiled schema
+            record_generator = self._compile()
+        return record_generator()
+
+    def _generate_columns(self, num_records: int) -> Columns:
+        """Generate a batch of records column by column"""
+        columns = _run_plan_columns(self._get_plan(), num_records)
+        if self._entity_plan:
+            _run_entity_plan_columns(self._entity_plan, columns)
+        return columns
+
+
+def _value_types(
+    fields_dict: Dict[str, Union[SchemaField, NestedSchemaField]],
+) -> Dict[str, Any]:
+    types = {}
+    for field_name, field in fields_dict.items():
+        if isinstance(field, NestedSchemaField):
+            types[field_name] = _value_types(field.fields)
+        elif field.generator == GeneratorType.ARRAY:
+            types[field_name] = [GENERATOR_VALUE_TYPES.get(field.params[0])]
+        elif field.generator == GeneratorType.POOL:
+            types[field_name] = GENERATOR_VALUE_TYPES.get(field.params[0])
+        elif field.generator == GeneratorType.REF:
+            # Keys take the type of the referenced field, inferred from the data
+            types[field_name] = None
+        else:
+            # Generators registered at runtime are unknown (None)
+            types[field_name] = GENERATOR_VALUE_TYPES.get(field.generator)
+    return types
+
+
+def _repeat(func: Callable[[], Any], num_records: int) -> List[Any]:
+    """Fill a column by calling a bound generator once per record"""
+    return [func() for _ in range(num_records)]
+
+
+def _call_batch(
+    batch_generator: Callable[..., List[Any]], params: List[Any], num_records: int
+) -> List[Any]:
+    """Fill a column with a single call to a batch generator"""
+    return batch_generator(num_records, *params)
+
+
+def _run_plan(plan: List[PlanEntry]) -> Dict[str, Any]:
+    """Generate a (nested) record from a compiled plan"""
+    return {field_name: func() for field_name, func, _ in plan}
+
+
+def _run_plan_with_entities(
+    plan: List[PlanEntry], entity_plan: List[EntityPlanEntry]
+) -> Dict[str, Any]:
+    """Generate a record, then fill its per-entity fields"""
+    record = _run_plan(plan)
+    _run_entity_plan(entity_plan, record)
+    return record
+
+
+def _run_plan_columns(plan: List[PlanEntry], num_records: int) -> Columns:
+    """Generate a (nested) batch of columns from a compiled plan"""
+    return {field_name: batch_func(num_records) for field_name, _, batch_func in plan}
+
+
+def _placeholder() -> None:
+    """Keeps the position of a per-entity field until it is filled in"""
+    return None
+
+
+def _lookup(record: Dict[str, Any], path: List[str]) -> Any:
+    for part in path:
+        record = record[part]
+    return record
+
+
+def _run_entity_plan(entity_plan: List[EntityPlanEntry], record: Dict[str, Any]):
+    """Fill the per-entity fields of a record from the state of its entities"""
+    for entity_path, index, fields in entity_plan:
+        slot, is_new = index.slot(_lookup(record, entity_path))
+        for parent_path, field_name, generator in fields:
+            _lookup(record, parent_path)[field_name] = generator(slot, is_new)
 
-        def generate_nested_record(
-            fields_dict: Dict[str, Union[SchemaField, NestedSchemaField]],
-        ) -> Dict[str, Any]:
-            record = {}
-            for field_name, field in fields_dict.items():
-                if isinstance(field, SchemaField):
-                    generator = registry.get_generator(field.generator)
-                    # Pass parameters to the generator if they exist
-                    if field.params:
-                        if field.generator == GeneratorType.CHOICE:
-                            # For choice generator, pass the list directly
-                            record[field_name] = generator(field.params)
-                        elif field.generator == GeneratorType.ARRAY:
-                            # For array generator, pass parameters as-is
-                            record[field_name] = generator(*field.params)
-                        else:
-                            # For other generators, unpack the parameters
-                            record[field_name] = generator(*field.params)
-                    else:
-                        record[field_name] = generator()
-                elif isinstance(field, NestedSchemaField):
-                    record[field_name] = generate_nested_record(field.fields)
-            return record
 
-        return generate_nested_record(self.fields)
+def _run_entity_plan_columns(entity_plan: List[EntityPlanEntry], columns: Columns):
+    """Fill the per-entity columns of a batch, record by record in order"""
+    for entity_path, index, fields in entity_plan:
+        slots = [index.slot(entity_id) for entity_id in _lookup(columns, entity_path)]
+        for parent_path, field_name, generator in fields:
+            _lookup(columns, parent_path)[field_name] = [
+                generator(slot, is_new) for slot, is_new in slots
+            ]
@@ -0,0 +1,54 @@
+import re
+from typing import List
+
+from glassgen.generator.generators import registry
+from glassgen.schema.schema import ConfigSchema, SchemaField
+
+# A slot is a generator expression in braces, e.g. {name} or {intrange(1,10)}
+_SLOT_PATTERN = re.compile(r"\{(\w+(?:\([^(){}]*\))?)\}")
+
+
+class TemplateGenerator:
+    """A string template compiled once into a fast formatter.
+
+    Slots such as ``{intrange(1,10)}`` are filled by registered generators,
+    using the same syntax as schema fields without the leading ``$``. Every
+    ``{word}`` or ``{word(params)}`` is a slot; all other text is literal.
+    """
+
+    def __init__(self, template: str):
+        self.template = template
+        fields = {}
+        parts = []
+        position = 0
+        for index, match in enumerate(_SLOT_PATTERN.finditer(template)):
+            parts.append(self._escape(template[position : match.start()]))
+            parts.append("{}")
+            name = f"slot_{index}"
+            fields[name] = ConfigSchema._parse_field(name, f"${match.group(1)}")
+            position = match.end()
+        parts.append(self._escape(template[position:]))
+        self.format_str = "".join(parts)
+        self.fields: List[SchemaField] = list(fields.values())
+        # Slots such as {sequence} keep state, so the template must not be shared
+        self.stateful = any(
+            registry.get_stateful_generator(field.generator) for field in self.fields
+        )
+        plan = ConfigSchema._compile_plan(fields)
+        self._funcs = [func for _, func, _ in plan]
+        self._batch_funcs = [batch_func for _, _, batch_func in plan]
+        self._format = self.format_str.format
+
+    @staticmethod
+    def _escape(literal: str) -> str:
+        """Escape literal text for str.format"""
+        return literal.replace("{", "{{").replace("}", "}}")
+
+    def __call__(self) -> str:
+        return self._format(*[func() for func in self._funcs])
+
+    def batch(self, num_records: int) -> List[str]:
+        if not self._batch_funcs:
+            return [self._format()] * num_records
+        columns = [batch_func(num_records) for batch_func in self._batch_funcs]
+        return [self._format(*row) for row in zip(*columns)]
@@ -1,5 +1,4 @@
 # a user schema that generates a simulated user profile
-import random
 from typing import Any, Dict
 
 from glassgen.generator.generators import GeneratorType, registry
@@ -36,7 +35,7 @@ class UserSchema(BaseSchema):
         return {
             "name": registry.get_generator(GeneratorType.NAME)(),
             # custom schemas can easily extend the generators available
-            "age": random.randint(18, 65),
+            "age": registry.random.randint(18, 65),
             "email": registry.get_generator(GeneratorType.EMAIL)(),
             "phone": registry.get_generator(GeneratorType.PHONE_NUMBER)(),
             "address": registry.get_generator(GeneratorType.ADDRESS)(),
@@ -1,16 +1,23 @@
+from glassgen.sinks.arrow_sink import ArrowSink, ParquetSink
+from glassgen.sinks.avro_sink import AvroSink
 from glassgen.sinks.base import BaseSink
 from glassgen.sinks.csv_sink import CSVSink
 from glassgen.sinks.kafka_sink import KafkaSink
 from glassgen.sinks.ndjson_sink import NDJSONSink
+from glassgen.sinks.rolling_sink import RollingFileSink, is_rolling
 from glassgen.sinks.webhook_sink import WebHookSink
 from glassgen.sinks.yield_sink import YieldSink
 
 __all__ = [
+    "ArrowSink",
+    "AvroSink",
     "BaseSink",
     "CSVSink",
     "NDJSONSink",
     "SinkFactory",
     "KafkaSink",
+    "ParquetSink",
+    "RollingFileSink",
     "WebHookSink",
     "YieldSink",
 ]
@@ -23,10 +30,18 @@ class SinkFactory:
         "webhook": WebHookSink,
         "yield": YieldSink,
         "kafka": KafkaSink,
+        "parquet": ParquetSink,
+        "arrow": ArrowSink,
+        "avro": AvroSink,
     }
 
+    # Sinks writing to a file 'path', which can roll over into several files
+    _file_sinks = {"csv", "ndjson", "parquet", "arrow", "avro"}
+
     @classmethod
     def create(cls, class_type: str, sink_config: dict):
         if class_type not in cls._sinks:
             raise ValueError(f"Unknown class_type: {class_type}")
+        if class_type in cls._file_sinks and is_rolling(sink_config or {}):
+            return RollingFileSink(cls._sinks[class_type], sink_config)
         return cls._sinks[class_type](sink_config)
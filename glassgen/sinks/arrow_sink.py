@@ -0,0 +1,201 @@
+from abc import abstractmethod
+from pathlib import Path
+from typing import Any, Dict, List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+from glassgen.schema.base import BaseSchema, Columns, records_to_columns
+from glassgen.sinks.base import BaseSink
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - pyarrow is an optional dependency
+    pa = None
+    pq = None
+
+
+def _require_pyarrow(sink_name: str) -> None:
+    if pa is None:
+        raise ImportError(
+            f"The {sink_name} sink requires pyarrow: pip install glassgen[arrow]"
+        )
+
+
+def _arrow_type(value_type: Any) -> Optional["pa.DataType"]:
+    """Map a schema value type to an Arrow type, None when it must be inferred"""
+    if isinstance(value_type, list):
+        item_type = _arrow_type(value_type[0])
+        return pa.list_(item_type) if item_type is not None else None
+    return {
+        "int": pa.int64(),
+        "float": pa.float64(),
+        "bool": pa.bool_(),
+        "string": pa.string(),
+    }.get(value_type)
+
+
+def _column_array(column: Any, value_type: Any) -> "pa.Array":
+    """Build an Arrow array from a column, nested column dicts becoming structs"""
+    if isinstance(column, dict):
+        nested_types = value_type if isinstance(value_type, dict) else {}
+        children = [
+            _column_array(child, nested_types.get(name))
+            for name, child in column.items()
+        ]
+        return pa.StructArray.from_arrays(children, names=list(column))
+    return pa.array(column, type=_arrow_type(value_type))
+
+
+class ArrowFileSink(BaseSink):
+    """Abstract base class for sinks writing Arrow tables to a file.
+
+    Batches are converted column by column into an Arrow table. Field types
+    come from the schema's generators; fields whose type is unknown are
+    inferred from the first batch, which then fixes the file schema.
+    """
+
+    supports_columns = True
+    sink_name = "arrow"
+
+    def __init__(self, path: str):
+        _require_pyarrow(self.sink_name)
+        self.filepath = Path(path)
+        self.value_types: Dict[str, Any] = {}
+        self.arrow_schema = None
+        self.writer = None
+
+    def set_schema(self, schema: BaseSchema) -> None:
+        self.value_types = schema.value_types() or {}
+
+    def _to_table(self, columns: Columns) -> "pa.Table":
+        arrays = [
+            _column_array(column, self.value_types.get(name))
+            for name, column in columns.items()
+        ]
+        table = pa.Table.from_arrays(arrays, names=list(columns))
+        if self.arrow_schema is None:
+            self.arrow_schema = table.schema
+        elif table.schema != self.arrow_schema:
+            table = table.cast(self.arrow_schema)
+        return table
+
+    @abstractmethod
+    def _open_writer(self, schema: "pa.Schema"):
+        """Open the file writer for the first table's schema"""
+        pass
+
+    def _write_table(self, table: "pa.Table") -> None:
+        if self.writer is None:
+            self.writer = self._open_writer(table.schema)
+        self.writer.write_table(table)
+
+    def publish(self, data: Dict[str, Any]) -> None:
+        self.publish_bulk([data])
+
+    def publish_bulk(self, data: List[Dict[str, Any]]) -> None:
+        if data:
+            self.publish_columns(records_to_columns(data))
+
+    def publish_columns(self, columns: Columns) -> None:
+        if columns:
+            self._write_table(self._to_table(columns))
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+class ParquetSinkParams(BaseModel):
+    path: str = Field(..., description="Path to the output Parquet file")
+    compression: Literal["none", "snappy", "gzip", "brotli", "lz4", "zstd"] = Field(
+        default="snappy", description="Compression codec"
+    )
+    compression_level: Optional[int] = Field(
+        default=None, description="Codec specific compression level"
+    )
+    row_group_size: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Rows per row group; by default every batch is a row group",
+    )
+
+
+class ParquetSink(ArrowFileSink):
+    """Writes records to a Parquet file.
+
+    With ``row_group_size``, batches are buffered and written in row groups of
+    that many rows, independent of the generator's batch size.
+    """
+
+    sink_name = "parquet"
+
+    def __init__(self, sink_params: Dict[str, Any]):
+        params = ParquetSinkParams.model_validate(sink_params)
+        super().__init__(params.path)
+        self.compression = params.compression
+        self.compression_level = params.compression_level
+        self.row_group_size = params.row_group_size
+        self.pending: List["pa.Table"] = []
+        self.pending_rows = 0
+
+    def _open_writer(self, schema: "pa.Schema"):
+        return pq.ParquetWriter(
+            self.filepath,
+            schema,
+            compression=self.compression,
+            compression_level=self.compression_level,
+        )
+
+    def _write_table(self, table: "pa.Table") -> None:
+        if self.row_group_size is None:
+            super()._write_table(table)
+            return
+        self.pending.append(table)
+        self.pending_rows += table.num_rows
+        if self.pending_rows >= self.row_group_size:
+            self._flush_pending(final=False)
+
+    def _flush_pending(self, final: bool) -> None:
+        if not self.pending:
+            return
+        table = pa.concat_tables(self.pending)
+        # Keep the incomplete tail for the next row group, unless closing
+        full_rows = table.num_rows
+        if not final:
+            full_rows -= table.num_rows % self.row_group_size
+        if self.writer is None:
+            self.writer = self._open_writer(table.schema)
+        self.writer.write_table(
+            table.slice(0, full_rows), row_group_size=self.row_group_size
+        )
+        tail = table.slice(full_rows)
+        self.pending = [tail] if tail.num_rows else []
+        self.pending_rows = tail.num_rows
+
+    def close(self) -> None:
+        self._flush_pending(final=True)
+        super().close()
+
+
+class ArrowSinkParams(BaseModel):
+    path: str = Field(..., description="Path to the output Arrow IPC file")
+    compression: Optional[Literal["lz4", "zstd"]] = Field(
+        default=None, description="Buffer compression codec"
+    )
+
+
+class ArrowSink(ArrowFileSink):
+    """Writes records to an Arrow IPC file (readable as Feather v2)"""
+
+    sink_name = "arrow"
+
+    def __init__(self, sink_params: Dict[str, Any]):
+        params = ArrowSinkParams.model_validate(sink_params)
+        super().__init__(params.path)
+        self.compression = params.compression
+
+    def _open_writer(self, schema: "pa.Schema"):
+        options = pa.ipc.IpcWriteOptions(compression=self.compression)
+        return pa.ipc.new_file(str(self.filepath), schema, options=options)
@@ -0,0 +1,125 @@
+from pathlib import Path
+from typing import Any, Dict, List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+from glassgen.schema.base import BaseSchema
+from glassgen.sinks.base import BaseSink
+
+try:
+    from fastavro import parse_schema
+    from fastavro.write import Writer
+except ImportError:  # pragma: no cover - fastavro is an optional dependency
+    parse_schema = None
+    Writer = None
+
+_AVRO_TYPES = {"int": "long", "float": "double", "bool": "boolean", "string": "string"}
+
+
+def _value_type_of(value: Any) -> Any:
+    """Infer a schema value type from a generated value"""
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int"
+    if isinstance(value, float):
+        return "float"
+    if isinstance(value, dict):
+        return {key: _value_type_of(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_value_type_of(value[0]) if value else "string"]
+    return "string"
+
+
+def _avro_type(value_type: Any, sample: Any, name: str) -> Any:
+    """Map a schema value type to an Avro type, inferring unknown types from a
+    sample value"""
+    if isinstance(value_type, dict) or isinstance(sample, dict):
+        nested_types = value_type if isinstance(value_type, dict) else {}
+        return _avro_record(nested_types, sample or {}, name)
+    if value_type is None:
+        value_type = _value_type_of(sample)
+    if isinstance(value_type, list):
+        item_type = value_type[0]
+        if item_type is None:
+            item_type = _value_type_of(sample[0]) if sample else "string"
+        return {"type": "array", "items": _AVRO_TYPES.get(item_type, "string")}
+    return _AVRO_TYPES.get(value_type, "string")
+
+
+def _avro_record(
+    value_types: Dict[str, Any], sample: Dict[str, Any], name: str
+) -> Dict[str, Any]:
+    names = list(value_types) or list(sample)
+    return {
+        "type": "record",
+        "name": name,
+        "fields": [
+            {
+                "name": field_name,
+                "type": _avro_type(
+                    value_types.get(field_name),
+                    sample.get(field_name),
+                    f"{name}_{field_name}",
+                ),
+            }
+            for field_name in names
+        ],
+    }
+
+
+class AvroSinkParams(BaseModel):
+    path: str = Field(..., description="Path to the output Avro container file")
+    codec: Literal["null", "deflate", "snappy", "zstandard", "bzip2", "xz"] = Field(
+        default="deflate", description="Block compression codec"
+    )
+    record_name: str = Field(default="Record", description="Avro record name")
+
+
+class AvroSink(BaseSink):
+    """Writes records to an Avro object container file.
+
+    The Avro schema is derived from the schema's generators; fields whose
+    type is unknown are inferred from the first record.
+    """
+
+    def __init__(self, sink_params: Dict[str, Any]):
+        if Writer is None:
+            raise ImportError(
+                "The avro sink requires fastavro: pip install glassgen[avro]"
+            )
+        params = AvroSinkParams.model_validate(sink_params)
+        self.filepath = Path(params.path)
+        self.codec = params.codec
+        self.record_name = params.record_name
+        self.value_types: Dict[str, Any] = {}
+        self.avro_schema: Optional[Dict[str, Any]] = None
+        self.file = None
+        self.writer = None
+
+    def set_schema(self, schema: BaseSchema) -> None:
+        self.value_types = schema.value_types() or {}
+
+    def _open(self, sample: Dict[str, Any]) -> None:
+        self.avro_schema = _avro_record(self.value_types, sample, self.record_name)
+        self.file = open(self.filepath, "wb")
+        self.writer = Writer(self.file, parse_schema(self.avro_schema), self.codec)
+
+    def publish(self, data: Dict[str, Any]) -> None:
+        self.publish_bulk([data])
+
+    def publish_bulk(self, data: List[Dict[str, Any]]) -> None:
+        if not data:
+            return
+        if self.writer is None:
+            self._open(data[0])
+        write = self.writer.write
+        for record in data:
+            write(record)
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.flush()
+            self.writer = None
+        if self.file:
+            self.file.close()
@@ -1,8 +1,14 @@
+import asyncio
 from abc import ABC, abstractmethod
 from typing import Any, Dict, List
 
+from glassgen.schema.base import BaseSchema, Columns, columns_to_records
+
 
 class BaseSink(ABC):
+    # Sinks that set this receive columnar batches through publish_columns()
+    supports_columns: bool = False
+
     @abstractmethod
     def publish(self, data: Dict[str, Any]) -> None:
         """Publish a single record to the sink"""
@@ -17,3 +23,42 @@ class BaseSink(ABC):
     def publish_bulk(self, data: List[Dict[str, Any]]) -> None:
         """Publish a bulk of records to the sink"""
         pass
+
+    def set_schema(self, schema: BaseSchema) -> None:  # noqa: B027
+        """Called with the schema being generated before anything is published.
+
+        Sinks that write typed files use it to derive their file schema.
+        """
+        pass
+
+    def publish_columns(self, columns: Columns) -> None:
+        """Publish a batch of records stored column by column.
+
+        Sinks that can write columns directly should override this and set
+        ``supports_columns``; the default transposes the batch into records.
+        """
+        self.publish_bulk(columns_to_records(columns))
+
+    async def apublish_bulk(self, data: List[Dict[str, Any]]) -> None:
+        """Async counterpart of ``publish_bulk`` used by ``agenerate()``.
+
+        The default runs ``publish_bulk`` in the loop's default executor so
+        blocking I/O does not stall the event loop; sinks with a non-blocking
+        client can override it.
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.publish_bulk, data)
+
+    async def apublish_columns(self, columns: Columns) -> None:
+        """Async counterpart of ``publish_columns``"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.publish_columns, columns)
+
+    async def aclose(self) -> None:
+        """Async counterpart of ``close``"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.close)
+
+    def stats(self) -> Dict[str, Any]:
+        """Sink statistics merged into the final response, read after close()"""
+        return {}
@@ -0,0 +1,156 @@
+import bz2
+import gzip
+import io
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import IO, Callable, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstandard is an optional dependency
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # pragma: no cover - lz4 is an optional dependency
+    lz4_frame = None
+
+Compression = Literal["gzip", "zstd", "lz4", "bz2"]
+
+DEFAULT_LEVELS = {"gzip": 6, "bz2": 9, "lz4": 0, "zstd": 3}
+
+# Uncompressed bytes handed to a compression thread at a time
+BLOCK_SIZE = 4 * 1024 * 1024
+
+
+class CompressionParams(BaseModel):
+    """File sink params controlling compressed output"""
+
+    compression: Optional[Compression] = Field(
+        default=None, description="Compress the output file"
+    )
+    compression_level: Optional[int] = Field(
+        default=None, description="Codec specific compression level"
+    )
+    compression_threads: int = Field(
+        default=1, ge=1, description="Threads compressing the output"
+    )
+
+
+class BlockCompressWriter(io.RawIOBase):
+    """Compress fixed-size blocks on a thread pool, writing them in order.
+
+    Every block is compressed into an independent gzip member / bz2 stream /
+    lz4 frame. Concatenated, they form a valid file that standard tools
+    decompress as one stream. The codecs release the GIL while compressing,
+    so blocks are compressed in parallel.
+    """
+
+    def __init__(
+        self,
+        raw: IO[bytes],
+        compress: Callable[[bytes], bytes],
+        threads: int,
+        block_size: int = BLOCK_SIZE,
+    ):
+        self.raw = raw
+        self.compress = compress
+        self.block_size = block_size
+        self.max_pending = threads * 2
+        self.buffer = bytearray()
+        self.pending: deque = deque()
+        self.executor = ThreadPoolExecutor(
+            max_workers=threads, thread_name_prefix="glassgen-compress"
+        )
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.buffer += data
+        while len(self.buffer) >= self.block_size:
+            block = bytes(self.buffer[: self.block_size])
+            del self.buffer[: self.block_size]
+            self._submit(block)
+        return len(data)
+
+    def _submit(self, block: bytes) -> None:
+        # Bound the blocks in flight so memory use stays flat
+        while len(self.pending) >= self.max_pending:
+            self.raw.write(self.pending.popleft().result())
+        self.pending.append(self.executor.submit(self.compress, block))
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        try:
+            if self.buffer:
+                self._submit(bytes(self.buffer))
+                self.buffer.clear()
+            while self.pending:
+                self.raw.write(self.pending.popleft().result())
+        finally:
+            self.executor.shutdown()
+            self.raw.close()
+            super().close()
+
+
+def _block_compressor(compression: str, level: int) -> Callable[[bytes], bytes]:
+    if compression == "gzip":
+        return lambda block: gzip.compress(block, level)
+    if compression == "bz2":
+        return lambda block: bz2.compress(block, level)
+    return lambda block: lz4_frame.compress(block, compression_level=level)
+
+
+def open_output(
+    path: Path,
+    compression: Optional[str] = None,
+    level: Optional[int] = None,
+    threads: int = 1,
+    buffer_size: int = io.DEFAULT_BUFFER_SIZE,
+    text: bool = False,
+) -> IO:
+    """Open a file sink's output for writing, optionally compressed.
+
+    Returns a binary file, or with ``text=True`` a UTF-8 text file that leaves
+    newlines untranslated (as the csv module expects).
+    """
+    if compression == "zstd" and zstandard is None:
+        raise ImportError("zstd compression requires zstandard: pip install zstandard")
+    if compression == "lz4" and lz4_frame is None:
+        raise ImportError("lz4 compression requires lz4: pip install lz4")
+
+    if compression is not None and level is None:
+        level = DEFAULT_LEVELS[compression]
+
+    if compression is None:
+        stream = open(path, "wb", buffering=buffer_size)
+    elif compression == "zstd":
+        # zstd compresses on its own worker threads
+        compressor = zstandard.ZstdCompressor(
+            level=level, threads=threads if threads > 1 else 0
+        )
+        stream = io.BufferedWriter(
+            compressor.stream_writer(open(path, "wb")), buffer_size
+        )
+    elif threads > 1:
+        block_writer = BlockCompressWriter(
+            open(path, "wb"), _block_compressor(compression, level), threads
+        )
+        stream = io.BufferedWriter(block_writer, buffer_size)
+    elif compression == "gzip":
+        stream = io.BufferedWriter(gzip.open(path, "wb", level), buffer_size)
+    elif compression == "bz2":
+        stream = io.BufferedWriter(bz2.open(path, "wb", level), buffer_size)
+    else:
+        stream = io.BufferedWriter(
+            lz4_frame.open(path, "wb", compression_level=level), buffer_size
+        )
+
+    if text:
+        return io.TextIOWrapper(stream, encoding="utf-8", newline="")
+    return stream
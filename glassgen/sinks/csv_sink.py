@@ -1,87 +1,155 @@
 import csv
+from operator import itemgetter
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from pydantic import BaseModel, Field
+from pydantic import Field
 
+from glassgen.schema.base import BaseSchema, Columns
 from glassgen.sinks.base import BaseSink
+from glassgen.sinks.compression import CompressionParams, open_output
 
+# Path of keys leading to a value in a (nested) record
+FieldPath = Tuple[str, ...]
 
-class CSVSinkParams(BaseModel):
+
+class CSVSinkParams(CompressionParams):
     path: str = Field(..., description="Path to the output CSV file")
+    buffer_size: int = Field(
+        default=1024 * 1024, ge=1, description="File write buffer size in bytes"
+    )
+
+
+def _leaf_paths(tree: Dict[str, Any], prefix: FieldPath = ()) -> List[FieldPath]:
+    """Collect the path of every leaf of a nested dict: a record, a batch of
+    columns or a schema's value types"""
+    paths = []
+    for key, value in tree.items():
+        if isinstance(value, dict):
+            paths.extend(_leaf_paths(value, prefix + (key,)))
+        else:
+            paths.append(prefix + (key,))
+    return paths
+
+
+def _path_getter(path: FieldPath) -> Callable[[Dict[str, Any]], Any]:
+    """Compile a path into a callable that fetches its value from a record"""
+    if len(path) == 1:
+        return itemgetter(path[0])
+
+    def get(record: Dict[str, Any]) -> Any:
+        for key in path:
+            record = record[key]
+        return record
+
+    return get
+
+
+def _row_getter(paths: List[FieldPath]) -> Callable[[Dict[str, Any]], Any]:
+    """Compile the paths into a callable turning a record into a CSV row"""
+    if all(len(path) == 1 for path in paths):
+        # Flat schemas: one C-level call per row
+        getter = itemgetter(*(path[0] for path in paths))
+        if len(paths) == 1:
+            return lambda record: (getter(record),)
+        return getter
+    getters = [_path_getter(path) for path in paths]
+    return lambda record: [get(record) for get in getters]
+
+
+def _lenient_row(paths: List[FieldPath], record: Dict[str, Any]) -> List[Any]:
+    """Build a row from a record that may lack some columns, leaving them
+    empty as csv.DictWriter does"""
+    row = []
+    for path in paths:
+        value: Any = record
+        for key in path:
+            value = value.get(key, "") if isinstance(value, dict) else ""
+        row.append(value)
+    return row
 
 
 class CSVSink(BaseSink):
+    """Writes records to a CSV file, flattening nested fields.
+
+    Nested keys are joined with ``_`` (``{"user": {"name": ...}}`` becomes a
+    ``user_name`` column). The columns are derived once, from the schema when
+    it is known and otherwise from the first published batch; rows are then
+    written positionally with ``csv.writer``. Columns missing from a record
+    are left empty.
+    """
+
+    supports_columns = True
+
     def __init__(self, sink_params: Dict[str, Any]):
         params = CSVSinkParams.model_validate(sink_params)
         self.filepath = Path(params.path)
+        self.buffer_size = params.buffer_size
+        self.compression = params.compression
+        self.compression_level = params.compression_level
+        self.compression_threads = params.compression_threads
+        self.paths: Optional[List[FieldPath]] = None
+        self.fieldnames: Optional[List[str]] = None
+        self.row_of: Optional[Callable[[Dict[str, Any]], Any]] = None
         self.writer = None
         self.file = None
-        self.fieldnames = None
-
-    def _flatten_dict(
-        self, data: Dict[str, Any], parent_key: str = "", sep: str = "_"
-    ) -> Dict[str, Any]:
-        """
-        Flatten a nested dictionary by concatenating keys with separator.
-
-        Args:
-            data: The dictionary to flatten
-            parent_key: The parent key prefix
-            sep: Separator to use between nested keys
-
-        Returns:
-            Flattened dictionary with concatenated keys
-        """
-        items = []
-        for key, value in data.items():
-            new_key = f"{parent_key}{sep}{key}" if parent_key else key
-            if isinstance(value, dict):
-                # Recursively flatten nested dictionaries
-                items.extend(self._flatten_dict(value, new_key, sep=sep).items())
-            else:
-                items.append((new_key, value))
-        return dict(items)
-
-    def _get_flattened_fieldnames(self, data: List[Dict[str, Any]]) -> List[str]:
-        """
-        Get fieldnames from flattened data to ensure consistent column order.
-
-        Args:
-            data: List of dictionaries to process
-
-        Returns:
-            List of fieldnames for CSV header
-        """
-        all_keys = set()
-        for item in data:
-            flattened = self._flatten_dict(item)
-            all_keys.update(flattened.keys())
-        return sorted(list(all_keys))
 
-    def publish(self, data: Dict[str, Any]) -> None:
-        # Flatten the data before writing
-        flattened_data = self._flatten_dict(data)
+    def set_schema(self, schema: BaseSchema) -> None:
+        value_types = schema.value_types()
+        if value_types:
+            self.paths = _leaf_paths(value_types)
+
+    def _open(self, sample: Optional[Dict[str, Any]] = None) -> None:
+        if self.paths is None:
+            self.paths = _leaf_paths(sample or {})
+        self.fieldnames = ["_".join(path) for path in self.paths]
+        self.row_of = _row_getter(self.paths)
+        self.file = open_output(
+            self.filepath,
+            self.compression,
+            self.compression_level,
+            self.compression_threads,
+            self.buffer_size,
+            text=True,
+        )
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(self.fieldnames)
 
+    def publish(self, data: Dict[str, Any]) -> None:
         if self.writer is None:
-            self.file = open(self.filepath, "w", newline="")
-            self.fieldnames = list(flattened_data.keys())
-            self.writer = csv.DictWriter(self.file, fieldnames=self.fieldnames)
-            self.writer.writeheader()
-
-        self.writer.writerow(flattened_data)
+            self._open(data)
+        try:
+            row = self.row_of(data)
+        except (KeyError, TypeError):
+            row = _lenient_row(self.paths, data)
+        self.writer.writerow(row)
 
     def publish_bulk(self, data: List[Dict[str, Any]]) -> None:
+        if not data:
+            return
+        if self.writer is None:
+            self._open(data[0])
+        try:
+            rows = list(map(self.row_of, data))
+        except (KeyError, TypeError):
+            # Records of other shapes: look every column up leniently
+            rows = [_lenient_row(self.paths, record) for record in data]
+        self.writer.writerows(rows)
+
+    def publish_columns(self, columns: Columns) -> None:
         if self.writer is None:
-            self.file = open(self.filepath, "w", newline="")
-            # Get fieldnames from all data to ensure consistent columns
-            self.fieldnames = self._get_flattened_fieldnames(data)
-            self.writer = csv.DictWriter(self.file, fieldnames=self.fieldnames)
-            self.writer.writeheader()
-
-        # Flatten each record before writing
-        flattened_data = [self._flatten_dict(item) for item in data]
-        self.writer.writerows(flattened_data)
+            if self.paths is None:
+                self.paths = _leaf_paths(columns)
+            self._open()
+
+        def column_at(path: FieldPath) -> List[Any]:
+            column = columns
+            for key in path:
+                column = column[key]
+            return column
+
+        # Rows are written positionally in header order, no per-row dicts needed
+        self.writer.writerows(zip(*(column_at(path) for path in self.paths)))
 
     def close(self) -> None:
         if self.file:
@@ -1,10 +1,17 @@
+import asyncio
 import json
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Literal, Optional
 
 from confluent_kafka import Producer
 from pydantic import BaseModel, Field
 
 from .base import BaseSink
+from .serializers import get_serializer
+
+# Number of distinct delivery error messages kept in the stats
+MAX_ERROR_KINDS = 10
+# Seconds the async producer yields to the event loop while its queue is full
+BUFFER_FULL_WAIT = 0.01
 
 
 class KafkaSinkParams(BaseModel):
@@ -12,36 +19,141 @@ class KafkaSinkParams(BaseModel):
         ..., description="Kafka bootstrap servers", alias="bootstrap.servers"
     )
     topic: str = Field(..., description="Kafka topic to publish to", exclude=True)
+    delivery: Literal["stream", "batch"] = Field(
+        default="stream",
+        description=(
+            "'stream' only flushes on close, 'batch' waits for every batch to be "
+            "delivered before the next one is generated"
+        ),
+        exclude=True,
+    )
+    serializer: str = Field(
+        default="json", description="JSON serializer backend", exclude=True
+    )
+    flush_timeout: float = Field(
+        default=30.0,
+        gt=0,
+        description="Seconds to wait for outstanding messages when flushing",
+        exclude=True,
+    )
     model_config = {"populate_by_name": True, "extra": "allow"}
 
 
 class KafkaSink(BaseSink):
-    def __init__(self, sink_params: Dict[str, Any]):
+    def __init__(
+        self,
+        sink_params: Dict[str, Any],
+        producers: Optional[Dict[str, Any]] = None,
+        producer: Optional[Any] = None,
+    ):
+        """
+        Args:
+            sink_params: Kafka client config plus the sink params
+            producers: Optional cache of producers shared between sinks; sinks
+                with the same client config then use one producer (and one
+                set of broker connections) for all their topics
+            producer: Optional ready-made producer to publish with instead of
+                creating one from the client config
+        """
         self.params = KafkaSinkParams.model_validate(sink_params)
         self.topic = self.params.topic
+        self.delivery = self.params.delivery
+        self.flush_timeout = self.params.flush_timeout
+        self.serializer = get_serializer(self.params.serializer)
         config = self.params.model_dump(by_alias=True)
-        self.producer = Producer(config)
+        if producer is not None:
+            self.producer = producer
+        elif producers is None:
+            self.producer = Producer(config)
+        else:
+            key = json.dumps(config, sort_keys=True, default=str)
+            if key not in producers:
+                producers[key] = Producer(config)
+            self.producer = producers[key]
+        self.delivered = 0
+        self.failed = 0
+        self.undelivered = 0
+        self.errors: Dict[str, int] = {}
 
     def delivery_report(self, err, msg):
-        """Reports message delivery status."""
-        if err:
-            print(f"❌ Message delivery failed: {err}")
-        else:
-            pass
+        """Count the delivery result of a message"""
+        if err is None:
+            self.delivered += 1
+            return
+        self.failed += 1
+        error = str(err)
+        if error in self.errors or len(self.errors) < MAX_ERROR_KINDS:
+            self.errors[error] = self.errors.get(error, 0) + 1
+
+    def _produce(self, value: bytes) -> None:
+        while True:
+            try:
+                self.producer.produce(
+                    self.topic, value=value, callback=self.delivery_report
+                )
+                return
+            except BufferError:
+                # Local queue is full: serve delivery reports to make room
+                self.producer.poll(0.1)
+
+    def _encode(self, records: List[Any]) -> List[bytes]:
+        """Encode records as JSON; strings are sent as they are"""
+        if not any(isinstance(record, str) for record in records):
+            return self.serializer.dumps_batch(records)
+        return [
+            record.encode("utf-8")
+            if isinstance(record, str)
+            else self.serializer.dumps(record)
+            for record in records
+        ]
 
     def publish(self, record: Dict[str, Any]) -> None:
         self.publish_bulk([record])
 
     def publish_bulk(self, records: List[Dict[str, Any]]) -> None:
-        for msg in records:
-            message_value = json.dumps(msg) if isinstance(msg, dict) else msg
-            self.producer.produce(
-                self.topic,
-                value=message_value.encode("utf-8"),
-                callback=self.delivery_report,
-            )
-            self.producer.poll(0)  # Trigger message delivery
-        self.producer.flush()  # Ensure all messages are sent
+        for value in self._encode(records):
+            self._produce(value)
+        # Serve delivery callbacks without waiting on the broker
+        self.producer.poll(0)
+        if self.delivery == "batch":
+            self.flush()
+
+    async def apublish_bulk(self, records: List[Dict[str, Any]]) -> None:
+        """Produce without blocking the event loop.
+
+        ``produce`` only queues messages locally; when the queue is full the
+        loop is given back while delivery reports drain it.
+        """
+        for value in self._encode(records):
+            while True:
+                try:
+                    self.producer.produce(
+                        self.topic, value=value, callback=self.delivery_report
+                    )
+                    break
+                except BufferError:
+                    self.producer.poll(0)
+                    await asyncio.sleep(BUFFER_FULL_WAIT)
+        self.producer.poll(0)
+        if self.delivery == "batch":
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self.flush)
+
+    def flush(self) -> int:
+        """Wait for outstanding messages; returns how many are still queued"""
+        remaining = self.producer.flush(self.flush_timeout)
+        self.undelivered = remaining or 0
+        return self.undelivered
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "delivery": {
+                "delivered": self.delivered,
+                "failed": self.failed,
+                "undelivered": self.undelivered,
+                "errors": dict(self.errors),
+            }
+        }
 
     def close(self) -> None:
-        self.producer.flush()
+        self.flush()
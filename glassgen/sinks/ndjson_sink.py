@@ -1,34 +1,45 @@
-import json
 from pathlib import Path
 from typing import Any, Dict, List
 
-from pydantic import BaseModel, Field
+from pydantic import Field
 
 from glassgen.sinks.base import BaseSink
+from glassgen.sinks.compression import CompressionParams, open_output
+from glassgen.sinks.serializers import get_serializer
 
 
-class NDJSONSinkParams(BaseModel):
+class NDJSONSinkParams(CompressionParams):
     path: str = Field(..., description="Path to the output NDJSON file")
+    serializer: str = Field(default="json", description="JSON serializer backend")
 
 
 class NDJSONSink(BaseSink):
     def __init__(self, sink_params: Dict[str, Any]):
         params = NDJSONSinkParams.model_validate(sink_params)
         self.filepath = Path(params.path)
+        self.serializer = get_serializer(params.serializer)
+        self.compression = params.compression
+        self.compression_level = params.compression_level
+        self.compression_threads = params.compression_threads
         self.file = None
 
     def _open(self) -> None:
         if self.file is None:
-            self.file = open(self.filepath, "w")
+            self.file = open_output(
+                self.filepath,
+                self.compression,
+                self.compression_level,
+                self.compression_threads,
+            )
 
     def publish(self, data: Dict[str, Any]) -> None:
         self._open()
-        self.file.write(json.dumps(data) + "\n")
+        self.file.write(self.serializer.dumps(data) + b"\n")
 
     def publish_bulk(self, data: List[Dict[str, Any]]) -> None:
         self._open()
-        for record in data:
-            self.file.write(json.dumps(record) + "\n")
+        # One encode call and one write per batch
+        self.file.write(self.serializer.dumps_lines(data))
 
     def close(self) -> None:
         if self.file:
@@ -0,0 +1,229 @@
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Type
+
+from pydantic import BaseModel, Field
+
+from glassgen.schema.base import BaseSchema, Columns, columns_length, slice_columns
+from glassgen.sinks.base import BaseSink
+
+# Params handled by the rolling sink rather than the file sink it wraps
+ROTATE_PARAMS = ("rotate_records", "rotate_bytes", "rotate_seconds")
+ROLLING_PARAMS = set(ROTATE_PARAMS) | {"writers"}
+
+
+class RollingParams(BaseModel):
+    """Params that turn a file sink into a rolling file sink"""
+
+    path: str = Field(..., description="Path template of the output files")
+    rotate_records: Optional[int] = Field(
+        default=None, ge=1, description="Start a new file after this many records"
+    )
+    rotate_bytes: Optional[int] = Field(
+        default=None, ge=1, description="Start a new file once it reaches this size"
+    )
+    rotate_seconds: Optional[float] = Field(
+        default=None, gt=0, description="Start a new file after this many seconds"
+    )
+    writers: int = Field(
+        default=1, ge=1, description="Files written in parallel by a writer pool"
+    )
+
+    @property
+    def rotates(self) -> bool:
+        return any(getattr(self, name) is not None for name in ROTATE_PARAMS)
+
+
+def is_rolling(sink_params: Dict[str, Any]) -> bool:
+    """Whether file sink params ask for rolling output"""
+    return (
+        any(sink_params.get(name) is not None for name in ROTATE_PARAMS)
+        or sink_params.get("writers", 1) > 1
+        or "{" in str(sink_params.get("path", ""))
+    )
+
+
+def render_path(template: str, part: int) -> str:
+    """Fill a path template such as 'events/dt={date}/part-{n:05d}.ndjson'"""
+    now = datetime.now()
+    return template.format(
+        n=part,
+        date=now.strftime("%Y-%m-%d"),
+        hour=now.strftime("%H"),
+        time=now.strftime("%H%M%S"),
+        timestamp=int(now.timestamp()),
+    )
+
+
+class _Part:
+    """A file being written: its sink, final path and progress"""
+
+    def __init__(self, sink: BaseSink, path: Path, tmp_path: Path, number: int):
+        self.sink = sink
+        self.path = path
+        self.tmp_path = tmp_path
+        self.number = number
+        self.records = 0
+        self.opened_at = time.monotonic()
+
+
+class RollingFileSink(BaseSink):
+    """Split the output of a file sink into a sequence of files.
+
+    A new file is started when the current one holds ``rotate_records``
+    records, reaches ``rotate_bytes`` bytes on disk or has been open for
+    ``rotate_seconds``, and whenever the date/time placeholders of the path
+    template render differently. Files are written under a hidden
+    ``.<name>.inprogress`` name and renamed once complete, so downstream
+    loaders only ever see finished files. Record limits are exact; size and
+    time limits are checked between batches, and the size does not count data
+    still buffered by the file sink.
+
+    With ``writers`` above 1, batches are spread round-robin over that many
+    files, each written by its own thread.
+    """
+
+    def __init__(self, sink_class: Type[BaseSink], sink_params: Dict[str, Any]):
+        params = RollingParams.model_validate(sink_params)
+        if (params.rotates or params.writers > 1) and "{n" not in params.path:
+            raise ValueError(
+                "Rolling file output needs a path template with an {n} part "
+                f"number placeholder: {params.path}"
+            )
+        try:
+            render_path(params.path, 0)
+        except (KeyError, IndexError, ValueError) as e:
+            raise ValueError(f"Invalid path template: {params.path}") from e
+
+        self.sink_class = sink_class
+        self.sink_params = {
+            key: value
+            for key, value in sink_params.items()
+            if key not in ROLLING_PARAMS
+        }
+        self.template = params.path
+        self.rotate_records = params.rotate_records
+        self.rotate_bytes = params.rotate_bytes
+        self.rotate_seconds = params.rotate_seconds
+        self.supports_columns = sink_class.supports_columns
+        self.schema: Optional[BaseSchema] = None
+        self.files: List[str] = []
+        self.next_part = 0
+        self.lock = threading.Lock()
+
+        self.parts: List[Optional[_Part]] = [None] * params.writers
+        self.executors = [
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"glassgen-writer-{i}")
+            for i in range(params.writers if params.writers > 1 else 0)
+        ]
+        self.pending: List[Optional[Future]] = [None] * len(self.executors)
+        self.turn = 0
+
+    def set_schema(self, schema: BaseSchema) -> None:
+        self.schema = schema
+
+    def _open_part(self) -> _Part:
+        with self.lock:
+            number = self.next_part
+            self.next_part += 1
+        path = Path(render_path(self.template, number))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.inprogress")
+        sink = self.sink_class({**self.sink_params, "path": str(tmp_path)})
+        if self.schema is not None:
+            sink.set_schema(self.schema)
+        return _Part(sink, path, tmp_path, number)
+
+    def _close_part(self, writer: int) -> None:
+        part = self.parts[writer]
+        self.parts[writer] = None
+        part.sink.close()
+        if part.tmp_path.exists():
+            os.replace(part.tmp_path, part.path)
+            with self.lock:
+                self.files.append(str(part.path))
+
+    def _should_rotate(self, part: _Part) -> bool:
+        if self.rotate_records is not None and part.records >= self.rotate_records:
+            return True
+        if (
+            self.rotate_seconds is not None
+            and time.monotonic() - part.opened_at >= self.rotate_seconds
+        ):
+            return True
+        if (
+            self.rotate_bytes is not None
+            and part.tmp_path.exists()
+            and part.tmp_path.stat().st_size >= self.rotate_bytes
+        ):
+            return True
+        # Date/time placeholders moved on to a new partition
+        # Compared as paths: Path() normalizes e.g. a leading "./"
+        return Path(render_path(self.template, part.number)) != part.path
+
+    def _write(self, writer: int, batch: Any, columnar: bool) -> None:
+        total = columns_length(batch) if columnar else len(batch)
+        offset = 0
+        while offset < total:
+            part = self.parts[writer]
+            if part is not None and self._should_rotate(part):
+                self._close_part(writer)
+                part = None
+            if part is None:
+                part = self.parts[writer] = self._open_part()
+
+            count = total - offset
+            if self.rotate_records is not None:
+                count = min(count, self.rotate_records - part.records)
+            if columnar:
+                part.sink.publish_columns(slice_columns(batch, offset, offset + count))
+            elif offset == 0 and count == total:
+                part.sink.publish_bulk(batch)
+            else:
+                part.sink.publish_bulk(batch[offset : offset + count])
+            part.records += count
+            offset += count
+
+            if self._should_rotate(part):
+                self._close_part(writer)
+
+    def _dispatch(self, batch: Any, columnar: bool) -> None:
+        if not self.executors:
+            self._write(0, batch, columnar)
+            return
+        writer = self.turn % len(self.executors)
+        self.turn += 1
+        # Wait for this writer's previous batch, surfacing its errors
+        if self.pending[writer] is not None:
+            self.pending[writer].result()
+        self.pending[writer] = self.executors[writer].submit(
+            self._write, writer, batch, columnar
+        )
+
+    def publish(self, data: Dict[str, Any]) -> None:
+        self.publish_bulk([data])
+
+    def publish_bulk(self, data: List[Dict[str, Any]]) -> None:
+        self._dispatch(data, columnar=False)
+
+    def publish_columns(self, columns: Columns) -> None:
+        self._dispatch(columns, columnar=True)
+
+    def close(self) -> None:
+        try:
+            for future in self.pending:
+                if future is not None:
+                    future.result()
+        finally:
+            for executor in self.executors:
+                executor.shutdown()
+            for writer, part in enumerate(self.parts):
+                if part is not None:
+                    self._close_part(writer)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"files_written": len(self.files)}
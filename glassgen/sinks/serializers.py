@@ -0,0 +1,106 @@
+import json
+from typing import Any, Dict, List
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional dependency
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - msgspec is an optional dependency
+    msgspec = None
+
+
+def _default(value: Any) -> Any:
+    # Dates and times as ISO 8601, like orjson and msgspec; anything else as str
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+class Serializer:
+    """Encodes records to JSON bytes.
+
+    ``dumps_batch`` returns one payload per record (e.g. Kafka messages) and
+    ``dumps_lines`` a single newline-delimited blob (e.g. NDJSON). Dates and
+    times are encoded as ISO 8601 strings and other values that are not JSON
+    types with ``str()``. This standard library backend keeps the
+    ``json.dumps`` defaults; orjson and msgspec write compact UTF-8 JSON.
+    """
+
+    name = "json"
+
+    def dumps(self, record: Any) -> bytes:
+        # json.dumps defaults, so the output matches what the sinks always wrote
+        return json.dumps(record, default=_default).encode("utf-8")
+
+    def dumps_batch(self, records: List[Any]) -> List[bytes]:
+        return [self.dumps(record) for record in records]
+
+    def dumps_lines(self, records: List[Any]) -> bytes:
+        if not records:
+            return b""
+        return b"\n".join(self.dumps_batch(records)) + b"\n"
+
+
+class OrjsonSerializer(Serializer):
+    name = "orjson"
+
+    def dumps(self, record: Any) -> bytes:
+        return orjson.dumps(record, default=str)
+
+    def dumps_batch(self, records: List[Any]) -> List[bytes]:
+        dumps = orjson.dumps
+        return [dumps(record, default=str) for record in records]
+
+
+class MsgspecSerializer(Serializer):
+    name = "msgspec"
+
+    def __init__(self):
+        self.encoder = msgspec.json.Encoder(enc_hook=str)
+
+    def dumps(self, record: Any) -> bytes:
+        return self.encoder.encode(record)
+
+    def dumps_batch(self, records: List[Any]) -> List[bytes]:
+        encode = self.encoder.encode
+        return [encode(record) for record in records]
+
+    def dumps_lines(self, records: List[Any]) -> bytes:
+        return self.encoder.encode_lines(records)
+
+
+_SERIALIZERS: Dict[str, type] = {
+    "json": Serializer,
+    "orjson": OrjsonSerializer,
+    "msgspec": MsgspecSerializer,
+}
+_MODULES = {"json": json, "orjson": orjson, "msgspec": msgspec}
+
+
+def available_serializers() -> List[str]:
+    """Names of the serializers whose backend is installed"""
+    return [name for name in _SERIALIZERS if _MODULES[name] is not None]
+
+
+def get_serializer(name: str = "auto") -> Serializer:
+    """Return a serializer by name.
+
+    ``"auto"`` picks the fastest installed backend: orjson, then msgspec, then
+    the standard library.
+    """
+    if name == "auto":
+        for candidate in ("orjson", "msgspec"):
+            if _MODULES[candidate] is not None:
+                return _SERIALIZERS[candidate]()
+        return Serializer()
+    if name not in _SERIALIZERS:
+        raise ValueError(
+            f"Unknown serializer: {name}. Supported serializers are: "
+            f"auto, {', '.join(_SERIALIZERS)}"
+        )
+    if _MODULES[name] is None:
+        raise ValueError(f"Serializer '{name}' requires the {name} package")
+    return _SERIALIZERS[name]()
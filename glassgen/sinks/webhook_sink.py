@@ -1,9 +1,17 @@
-from typing import Any, Dict, List
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Literal, Optional
 
 import requests
 from pydantic import BaseModel, Field
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from .base import BaseSink
+from .serializers import get_serializer
+
+# Statuses that are retried with backoff
+RETRY_STATUSES = (429, 500, 502, 503, 504)
 
 
 class WebHookSinkParams(BaseModel):
@@ -12,14 +20,40 @@ class WebHookSinkParams(BaseModel):
         default_factory=dict, description="HTTP headers for the request"
     )
     timeout: int = Field(default=30, ge=1, description="Request timeout in seconds")
+    serializer: str = Field(default="json", description="JSON serializer backend")
+    concurrency: int = Field(
+        default=1, ge=1, description="Requests in flight at the same time"
+    )
+    batch_size: int = Field(
+        default=1,
+        ge=1,
+        description="Records per request; above 1 the body holds a batch",
+    )
+    batch_format: Literal["json", "ndjson"] = Field(
+        default="json",
+        description="Batch body: a JSON array or newline-delimited JSON",
+    )
+    retries: int = Field(
+        default=3, ge=0, description="Retries on connection errors and 429/5xx"
+    )
+    backoff_factor: float = Field(
+        default=0.5, ge=0, description="Exponential backoff between retries"
+    )
 
 
 class WebHookSink(BaseSink):
     """
     A sink that sends data to a webhook URL using HTTP POST requests.
+
+    Requests go through a pooled ``requests.Session``, up to ``concurrency``
+    at a time, and failed requests are retried with exponential backoff.
     """
 
-    def __init__(self, sink_params: Dict[str, Any]):
+    def __init__(
+        self,
+        sink_params: Dict[str, Any],
+        sessions: Optional[Dict[str, requests.Session]] = None,
+    ):
         """
         Initialize the WebHook sink.
 
@@ -29,17 +63,84 @@ class WebHookSink(BaseSink):
                 - params: {
                     "url": str,
                     "headers": Dict[str, str] (optional),
-                    "timeout": int (optional, defaults to 30)
+                    "timeout": int (optional, defaults to 30),
+                    "serializer": str (optional, defaults to "json"),
+                    "concurrency": int (optional, defaults to 1),
+                    "batch_size": int (optional, defaults to 1),
+                    "batch_format": "json" | "ndjson" (optional),
+                    "retries": int (optional, defaults to 3),
+                    "backoff_factor": float (optional, defaults to 0.5)
                 }
+            sessions (Dict[str, requests.Session], optional): Cache of sessions
+                shared between sinks with the same pool and retry settings.
+                Shared sessions are left open on close() for their owner to
+                close.
         """
         params = WebHookSinkParams.model_validate(sink_params)
         self.url = params.url
         self.headers = params.headers
         self.timeout = params.timeout
+        self.serializer = get_serializer(params.serializer)
+        self.concurrency = params.concurrency
+        self.batch_size = params.batch_size
+        self.batch_format = params.batch_format
+        self.requests_sent = 0
 
         # Ensure content-type is set
         if "Content-Type" not in self.headers:
-            self.headers["Content-Type"] = "application/json"
+            if self.batch_size > 1 and self.batch_format == "ndjson":
+                self.headers["Content-Type"] = "application/x-ndjson"
+            else:
+                self.headers["Content-Type"] = "application/json"
+
+        self.owns_session = sessions is None
+        if sessions is None:
+            self.session = self._create_session(params)
+        else:
+            key = f"{params.concurrency}/{params.retries}/{params.backoff_factor}"
+            if key not in sessions:
+                sessions[key] = self._create_session(params)
+            self.session = sessions[key]
+        self.executor: Optional[ThreadPoolExecutor] = None
+        if self.concurrency > 1:
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.concurrency, thread_name_prefix="glassgen-webhook"
+            )
+
+    @staticmethod
+    def _create_session(params: WebHookSinkParams) -> requests.Session:
+        retry = Retry(
+            total=params.retries,
+            backoff_factor=params.backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=["POST"],
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_maxsize=params.concurrency, max_retries=retry)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _post(self, body: bytes) -> None:
+        try:
+            response = self.session.post(
+                self.url, data=body, headers=self.headers, timeout=self.timeout
+            )
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"Failed to publish to webhook: {str(e)}") from e
+
+    def _bodies(self, records: List[Dict[str, Any]]) -> List[bytes]:
+        if self.batch_size == 1:
+            return self.serializer.dumps_batch(records)
+        chunks = [
+            records[i : i + self.batch_size]
+            for i in range(0, len(records), self.batch_size)
+        ]
+        if self.batch_format == "ndjson":
+            return [self.serializer.dumps_lines(chunk) for chunk in chunks]
+        return [self.serializer.dumps(chunk) for chunk in chunks]
 
     def publish(self, record: Dict[str, Any]) -> None:
         """
@@ -48,23 +149,47 @@ class WebHookSink(BaseSink):
         Args:
             record (Dict[str, Any]): The record to publish
         """
-        try:
-            response = requests.post(
-                self.url, json=record, headers=self.headers, timeout=self.timeout
-            )
-            response.raise_for_status()
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"Failed to publish to webhook: {str(e)}") from e
+        self._post(self.serializer.dumps(record))
+        self.requests_sent += 1
 
     def publish_bulk(self, records: List[Dict[str, Any]]) -> None:
         """
-        Publish multiple records to the webhook URL.
+        Publish multiple records to the webhook URL, one request per record or
+        per ``batch_size`` records.
 
         Args:
             records (List[Dict[str, Any]]): List of records to publish
         """
-        for record in records:
-            self.publish(record)
+        bodies = self._bodies(records)
+        if self.executor is None:
+            for body in bodies:
+                self._post(body)
+        else:
+            # Consume the results so the first failure is raised here
+            for _ in self.executor.map(self._post, bodies):
+                pass
+        self.requests_sent += len(bodies)
+
+    async def apublish_bulk(self, records: List[Dict[str, Any]]) -> None:
+        """
+        Publish records from an event loop, keeping up to ``concurrency``
+        requests in flight on the sink's worker threads.
+        """
+        if self.executor is None:
+            await super().apublish_bulk(records)
+            return
+        loop = asyncio.get_running_loop()
+        bodies = self._bodies(records)
+        await asyncio.gather(
+            *(loop.run_in_executor(self.executor, self._post, body) for body in bodies)
+        )
+        self.requests_sent += len(bodies)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"requests_sent": self.requests_sent}
 
     def close(self) -> None:
-        pass
+        if self.executor is not None:
+            self.executor.shutdown()
+        if self.owns_session:
+            self.session.close()
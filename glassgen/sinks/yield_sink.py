@@ -1,18 +1,80 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Literal, Optional
 
+from pydantic import BaseModel, Field
+
+from glassgen.schema.base import Columns, columns_to_records, records_to_columns
 from glassgen.sinks.base import BaseSink
 
 
+class YieldSinkParams(BaseModel):
+    mode: Literal["record", "batch", "columns"] = Field(
+        default="record",
+        description="Yield single records, lists of records or columnar batches",
+    )
+    reuse_buffers: bool = Field(
+        default=False,
+        description="Refill the same batch containers in place for every batch",
+    )
+
+
+def _refill(buffer: Any, data: Any) -> Any:
+    """Copy ``data`` into ``buffer`` in place, keeping its containers"""
+    if (
+        isinstance(data, dict)
+        and isinstance(buffer, dict)
+        and buffer.keys() == data.keys()
+    ):
+        for key, value in data.items():
+            buffer[key] = _refill(buffer[key], value)
+        return buffer
+    if isinstance(data, list) and isinstance(buffer, list):
+        buffer[:] = data
+        return buffer
+    return data
+
+
 class YieldSink(BaseSink):
-    def __init__(self, sink_params: Dict[str, Any]):
-        pass
+    """
+    A sink that hands generated data back to the caller of ``generate()``.
+
+    In ``record`` mode the caller iterates over single records. In ``batch``
+    and ``columns`` mode it receives every batch as produced, a list of
+    records or a dict of columns, so it pays one resume per batch instead of
+    one per record. With ``reuse_buffers``, every batch is delivered in the
+    same containers, so a batch must be consumed (or copied) before asking
+    for the next one.
+    """
+
+    def __init__(self, sink_params: Optional[Dict[str, Any]]):
+        params = YieldSinkParams.model_validate(sink_params or {})
+        self.mode = params.mode
+        self.reuse_buffers = params.reuse_buffers
+        self.supports_columns = self.mode == "columns"
+        self.buffer: Any = None
+
+    def _deliver(self, batch: Any) -> Any:
+        if self.reuse_buffers:
+            self.buffer = _refill(self.buffer, batch)
+            return self.buffer
+        return batch
+
+    def publish(self, data: Dict[str, Any]) -> Iterator[Any]:
+        yield from self.publish_bulk([data])
 
-    def publish(self, data: Dict[str, Any]):
-        yield data
+    def publish_bulk(self, data: List[Dict[str, Any]]) -> Iterator[Any]:
+        if self.mode == "record":
+            yield from data
+        elif self.mode == "batch":
+            yield self._deliver(data)
+        else:
+            # Batches arrive as records when columnar generation is off
+            yield self._deliver(records_to_columns(data))
 
-    def publish_bulk(self, data: List[Dict[str, Any]]):
-        for item in data:
-            yield item
+    def publish_columns(self, columns: Columns) -> Iterator[Any]:
+        if self.mode == "columns":
+            yield self._deliver(columns)
+        else:
+            yield from self.publish_bulk(columns_to_records(columns))
 
     def close(self) -> None:
         pass
@@ -81,7 +81,7 @@ def temp_ndjson_file():
 @pytest.fixture
 def mock_webhook():
     """Fixture for mocking webhook requests"""
-    with patch("requests.post") as mock_post:
+    with patch("requests.Session.post") as mock_post:
         mock_response = Mock()
         mock_response.raise_for_status.return_value = None
         mock_post.return_value = mock_response
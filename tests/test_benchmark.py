@@ -0,0 +1,88 @@
+import time
+
+from glassgen.benchmark import (
+    SCHEMAS,
+    bench_generators,
+    bench_sink,
+    compare_results,
+    run_benchmarks,
+)
+from glassgen.generator.generators import GeneratorType, registry
+from glassgen.schema import ConfigSchema
+from glassgen.schema.schema import NestedSchemaField
+
+
+def test_bench_generators_covers_every_generator():
+    results = bench_generators(20)
+    assert [r["name"] for r in results] == [g.value for g in GeneratorType]
+    for result in results:
+        assert result["records"] == 20
+        assert result["records_per_sec"] > 0
+        assert result["bytes"] > 0
+    assert "benchmark.id" not in registry._key_stores
+
+
+def test_bench_file_and_stand_in_sinks():
+    for sink_type in ("csv", "ndjson", "kafka", "webhook"):
+        result = bench_sink(sink_type, 10, batch_size=4)
+        assert result["suite"] == "sinks"
+        assert result["name"] == sink_type
+        assert result["bytes"] > 0
+
+
+def test_run_benchmarks_report_and_compare():
+    report = run_benchmarks(num_records=10, suites=["schemas"], columnar=True)
+    assert report["columnar"] is True
+    assert [r["name"] for r in report["results"]] == list(SCHEMAS)
+
+    comparison = compare_results(report, report)
+    assert len(comparison) == len(SCHEMAS)
+    assert all(row["change"] == 0 for row in comparison)
+
+
+def test_run_benchmarks_restores_registry_state():
+    """A benchmark run seeds the shared registry only for its own duration"""
+    registry.seed(7)
+    expected = (registry.random.random(), registry.get_generator("int")())
+    registry.seed(7)
+    run_benchmarks(num_records=10, suites=["schemas"])
+    assert (registry.random.random(), registry.get_generator("int")()) == expected
+
+
+def _walk_fields(fields):
+    """Record generation before schemas were compiled: a walk of the field tree"""
+    record = {}
+    for name, field in fields.items():
+        if isinstance(field, NestedSchemaField):
+            record[name] = _walk_fields(field.fields)
+            continue
+        generator = registry.get_generator(field.generator)
+        if field.generator == GeneratorType.CHOICE:
+            record[name] = generator(field.params)
+        else:
+            record[name] = generator(*field.params)
+    return record
+
+
+def test_compiled_records_are_not_slower_than_the_field_walk():
+    """A compiled schema generates records at least as fast as the tree walk"""
+    schema = ConfigSchema.from_dict(
+        {
+            "id": "$intrange(1,100)",
+            "age": "$intrange(18,65)",
+            "flags": {"active": "$boolean", "tier": "$choice(gold,silver)"},
+        }
+    )
+    schema.validate()
+
+    def best_of(func):
+        timings = []
+        for _ in range(5):
+            start = time.perf_counter()
+            for _ in range(2000):
+                func()
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+
+    walk = best_of(lambda: _walk_fields(schema.fields))
+    assert best_of(schema._generate_record) <= walk
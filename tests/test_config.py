@@ -31,6 +31,20 @@ def test_invalid_rps():
     assert "rps" in str(exc_info.value.details["errors"][0]).lower()
 
 
+def test_sharded_output_requires_workers():
+    """Test that sharded output is rejected for a single worker"""
+    invalid_config = {
+        "schema": {"name": "$name"},
+        "sink": {"type": "ndjson", "params": {"path": "/tmp/test.ndjson"}},
+        "generator": {"num_records": 10, "sharded_output": True},
+    }
+
+    with pytest.raises(ConfigError) as exc_info:
+        validate_config(invalid_config)
+
+    assert "workers" in str(exc_info.value.details["errors"][0])
+
+
 def test_invalid_duplication_ratio():
     """Test validation of invalid duplication ratio"""
     invalid_config = {
@@ -179,3 +193,68 @@ def test_yield_sink_no_params():
     )
     assert config.sink.type == "yield"
     assert config.sink.params is None
+
+
+def test_multi_stream_config():
+    """Test that a 'streams' config validates every stream"""
+
+    def stream(name, **overrides):
+        return {
+            "name": name,
+            "schema": {"id": "$uuid"},
+            "sink": {"type": "ndjson", "params": {"path": f"{name}.ndjson"}},
+            **overrides,
+        }
+
+    config = validate_config({"streams": [stream("orders"), stream("clicks")]})
+    assert [s.name for s in config.streams] == ["orders", "clicks"]
+    assert config.streams[0].generator.num_records == 100
+
+    invalid_configs = [
+        {"streams": [stream("orders"), stream("orders")]},
+        {"streams": [stream("orders", sink={"type": "yield"})]},
+        {"streams": [stream("orders", generator={"seed": 1})]},
+        {"streams": []},
+    ]
+    for invalid_config in invalid_configs:
+        with pytest.raises(ConfigError):
+            validate_config(invalid_config)
+
+
+def test_multi_stream_references():
+    """Test that $ref fields must reference a field of another stream"""
+
+    def stream(name, schema):
+        return {
+            "name": name,
+            "schema": schema,
+            "sink": {"type": "ndjson", "params": {"path": f"{name}.ndjson"}},
+        }
+
+    users = stream("users", {"id": "$sequence", "profile": {"region": "$country"}})
+    orders = stream(
+        "orders", {"user_id": "$ref(users.id)", "region": "$ref(users.profile.region)"}
+    )
+    config = validate_config({"streams": [orders, users]})
+    assert config.streams[0].references() == {
+        "user_id": "users.id",
+        "region": "users.profile.region",
+    }
+    assert config.streams[1].referenced_fields(config.streams) == [
+        "id",
+        "profile.region",
+    ]
+
+    invalid_streams = [
+        [stream("orders", {"user_id": "$ref(accounts.id)"}), users],
+        [stream("orders", {"user_id": "$ref(users.email)"}), users],
+        [stream("orders", {"user_id": "$ref(users.profile)"}), users],
+        [stream("users", {"id": "$sequence", "manager": "$ref(users.id)"})],
+        [
+            stream("a", {"id": "$sequence", "b_id": "$ref(b.id)"}),
+            stream("b", {"id": "$sequence", "a_id": "$ref(a.id)"}),
+        ],
+    ]
+    for streams in invalid_streams:
+        with pytest.raises(ConfigError):
+            validate_config({"streams": streams})
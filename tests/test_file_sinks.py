@@ -0,0 +1,193 @@
+import pytest
+
+from glassgen import generate
+from glassgen.schema import ConfigSchema
+from glassgen.sinks import (
+    ArrowSink,
+    AvroSink,
+    ParquetSink,
+    RollingFileSink,
+    SinkFactory,
+)
+
+SCHEMA = {
+    "id": "$sequence",
+    "name": "$name",
+    "score": "$price(1.0, 5.0)",
+    "active": "$boolean",
+    "tags": "$array(string, 2)",
+    "address": {"city": "$city", "zipcode": "$zipcode"},
+}
+
+
+def _config(sink_type, path, num_records=25):
+    return {
+        "schema": SCHEMA,
+        "sink": {"type": sink_type, "params": {"path": str(path)}},
+        "generator": {"num_records": num_records, "rps": 0, "seed": 7},
+    }
+
+
+def test_parquet_sink_types_from_schema(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path / "out.parquet"
+    generate(_config("parquet", path))
+
+    table = pq.read_table(path)
+    assert table.num_rows == 25
+    assert table.schema.field("id").type == pa.int64()
+    assert table.schema.field("score").type == pa.float64()
+    assert table.schema.field("active").type == pa.bool_()
+    assert table.schema.field("tags").type == pa.list_(pa.string())
+    assert table.schema.field("address").type.num_fields == 2
+    assert table.column("id").to_pylist() == list(range(1, 26))
+
+
+def test_parquet_sink_row_group_size(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path / "out.parquet"
+    sink = ParquetSink({"path": str(path), "row_group_size": 10})
+    schema = ConfigSchema.from_dict({"id": "$sequence"})
+    sink.set_schema(schema)
+    for _ in range(5):
+        sink.publish_columns(schema._generate_columns(7))
+    sink.close()
+
+    metadata = pq.ParquetFile(path).metadata
+    assert metadata.num_rows == 35
+    assert [metadata.row_group(i).num_rows for i in range(4)] == [10, 10, 10, 5]
+
+
+def test_arrow_sink_infers_unknown_types(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    path = tmp_path / "out.arrow"
+    sink = ArrowSink({"path": str(path), "compression": "zstd"})
+    sink.publish_bulk([{"a": 1, "b": {"c": "x"}}, {"a": 2, "b": {"c": "y"}}])
+    sink.publish({"a": 3, "b": {"c": "z"}})
+    sink.close()
+
+    table = pa.ipc.open_file(str(path)).read_all()
+    assert table.to_pylist()[2] == {"a": 3, "b": {"c": "z"}}
+    assert table.schema.field("a").type == pa.int64()
+
+
+def test_avro_sink(tmp_path):
+    fastavro = pytest.importorskip("fastavro")
+    path = tmp_path / "out.avro"
+    generate(_config("avro", path))
+
+    with open(path, "rb") as f:
+        reader = fastavro.reader(f)
+        fields = {f["name"]: f["type"] for f in reader.writer_schema["fields"]}
+        records = list(reader)
+    assert len(records) == 25
+    assert fields["id"] == "long"
+    assert fields["score"] == "double"
+    assert fields["tags"] == {"type": "array", "items": "string"}
+    assert fields["address"]["type"] == "record"
+    assert set(records[0]["address"]) == {"city", "zipcode"}
+
+
+def test_avro_sink_without_schema(tmp_path):
+    fastavro = pytest.importorskip("fastavro")
+    path = tmp_path / "out.avro"
+    sink = AvroSink({"path": str(path), "codec": "null"})
+    sink.publish_bulk([{"n": 1, "f": 0.5, "tags": [1, 2]}])
+    sink.close()
+
+    with open(path, "rb") as f:
+        assert list(fastavro.reader(f)) == [{"n": 1, "f": 0.5, "tags": [1, 2]}]
+
+
+def _read_ndjson_parts(directory):
+    import json
+
+    parts = sorted(p for p in directory.rglob("*.ndjson"))
+    return parts, [[json.loads(line) for line in open(p)] for p in parts]
+
+
+def test_rolling_ndjson_by_record_count(tmp_path):
+    template = str(tmp_path / "events" / "dt={date}" / "part-{n:03d}.ndjson")
+    config = {
+        "schema": {"id": "$sequence"},
+        "sink": {"type": "ndjson", "params": {"path": template, "rotate_records": 40}},
+        "generator": {"num_records": 100, "rps": 0},
+    }
+    result = generate(config)
+
+    parts, contents = _read_ndjson_parts(tmp_path)
+    assert result["files_written"] == 3
+    assert [p.name for p in parts] == [
+        "part-000.ndjson",
+        "part-001.ndjson",
+        "part-002.ndjson",
+    ]
+    assert [len(c) for c in contents] == [40, 40, 20]
+    assert [r["id"] for c in contents for r in c] == list(range(1, 101))
+    assert not list(tmp_path.rglob("*.inprogress"))
+
+
+def test_rolling_csv_with_columns(tmp_path):
+    sink = SinkFactory.create(
+        "csv", {"path": str(tmp_path / "part-{n}.csv"), "rotate_records": 2}
+    )
+    assert isinstance(sink, RollingFileSink)
+    assert sink.supports_columns
+    sink.publish_columns({"a": [1, 2], "b": {"c": ["x", "y"]}})
+    sink.publish_columns({"a": [3], "b": {"c": ["z"]}})
+    sink.close()
+
+    assert (tmp_path / "part-0.csv").read_text().splitlines() == ["a,b_c", "1,x", "2,y"]
+    assert (tmp_path / "part-1.csv").read_text().splitlines() == ["a,b_c", "3,z"]
+
+
+def test_rolling_by_bytes(tmp_path):
+    sink = SinkFactory.create(
+        "ndjson", {"path": str(tmp_path / "part-{n}.ndjson"), "rotate_bytes": 5000}
+    )
+    for _ in range(3):
+        sink.publish_bulk([{"value": "x" * 50} for _ in range(200)])
+    sink.close()
+
+    _, contents = _read_ndjson_parts(tmp_path)
+    assert [len(c) for c in contents] == [200, 200, 200]
+
+
+def test_rolling_writer_pool(tmp_path):
+    sink = SinkFactory.create(
+        "ndjson",
+        {"path": str(tmp_path / "part-{n}.ndjson"), "writers": 3, "rotate_records": 4},
+    )
+    for i in range(10):
+        sink.publish_bulk([{"batch": i, "i": j} for j in range(3)])
+    sink.close()
+
+    _, contents = _read_ndjson_parts(tmp_path)
+    records = [r for c in contents for r in c]
+    assert len(records) == 30
+    assert all(len(c) <= 4 for c in contents)
+    assert sink.stats()["files_written"] == len(contents)
+
+
+def test_rolling_relative_template(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    config = {
+        "schema": {"id": "$sequence"},
+        "sink": {"type": "ndjson", "params": {"path": "./out/part-{n}.ndjson"}},
+        "generator": {"num_records": 50, "bulk_size": 10, "rps": 0},
+    }
+    result = generate(config)
+
+    # Without a rotation limit everything goes to one file
+    assert result["files_written"] == 1
+    parts, contents = _read_ndjson_parts(tmp_path / "out")
+    assert [p.name for p in parts] == ["part-0.ndjson"]
+    assert len(contents[0]) == 50
+
+
+def test_rolling_requires_part_number(tmp_path):
+    with pytest.raises(ValueError, match="{n}"):
+        SinkFactory.create(
+            "ndjson", {"path": str(tmp_path / "out.ndjson"), "rotate_records": 5}
+        )
@@ -1,51 +1,232 @@
-from datetime import datetime, timedelta
-from unittest.mock import MagicMock, patch
+import random
+import time
+from datetime import timedelta
+from functools import partial
+from types import SimpleNamespace
+from unittest.mock import MagicMock
 
-from glassgen.config import GeneratorConfig
-from glassgen.generator.batch_controller import DynamicBatchController
-from glassgen.generator.duplication import DuplicateController
+import pytest
+
+from glassgen.config import GeneratorConfig, RateProfileConfig
+from glassgen.generator.duplication import DuplicateController, RingBuffer
 from glassgen.generator.generator import Generator
+from glassgen.generator.pipeline import prefetch
+from glassgen.generator.rate_limiter import RateLimiter
+from glassgen.generator.rate_profile import (
+    PiecewiseProfile,
+    SineProfile,
+    SpikeProfile,
+    build_rate_profile,
+)
 from glassgen.schema.base import BaseSchema
 
 
-class TestDynamicBatchController:
-    def test_initial_batch_size(self):
-        """Test initial batch size calculation"""
-        max_batch_size = 100
-        controller = DynamicBatchController(target_rps=100)
-        batch_size = controller.get_batch_size(max_batch_size)
-        assert 1 <= batch_size <= max_batch_size
-
-    def test_batch_size_with_remaining_records(self):
-        """Test batch size calculation with remaining records"""
-        max_batch_size = 100
-        controller = DynamicBatchController(target_rps=100)
-        controller.records_sent = 50  # Half of target RPS used
-        batch_size = controller.get_batch_size(max_batch_size)
-        assert batch_size > 0
-        assert batch_size <= max_batch_size  # Should not exceed remaining records
-
-    def test_record_sent_updates_count(self):
-        """Test that record_sent updates the count correctly"""
-        controller = DynamicBatchController(target_rps=100)
-        controller.record_sent(10)
-        assert controller.records_sent == 10
-
-    @patch("time.sleep")
-    def test_sleep_if_needed(self, mock_sleep):
-        """Test sleep behavior when needed"""
-        controller = DynamicBatchController(target_rps=100)
-        controller.records_sent = 100  # All records sent
-        controller._sleep_if_needed()
-        mock_sleep.assert_called_once()
-
-    @patch("time.sleep")
-    def test_sleep_until_next_window(self, mock_sleep):
-        """Test sleep until next window behavior"""
-        controller = DynamicBatchController(target_rps=100)
-        controller._sleep_until_next_window()
-        mock_sleep.assert_called_once()
-        assert controller.records_sent == 0  # Should reset count
+class FakeClock:
+    """Clock whose sleep advances time instantly"""
+
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += max(seconds, 1e-5)
+
+
+class TestRateLimiter:
+    def test_paces_steps_on_an_absolute_schedule(self):
+        """Test that releases follow the target rate without drift"""
+        clock = FakeClock()
+        limiter = RateLimiter(1000, clock=clock, sleep=clock.sleep)
+        assert limiter.batch_size(5000) == 10  # 10ms worth of records
+
+        release_times = []
+        for _ in range(100):
+            limiter.acquire(10)
+            release_times.append(clock.now)
+            clock.now += 0.002  # time spent generating and publishing
+        gaps = [b - a for a, b in zip(release_times, release_times[1:])]
+        assert all(gap == pytest.approx(0.01, abs=1e-3) for gap in gaps)
+        assert release_times[-1] - release_times[0] == pytest.approx(0.99, abs=1e-3)
+        assert limiter.stats()["achieved_rps"] == pytest.approx(1000, rel=0.01)
+
+    def test_low_rates_release_one_record_at_a_time(self):
+        """Test that rates below one record per step release single records"""
+        clock = FakeClock()
+        limiter = RateLimiter(2, clock=clock, sleep=clock.sleep)
+        assert limiter.batch_size(5000) == 1
+        limiter.acquire(1)
+        start = clock.now
+        limiter.acquire(1)
+        assert clock.now - start == pytest.approx(0.5, abs=1e-3)
+
+    def test_idle_time_only_earns_one_burst(self):
+        """Test that a stalled consumer can only catch up by one burst"""
+        clock = FakeClock()
+        limiter = RateLimiter(100, burst=5, clock=clock, sleep=clock.sleep)
+        limiter.acquire(1)
+        clock.now += 10  # stalled
+        start = clock.now
+        for _ in range(5):
+            limiter.acquire(1)
+        assert clock.now == start  # the burst is released immediately
+        limiter.acquire(1)
+        assert clock.now > start
+
+    def test_generator_reports_achieved_rate(self, monkeypatch):
+        """Test that a generator is paced at its rps and reports the rate"""
+        from glassgen.schema import ConfigSchema
+
+        clock = FakeClock()
+        monkeypatch.setattr(
+            "glassgen.generator.generator.RateLimiter",
+            partial(RateLimiter, clock=clock, sleep=clock.sleep),
+        )
+        schema = ConfigSchema.from_dict({"id": "$sequence"})
+        schema.validate()
+        config = GeneratorConfig(num_records=60, rps=300)
+        gen = Generator(config, schema).generate()
+        start = clock.now
+        count = 0
+        try:
+            while True:
+                count += len(next(gen))
+        except StopIteration as e:
+            response = e.value
+        assert count == 60
+        # The last of 60 records is due 59/300s after the first
+        assert clock.now - start == pytest.approx(59 / 300, abs=0.01)
+        assert response["target_rps"] == 300
+        assert response["achieved_rps"] == pytest.approx(300, rel=0.05)
+
+    def test_invalid_rate(self):
+        """Test that a rate of 0 rps is rejected"""
+        with pytest.raises(ValueError):
+            RateLimiter(0)
+
+
+def release_times(limiter, clock, count):
+    """Release ``count`` records in paced steps, returning when each was due"""
+    times = []
+    while len(times) < count:
+        step = limiter.batch_size(count - len(times))
+        limiter.acquire(step)
+        times.extend([clock.now - limiter.started_at] * step)
+    return times
+
+
+class TestRateProfile:
+    def test_profile_shapes(self, tmp_path):
+        ramp = build_rate_profile(
+            RateProfileConfig(type="ramp", start_rps=100, end_rps=300, duration=10)
+        )
+        assert [ramp.rate_at(t) for t in (0, 5, 10, 20)] == [100, 200, 300, 300]
+
+        steps = PiecewiseProfile([(0, 10), (5, 50), (10, 0)], interpolate=False)
+        assert [steps.rate_at(t) for t in (0, 4.9, 5, 9.9)] == [10, 10, 50, 50]
+        looped = PiecewiseProfile([(0, 10), (5, 50), (10, 0)], False, loop=True)
+        assert looped.rate_at(12) == 10 and looped.end is None
+
+        sine = SineProfile(rps=100, amplitude=50, period=60)
+        assert sine.rate_at(15) == pytest.approx(150)
+        assert sine.rate_at(45) == pytest.approx(50)
+        assert sine.mean_rate(60) == pytest.approx(100)
+
+        spike = SpikeProfile(rps=10, spike_rps=500, spike_every=30, spike_duration=5)
+        assert [spike.rate_at(t) for t in (0, 29, 30, 34, 35, 61)] == [
+            10,
+            10,
+            500,
+            500,
+            10,
+            500,
+        ]
+
+        path = tmp_path / "rates.csv"
+        path.write_text("t,rps\n0,100\n10,200\n")
+        replay = build_rate_profile(
+            RateProfileConfig(type="replay", path=str(path), scale=0.5)
+        )
+        assert replay.rate_at(5) == 75
+
+    def test_config_validation(self):
+        with pytest.raises(ValueError, match="requires the following fields"):
+            RateProfileConfig(type="ramp", start_rps=0, end_rps=100)
+        with pytest.raises(ValueError, match="not both"):
+            GeneratorConfig(rps=10, rate_profile={"type": "constant", "rps": 10})
+        # A profile that settles at 0 rps would never finish
+        with pytest.raises(ValueError, match="ends at 0 rps"):
+            RateProfileConfig(type="ramp", start_rps=100, end_rps=0, duration=60)
+        with pytest.raises(ValueError, match="ends at 0 rps"):
+            GeneratorConfig(rate_profile={"type": "step", "steps": [[0, 100], [10, 0]]})
+        RateProfileConfig(type="ramp", start_rps=100, end_rps=0, duration=60, loop=True)
+        # A profile at 0 rps throughout gets its own message, without 'loop'
+        for profile_type in ("constant", "poisson"):
+            with pytest.raises(ValueError, match="needs a rate above 0 rps"):
+                RateProfileConfig(type=profile_type, rps=0)
+        with pytest.raises(ValueError, match="Cannot read the rate profile file"):
+            RateProfileConfig(type="replay", path="missing-rates.csv")
+        with pytest.raises(ValueError, match="ends at 0 rps"):
+            RateLimiter(PiecewiseProfile([(0, 100), (1, 0)]))
+
+    def test_limiter_follows_the_profile(self):
+        """Test that releases follow a step up from 100 to 1000 rps"""
+        clock = FakeClock()
+        profile = PiecewiseProfile([(0, 100), (1, 1000)], interpolate=False)
+        limiter = RateLimiter(profile, clock=clock, sleep=clock.sleep)
+        assert limiter.batch_size(5000) == 1
+        times = release_times(limiter, clock, 1100)
+        assert times[99] < 1.0 <= times[100]
+        assert times[-1] == pytest.approx(1.99, abs=0.01)
+        # Steps grow with the rate
+        assert limiter.batch_size(5000) == 10
+        assert limiter.stats()["achieved_rps"] == pytest.approx(550, rel=0.02)
+        assert limiter.stats()["target_rps"] == pytest.approx(550, rel=0.02)
+
+    def test_limiter_waits_out_paused_stretches(self):
+        clock = FakeClock()
+        profile = PiecewiseProfile([(0, 0), (2, 100)], interpolate=False)
+        limiter = RateLimiter(profile, clock=clock, sleep=clock.sleep)
+        times = release_times(limiter, clock, 100)
+        assert times[0] == pytest.approx(2.0, abs=0.02)
+        assert times[-1] == pytest.approx(2.99, abs=0.02)
+
+    def test_poisson_arrivals(self):
+        clock = FakeClock()
+        limiter = RateLimiter(
+            100, clock=clock, sleep=clock.sleep, poisson=True, rng=random.Random(7)
+        )
+        times = release_times(limiter, clock, 2000)
+        gaps = [b - a for a, b in zip(times, times[1:])]
+        mean = sum(gaps) / len(gaps)
+        assert mean == pytest.approx(0.01, rel=0.1)
+        # Exponential gaps vary about as much as their mean
+        variance = sum((gap - mean) ** 2 for gap in gaps) / len(gaps)
+        assert variance**0.5 == pytest.approx(mean, rel=0.15)
+
+    def test_generator_with_rate_profile(self):
+        from glassgen.schema import ConfigSchema
+
+        schema = ConfigSchema.from_dict({"id": "$sequence"})
+        schema.validate()
+        config = GeneratorConfig(
+            num_records=40,
+            seed=1,
+            rate_profile={"type": "poisson", "rps": 400},
+        )
+        gen = Generator(config, schema).generate()
+        count = 0
+        try:
+            while True:
+                count += len(next(gen))
+        except StopIteration as e:
+            response = e.value
+        assert count == 40
+        assert response["target_rps"] == 400
+        assert response["achieved_rps"] > 0
 
 
 class TestDuplicateController:
@@ -77,7 +258,7 @@ class TestDuplicateController:
         controller = DuplicateController(generator_config)
 
         # Add an old record
-        old_time = datetime.now() - timedelta(hours=2)
+        old_time = time.monotonic() - timedelta(hours=2).total_seconds()
         controller.duplicates.append((old_time, {"id": "old"}))
 
         # Add a new record
@@ -166,6 +347,103 @@ class TestDuplicateController:
         assert duplicate["id"] == "123"
         assert duplicate["email"] == "john@example.com"
 
+    def test_configurable_max_size(self, generator_config):
+        config = generator_config.model_copy(deep=True)
+        config.event_options.duplication.max_size = 3
+        controller = DuplicateController(config)
+        for i in range(10):
+            controller.add_record({"id": str(i)})
+        assert [entry[1]["id"] for entry in controller.duplicates] == ["7", "8", "9"]
+
+    def test_records_are_copied_once(self, generator_config):
+        """Test that a record is copied when stored, not again on every read"""
+        controller = DuplicateController(generator_config)
+        record = {"id": "1", "data": {"score": 1}}
+        controller.add_record(record)
+        duplicate = controller._get_duplicate()
+        assert duplicate == record and duplicate["data"] is not record["data"]
+        assert controller._get_duplicate() is duplicate
+
+    def test_key_only_duplicates(self, generator_config):
+        config = generator_config.model_copy(deep=True)
+        config.event_options.duplication.mode = "key"
+        config.event_options.duplication.key_field = "user.id"
+        fresh = iter(range(100))
+        controller = DuplicateController(
+            config, lambda: {"user": {"id": "new"}, "n": next(fresh)}
+        )
+        controller.add_record({"user": {"id": "a"}, "n": -1})
+        controller.add_record({"user": {"id": "a"}, "n": -2})
+        # Every distinct key is stored once
+        assert len(controller.duplicates) == 1
+        duplicate = controller._get_duplicate()
+        assert duplicate == {"user": {"id": "a"}, "n": 0}
+
+        with pytest.raises(ValueError, match="record factory"):
+            DuplicateController(config)
+
+    def test_key_window_counts_from_last_seen(self, generator_config, monkeypatch):
+        """Test that a key seen again stays in the window from that time"""
+        clock = SimpleNamespace(now=0.0)
+        monkeypatch.setattr(
+            "glassgen.generator.duplication.time",
+            SimpleNamespace(monotonic=lambda: clock.now),
+        )
+        config = generator_config.model_copy(deep=True)
+        config.event_options.duplication.mode = "key"
+        config.event_options.duplication.key_field = "id"
+        controller = DuplicateController(config, lambda: {"id": "new"})
+        controller.add_record({"id": "a"})
+        controller.add_record({"id": "b"})
+        clock.now = 3000.0
+        controller.add_record({"id": "a"})
+        # "b" expires an hour after it was seen, "a" an hour after it was seen again
+        clock.now = 3700.0
+        controller._cleanup_old_duplicates()
+        assert [entry[1] for entry in controller.duplicates] == ["a"]
+        clock.now = 6700.0
+        controller._cleanup_old_duplicates()
+        assert not controller.duplicates and not controller.keys
+
+    def test_key_field_through_a_value_is_rejected(self, generator_config):
+        """Test that a key_field nested under a non-object value fails clearly"""
+        from glassgen.schema import ConfigSchema
+
+        config = generator_config.model_copy(deep=True)
+        config.event_options.duplication.mode = "key"
+        config.event_options.duplication.key_field = "user.id"
+        controller = DuplicateController(config, lambda: {"user": "flat"})
+        controller.add_record({"user": {"id": "a"}})
+        with pytest.raises(ValueError, match="'user' is not an object"):
+            controller._get_duplicate()
+
+        schema = ConfigSchema.from_dict({"user": "$name"})
+        with pytest.raises(ValueError, match="key_field 'user.id' not found"):
+            Generator(config, schema)
+
+
+class TestRingBuffer:
+    def test_fifo_with_random_access(self):
+        ring = RingBuffer(3)
+        for i in range(5):
+            ring.append(i)
+        assert len(ring) == 3
+        assert [ring[0], ring[1], ring[-1]] == [2, 3, 4]
+        assert ring.popleft() == 2
+        ring.append(5)
+        ring.append(6)
+        assert [ring[i] for i in range(len(ring))] == [4, 5, 6]
+        with pytest.raises(IndexError):
+            ring[3]
+
+    def test_empty(self):
+        ring = RingBuffer(2)
+        assert not ring
+        with pytest.raises(IndexError):
+            ring.popleft()
+        with pytest.raises(ValueError):
+            RingBuffer(0)
+
 
 class TestGenerator:
     def test_duplicate_controller_is_none_when_duplication_disabled(self):
@@ -181,8 +459,10 @@ class TestGenerator:
 
         mock_config = MagicMock(spec=GeneratorConfig)
         mock_config.rps = 0
+        mock_config.rate_profile = None
         mock_config.bulk_size = 10
         mock_config.num_records = 30
+        mock_config.seed = None
         mock_config.event_options = mock_event_options
 
         mock_schema = MagicMock(spec=BaseSchema)
@@ -192,7 +472,7 @@ class TestGenerator:
 
         assert generator.duplicate_controller is None
 
-        result = list(generator.generate_simple())
+        result = list(generator.generate())
         assert len(result) == 3
         for batch in result:
             assert len(batch) == 10
@@ -206,14 +486,18 @@ class TestGenerator:
         mock_duplication.ratio = 0.4
         mock_duplication.key_field = "id"
         mock_duplication.time_window = "7s"
+        mock_duplication.max_size = 1000
+        mock_duplication.mode = "record"
 
         mock_event_options = MagicMock()
         mock_event_options.duplication = mock_duplication
 
         mock_config = MagicMock(spec=GeneratorConfig)
         mock_config.rps = 0
+        mock_config.rate_profile = None
         mock_config.bulk_size = 10
         mock_config.num_records = 30
+        mock_config.seed = None
         mock_config.event_options = mock_event_options
 
         mock_schema = MagicMock(spec=BaseSchema)
@@ -223,7 +507,98 @@ class TestGenerator:
 
         assert generator.duplicate_controller is not None
 
-        result = list(generator.generate_optimized())
+        result = list(generator.generate())
         assert len(result) == 3
         for batch in result:
             assert len(batch) == 10
+
+
+class TestSeeding:
+    schema_dict = {
+        "id": "$uuid",
+        "name": "$name",
+        "age": "$intrange(18,65)",
+        "color": "$choice(red,green,blue)",
+        "price": "$price",
+        "tags": "$array(prefixed_id, 2)",
+    }
+
+    def _generate(self, seed, columnar=False):
+        from glassgen.schema import ConfigSchema
+
+        schema = ConfigSchema.from_dict(self.schema_dict)
+        schema.validate()
+        config = GeneratorConfig(num_records=20, bulk_size=7, seed=seed)
+        generator = Generator(config, schema, columnar=columnar)
+        return list(generator.generate())
+
+    def test_seeded_runs_are_reproducible(self):
+        """Test that the same seed reproduces the same records"""
+        assert self._generate(42) == self._generate(42)
+        assert self._generate(42, columnar=True) == self._generate(42, columnar=True)
+        assert self._generate(42) != self._generate(43)
+
+    def test_derive_seed(self):
+        """Test that substream seeds are stable and independent"""
+        from glassgen.generator.generators import derive_seed
+
+        assert derive_seed(7, "worker", 0) == derive_seed(7, "worker", 0)
+        assert derive_seed(7, "worker", 0) != derive_seed(7, "worker", 1)
+        assert derive_seed(7, "worker", 0) != derive_seed(8, "worker", 0)
+        assert 0 <= derive_seed(7, "worker", 0) < 2**64
+
+    def test_seeded_duplication_is_reproducible(self, generator_config):
+        """Test that duplicate selection follows the configured seed"""
+        generator_config.seed = 3
+        picks = []
+        for _ in range(2):
+            controller = DuplicateController(generator_config)
+            for i in range(50):
+                controller.add_record({"id": str(i)})
+            picks.append([controller._get_duplicate()["id"] for _ in range(10)])
+        assert picks[0] == picks[1]
+
+
+class TestPrefetch:
+    @staticmethod
+    def _batches(count, fail_at=None):
+        for i in range(count):
+            if i == fail_at:
+                raise RuntimeError("generation failed")
+            yield [i]
+        return {"num_records": count}
+
+    def test_prefetch_yields_batches_and_response(self):
+        """Test that prefetching preserves batches and the final response"""
+        gen = prefetch(self._batches(5), depth=2)
+        batches = []
+        try:
+            while True:
+                batches.append(next(gen))
+        except StopIteration as e:
+            response = e.value
+        assert batches == [[0], [1], [2], [3], [4]]
+        assert response == {"num_records": 5}
+
+    def test_prefetch_reraises_generation_errors(self):
+        """Test that errors in the producer thread reach the consumer"""
+        gen = prefetch(self._batches(5, fail_at=3), depth=1)
+        with pytest.raises(RuntimeError, match="generation failed"):
+            list(gen)
+
+    def test_prefetch_applies_backpressure(self):
+        """Test that the producer never runs more than depth batches ahead"""
+        produced = []
+
+        def batches():
+            for i in range(10):
+                produced.append(i)
+                yield [i]
+            return {}
+
+        gen = prefetch(batches(), depth=2)
+        next(gen)
+        time.sleep(0.2)
+        # one batch consumed, two queued and one waiting to be queued
+        assert len(produced) <= 4
+        gen.close()
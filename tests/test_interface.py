@@ -1,5 +1,13 @@
-from glassgen import generate
-from glassgen.config import GlassGenConfig
+import asyncio
+import json
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from glassgen import agenerate, generate
+from glassgen.config import GeneratorConfig, GlassGenConfig
+from glassgen.schema.base import BaseSchema
 from glassgen.sinks import CSVSink
 
 
@@ -32,6 +40,29 @@ def test_generate_with_yield_sink(yield_sink_config):
         assert "email" in event
 
 
+@pytest.mark.parametrize("mode", ["batch", "columns"])
+def test_generate_with_yield_sink_batches(yield_sink_config, mode):
+    """Test that batch and columns mode yield one item per batch"""
+    config = {
+        **yield_sink_config,
+        "sink": {"type": "yield", "params": {"mode": mode}},
+        "generator": {"num_records": 25, "bulk_size": 10},
+    }
+    gen = generate(config)
+    batches = []
+    try:
+        while True:
+            batches.append(next(gen))
+    except StopIteration as e:
+        response = e.value
+    assert response["num_records"] == 25
+    if mode == "batch":
+        assert [len(batch) for batch in batches] == [10, 10, 5]
+        assert "email" in batches[0][0]
+    else:
+        assert [len(batch["email"]) for batch in batches] == [10, 10, 5]
+
+
 def test_duplication_feature(duplication_config):
     """Test event duplication feature"""
     gen = generate(duplication_config)
@@ -99,3 +130,459 @@ def test_generate_with_dict_csv_sink(basic_config, temp_csv_file):
     result = generate(config_without_sink, sink=sink_dict)
     assert isinstance(result, dict)
     assert result["sink"] == "csv"
+
+
+def test_generate_with_duck_typed_sink(basic_config):
+    """Test that a sink not derived from BaseSink only needs to publish"""
+
+    class ListSink:
+        def __init__(self):
+            self.events = []
+
+        def publish_bulk(self, data):
+            self.events.extend(data)
+
+        def close(self):
+            pass
+
+    sink = ListSink()
+    result = generate(basic_config, sink=sink)
+    assert result["num_records"] == 10
+    assert len(sink.events) == 10
+
+
+def test_generate_with_workers_merged_into_sink(basic_config, mock_sink):
+    """Test that worker processes send their batches back to the parent sink"""
+    basic_config["generator"] = {"num_records": 25, "bulk_size": 4, "workers": 3}
+    result = generate(basic_config, sink=mock_sink)
+    assert result["num_records"] == 25
+    assert result["workers"] == 3
+    assert len(mock_sink.events) == 25
+    assert all(18 <= event["age"] <= 65 for event in mock_sink.events)
+
+
+def test_generate_with_workers_sharded_output(tmp_path):
+    """Test that sharded output writes one file per worker"""
+    config = {
+        "schema": {"name": "$name", "id": "$uuid"},
+        "sink": {"type": "ndjson", "params": {"path": str(tmp_path / "out.ndjson")}},
+        "generator": {"num_records": 11, "workers": 2, "sharded_output": True},
+    }
+    result = generate(config)
+    assert result["num_records"] == 11
+    assert result["shards"] == [
+        str(tmp_path / "out.part-0000.ndjson"),
+        str(tmp_path / "out.part-0001.ndjson"),
+    ]
+    line_counts = [len(open(shard).readlines()) for shard in result["shards"]]
+    assert line_counts == [6, 5]
+    ids = set()
+    for shard in result["shards"]:
+        ids.update(json.loads(line)["id"] for line in open(shard))
+    assert len(ids) == 11
+
+
+def test_sharded_output_with_rolling_files(tmp_path):
+    """Test that sharded rolling sinks report the files they actually wrote"""
+    config = {
+        "schema": {"id": "$uuid"},
+        "sink": {
+            "type": "ndjson",
+            "params": {"path": str(tmp_path / "p-{n}.ndjson"), "rotate_records": 4},
+        },
+        "generator": {"num_records": 12, "workers": 2, "sharded_output": True},
+    }
+    result = generate(config)
+    assert result["files_written"] == 4
+    assert result["shards"] == [
+        str(tmp_path / name)
+        for name in (
+            "p-0.part-0000.ndjson",
+            "p-1.part-0000.ndjson",
+            "p-0.part-0001.ndjson",
+            "p-1.part-0001.ndjson",
+        )
+    ]
+    assert sum(len(open(shard).readlines()) for shard in result["shards"]) == 12
+
+
+def test_seeded_sharded_output_is_reproducible(tmp_path):
+    """Test that a seeded parallel run regenerates identical shards"""
+    shards = []
+    for run in range(2):
+        path = tmp_path / f"run{run}" / "out.ndjson"
+        path.parent.mkdir()
+        config = {
+            "schema": {"name": "$name", "id": "$uuid", "n": "$intrange(1,9)"},
+            "sink": {"type": "ndjson", "params": {"path": str(path)}},
+            "generator": {
+                "num_records": 9,
+                "workers": 3,
+                "sharded_output": True,
+                "seed": 1234,
+            },
+        }
+        result = generate(config)
+        shards.append([open(shard).read() for shard in result["shards"]])
+    assert shards[0] == shards[1]
+    assert len(set(shards[0])) == 3  # every worker draws its own substream
+
+
+class _DyingSchema(BaseSchema):
+    """Schema whose worker process dies without reporting back"""
+
+    def validate(self):
+        pass
+
+    def _generate_record(self):
+        os._exit(3)
+
+
+def test_generate_with_workers_fails_when_a_worker_dies(mock_sink):
+    """Test that the parent notices a dead worker instead of waiting forever"""
+    config = {"generator": {"num_records": 10, "workers": 2}}
+    with pytest.raises(RuntimeError, match="exited with code 3"):
+        generate(config, schema=_DyingSchema(), sink=mock_sink)
+
+
+def test_workers_done_after_exiting_are_not_reported_dead(monkeypatch):
+    """Test that DONE messages still in the pipe of exited workers are read"""
+    from queue import Empty
+
+    from glassgen.generator import parallel
+
+    class ExitedProcess:
+        exitcode = 0
+
+        def __init__(self, target, args, daemon):
+            self.index = args[0]
+
+        def start(self):
+            pass
+
+        def is_alive(self):
+            return False
+
+        def join(self):
+            pass
+
+    class LateQueue:
+        """Delivers nothing within the timeout, then everything at once"""
+
+        def __init__(self, maxsize):
+            self.messages = [
+                (parallel._BATCH, [{"id": 1}]),
+                (parallel._DONE, {"worker": 0, "num_records": 1}),
+                (parallel._DONE, {"worker": 1, "num_records": 0}),
+            ]
+
+        def get(self, timeout):
+            raise Empty
+
+        def get_nowait(self):
+            if not self.messages:
+                raise Empty
+            return self.messages.pop(0)
+
+    monkeypatch.setattr(parallel, "_POLL_INTERVAL", 0)
+    generator = parallel.ParallelGenerator(
+        GeneratorConfig(num_records=1, workers=2), _DyingSchema()
+    )
+    generator.context = SimpleNamespace(Process=ExitedProcess, Queue=LateQueue)
+    gen = generator.generate()
+    assert next(gen) == [{"id": 1}]
+    with pytest.raises(StopIteration) as stop:
+        next(gen)
+    assert stop.value.value["num_records"] == 1
+
+
+def test_low_rate_caps_the_number_of_workers():
+    """Test that a rate below the worker count starts one worker per rps"""
+    from glassgen.generator.parallel import ParallelGenerator
+
+    config = GeneratorConfig(rps=2, num_records=10, workers=4)
+    generator = ParallelGenerator(config, _DyingSchema())
+    assert generator.workers == 2
+    assert [c.rps for c in generator._worker_configs()] == [1, 1]
+    assert [c.num_records for c in generator._worker_configs()] == [5, 5]
+
+
+def test_sequence_is_unique_across_workers(mock_sink):
+    """Test that workers emit interleaved, non-overlapping sequences"""
+    config = {
+        "schema": {"id": "$sequence"},
+        "generator": {"num_records": 30, "bulk_size": 4, "workers": 3},
+    }
+    generate(config, sink=mock_sink)
+    assert sorted(event["id"] for event in mock_sink.events) == list(range(1, 31))
+
+
+def test_generate_with_prefetch(basic_config, mock_sink):
+    """Test that pipelined generation publishes every record"""
+    basic_config["generator"] = {
+        "num_records": 50,
+        "bulk_size": 7,
+        "prefetch_batches": 2,
+    }
+    result = generate(basic_config, sink=mock_sink)
+    assert result["num_records"] == 50
+    assert len(mock_sink.events) == 50
+    assert mock_sink.closed
+
+
+def test_generate_merges_sink_stats(basic_config, mock_sink):
+    """Sink statistics are merged into the final response after close"""
+    mock_sink.stats = lambda: {"delivery": {"delivered": len(mock_sink.events)}}
+    result = generate(basic_config, sink=mock_sink)
+    assert result["delivery"] == {"delivered": 10}
+
+
+def test_generate_bounds_entity_state(mock_sink):
+    """Test that max_entities bounds the state kept per entity field"""
+    from glassgen.schema import ConfigSchema
+
+    schema = ConfigSchema.from_dict(
+        {"user": "$intrange(1,50)", "visit": "$counter(user)"}
+    )
+    config = {"generator": {"num_records": 200, "max_entities": 10}}
+    generate(config, schema=schema, sink=mock_sink)
+    (_, index, fields) = schema._entity_plan[0]
+    assert len(index) == 10
+    assert all(len(generator.values) == 10 for _, _, generator in fields)
+    assert len(mock_sink.events) == 200
+
+    # The setting belongs to the run's schema, later schemas keep the default
+    other = ConfigSchema.from_dict({"user": "$uuid", "visit": "$counter(user)"})
+    other.validate()
+    assert other._entity_plan[0][1].capacity == 1_000_000
+
+
+def test_agenerate_publishes_to_sink(basic_config, mock_sink):
+    """Test that awaiting an async run publishes every record"""
+    basic_config["generator"] = {"num_records": 25, "bulk_size": 10}
+
+    async def main():
+        return await agenerate(basic_config, sink=mock_sink)
+
+    result = asyncio.run(main())
+    assert result["num_records"] == 25
+    assert result["sink"] == "csv"
+    assert len(mock_sink.events) == 25
+    assert mock_sink.closed
+
+    with pytest.raises(TypeError, match="yield sink"):
+        agenerate(basic_config, sink=mock_sink).__aiter__()
+
+
+def test_agenerate_with_yield_sink(yield_sink_config):
+    async def collect():
+        run = agenerate(yield_sink_config)
+        events = [event async for event in run]
+        return events, run.response
+
+    events, response = asyncio.run(collect())
+    assert len(events) == 5 and "email" in events[0]
+    assert response["num_records"] == 5
+    assert response["sink"] == "yield"
+
+
+def test_agenerate_streams_share_the_loop(yield_sink_config):
+    """Test that rate-limited runs wait concurrently without blocking the loop"""
+    yield_sink_config["generator"] = {"rps": 200, "num_records": 40}
+
+    # What happened on the loop, in order: a run id per event, or "tick"
+    log = []
+
+    async def heartbeat():
+        while True:
+            log.append("tick")
+            await asyncio.sleep(0.01)
+
+    async def collect(run_id):
+        run = agenerate(yield_sink_config)
+        async for _ in run:
+            log.append(run_id)
+        return run.response
+
+    async def main():
+        beat = asyncio.ensure_future(heartbeat())
+        responses = await asyncio.gather(*(collect(i) for i in range(3)))
+        beat.cancel()
+        return responses
+
+    responses = asyncio.run(main())
+    assert [r["num_records"] for r in responses] == [40, 40, 40]
+    events = [entry for entry in log if entry != "tick"]
+    # The runs interleave rather than run one after the other
+    assert set(events[:40]) == {0, 1, 2}
+    # and the heartbeat keeps ticking while they wait on their rate
+    first = log.index(events[0])
+    last = len(log) - 1 - log[::-1].index(events[-1])
+    assert log[first:last].count("tick") >= 5
+
+
+def test_agenerate_closes_the_sink_on_error(basic_config, mock_sink):
+    """Test that a run failing to publish still closes its sink"""
+
+    def fail(data):
+        raise RuntimeError("publish failed")
+
+    async def main():
+        return await agenerate(basic_config, sink=mock_sink)
+
+    mock_sink.publish_bulk = fail
+    with pytest.raises(RuntimeError, match="publish failed"):
+        asyncio.run(main())
+    assert mock_sink.closed
+
+
+def test_agenerate_streams_close_every_sink_on_error(monkeypatch, mock_sink):
+    """Test that a failing stream stops the others and every sink is closed"""
+    from glassgen.interface import _SharedClients, agenerate_streams
+
+    failing_sink = type(mock_sink)()
+
+    def fail(data):
+        raise RuntimeError("publish failed")
+
+    failing_sink.publish_bulk = fail
+    sinks = {"ok": mock_sink, "failing": failing_sink}
+    monkeypatch.setattr(
+        _SharedClients,
+        "create_sink",
+        lambda self, sink_config: sinks[sink_config.params["path"]],
+    )
+    config = {
+        "streams": [
+            {
+                "name": name,
+                "schema": {"id": "$uuid"},
+                "sink": {"type": "ndjson", "params": {"path": name}},
+                # The healthy stream would run for minutes
+                "generator": {"rps": 10, "num_records": 10_000},
+            }
+            for name in sinks
+        ]
+    }
+    with pytest.raises(RuntimeError, match="publish failed"):
+        asyncio.run(agenerate_streams(config))
+    assert mock_sink.closed and failing_sink.closed
+
+
+def test_generate_streams(tmp_path):
+    """Test that one call runs several streams with their own sinks and rates"""
+    config = {
+        "seed": 7,
+        "streams": [
+            {
+                "name": "orders",
+                "schema": {"order_id": "$uuid"},
+                "sink": {
+                    "type": "ndjson",
+                    "params": {"path": str(tmp_path / "orders.ndjson")},
+                },
+                "generator": {"rps": 200, "num_records": 30},
+            },
+            {
+                "name": "clicks",
+                "schema": {"url": "$url"},
+                "sink": {"type": "csv", "params": {"path": str(tmp_path / "c.csv")}},
+                "generator": {"rps": 1000, "num_records": 150},
+            },
+        ],
+    }
+    result = generate(config)
+    assert result["num_records"] == 180
+    orders, clicks = result["streams"]["orders"], result["streams"]["clicks"]
+    assert orders["num_records"] == 30 and orders["sink"] == "ndjson"
+    assert clicks["num_records"] == 150 and clicks["sink"] == "csv"
+    # Both streams ran side by side, each at its own rate
+    assert orders["achieved_rps"] == pytest.approx(200, rel=0.2)
+    assert clicks["achieved_rps"] == pytest.approx(1000, rel=0.2)
+    assert result["time_taken_ms"] < 250
+    lines = (tmp_path / "orders.ndjson").read_text().splitlines()
+    assert len(lines) == 30 and "order_id" in json.loads(lines[0])
+    assert len((tmp_path / "c.csv").read_text().splitlines()) == 151
+
+
+def test_generate_streams_with_references(tmp_path):
+    """Test that child streams only reference keys their parent published"""
+    config = {
+        "seed": 11,
+        "key_store_size": 1000,
+        "streams": [
+            {
+                "name": "orders",
+                "schema": {"order_id": "$uuid", "user_id": "$ref(users.id, zipf)"},
+                "sink": {
+                    "type": "ndjson",
+                    "params": {"path": str(tmp_path / "orders.ndjson")},
+                },
+                "generator": {"rps": 2000, "num_records": 200},
+            },
+            {
+                "name": "users",
+                "schema": {"id": "$uuid", "name": "$name"},
+                "sink": {
+                    "type": "parquet",
+                    "params": {"path": str(tmp_path / "users.parquet")},
+                },
+                "generator": {"rps": 500, "num_records": 50, "bulk_size": 10},
+            },
+        ],
+    }
+    result = generate(config)
+    assert result["num_records"] == 250
+    pq = pytest.importorskip("pyarrow.parquet")
+    user_ids = set(pq.read_table(tmp_path / "users.parquet").column("id").to_pylist())
+    orders = [json.loads(line) for line in open(tmp_path / "orders.ndjson")]
+    assert len(user_ids) == 50 and len(orders) == 200
+    assert all(order["user_id"] in user_ids for order in orders)
+
+
+def test_generate_streams_release_key_stores(tmp_path):
+    """Test that the key stores of a run are dropped once it is over"""
+    from glassgen.generator.generators import registry
+
+    config = {
+        "streams": [
+            {
+                "name": "users",
+                "schema": {"id": "$uuid"},
+                "sink": {
+                    "type": "ndjson",
+                    "params": {"path": str(tmp_path / "users.ndjson")},
+                },
+                "generator": {"rps": 0, "num_records": 10},
+            },
+            {
+                "name": "orders",
+                "schema": {"user_id": "$ref(users.id)"},
+                "sink": {
+                    "type": "ndjson",
+                    "params": {"path": str(tmp_path / "orders.ndjson")},
+                },
+                "generator": {"rps": 0, "num_records": 10},
+            },
+        ],
+    }
+    assert generate(config)["num_records"] == 20
+    assert "users.id" not in registry._key_stores
+
+
+def test_streams_share_kafka_producers(monkeypatch):
+    import glassgen.sinks.kafka_sink as kafka_sink_module
+    from glassgen.config import SinkConfig
+    from glassgen.interface import _SharedClients
+
+    monkeypatch.setattr(kafka_sink_module, "Producer", lambda config: object())
+    clients = _SharedClients()
+
+    def kafka_sink(topic, servers="broker:9092"):
+        params = {"bootstrap.servers": servers, "topic": topic}
+        return clients.create_sink(SinkConfig(type="kafka", params=params))
+
+    orders, payments = kafka_sink("orders"), kafka_sink("payments")
+    other_cluster = kafka_sink("orders", servers="other:9092")
+    assert orders.producer is payments.producer
+    assert other_cluster.producer is not orders.producer
@@ -1,3 +1,4 @@
+import re
 from datetime import datetime
 
 import pytest
@@ -492,3 +493,414 @@ def test_invalid_schema_value_type():
         ValueError, match="Invalid schema value type for field 'invalid_field'"
     ):
         ConfigSchema.from_dict(schema_dict)
+
+
+def test_validate_compiles_record_plan():
+    """Test that validate() compiles the field tree into a reusable plan"""
+    schema = ConfigSchema.from_dict(
+        {
+            "id": "$intrange(1,10)",
+            "color": "$choice(red,blue)",
+            "user": {"name": "$name", "tags": "$array(choice, 2, a, b)"},
+        }
+    )
+    schema.validate()
+
+    plan = schema._plan
+    record_generator = schema._record_generator
+    assert [entry[0] for entry in plan] == ["id", "color", "user"]
+
+    record = schema._generate_record()
+    # The plan is not rebuilt per record
+    assert schema._plan is plan and schema._record_generator is record_generator
+    assert 1 <= record["id"] <= 10
+    assert record["color"] in ["red", "blue"]
+    assert isinstance(record["user"]["name"], str)
+    assert all(tag in ["a", "b"] for tag in record["user"]["tags"])
+
+
+def test_generate_columns():
+    """Test columnar batch generation for flat and nested fields"""
+    from glassgen.schema.base import columns_to_records
+
+    schema = ConfigSchema.from_dict(
+        {"age": "$intrange(18,65)", "user": {"name": "$name", "id": "$uuid"}}
+    )
+    schema.validate()
+
+    columns = schema._generate_columns(4)
+    assert list(columns.keys()) == ["age", "user"]
+    assert len(columns["age"]) == 4
+    assert all(18 <= age <= 65 for age in columns["age"])
+    assert set(columns["user"].keys()) == {"name", "id"}
+    assert len(columns["user"]["id"]) == 4
+
+    records = columns_to_records(columns)
+    assert len(records) == 4
+    assert records[2]["user"]["id"] == columns["user"]["id"][2]
+
+
+def test_generate_columns_default_implementation():
+    """Test that schemas without a native columnar path transpose records"""
+    schema = UserSchema()
+    columns = schema._generate_columns(3)
+    assert set(columns.keys()) == {"name", "age", "email", "phone", "address"}
+    assert all(len(column) == 3 for column in columns.values())
+
+
+def test_vectorized_numeric_batch_generators():
+    """Test that numeric generators fill whole columns through NumPy"""
+    from glassgen.generator.generators import GeneratorType, registry
+
+    for name in [
+        GeneratorType.INT,
+        GeneratorType.INTRANGE,
+        GeneratorType.TIMESTAMP,
+        GeneratorType.BOOLEAN,
+        GeneratorType.FLOAT,
+        GeneratorType.PRICE,
+    ]:
+        assert registry.get_batch_generator(name) is not None
+
+    schema = ConfigSchema.from_dict(
+        {
+            "count": "$int",
+            "age": "$intrange(18,65)",
+            "ts": "$timestamp",
+            "active": "$boolean",
+            "score": "$float",
+            "amount": "$price(10.5, 20.5, 1)",
+        }
+    )
+    schema.validate()
+    columns = schema._generate_columns(200)
+
+    assert all(isinstance(v, int) and 0 <= v <= 9999 for v in columns["count"])
+    assert all(isinstance(v, int) and 18 <= v <= 65 for v in columns["age"])
+    assert all(len(str(v)) == 10 for v in columns["ts"])
+    assert all(isinstance(v, bool) for v in columns["active"])
+    assert all(isinstance(v, float) for v in columns["score"])
+    for amount in columns["amount"]:
+        assert 10.5 <= amount <= 20.5
+        assert round(amount, 1) == amount
+
+
+def test_pool_generator():
+    """Test that pooled fields draw from a bounded set of pre-generated values"""
+    from glassgen.generator.generators import registry
+
+    schema = ConfigSchema.from_dict(
+        {
+            "company": "$pool(company, 5)",
+            "city": "$pool(city, 20, zipf)",
+            "score": "$pool(intrange, 3, uniform, 1, 1000)",
+        }
+    )
+    schema.validate()
+
+    records = [schema._generate_record() for _ in range(200)]
+    columns = schema._generate_columns(200)
+
+    company_pool = registry.get_pool("company", 5)
+    assert len(company_pool.values) == 5
+    assert {r["company"] for r in records} <= set(company_pool.values)
+    assert set(columns["company"]) <= set(company_pool.values)
+    assert len({r["city"] for r in records}) <= 20
+    assert len(set(columns["score"])) <= 3
+    assert all(1 <= score <= 1000 for score in columns["score"])
+
+
+def test_pool_zipf_distribution_is_skewed():
+    """Test that zipf pools favour low-rank values"""
+    from glassgen.generator.generators import ValuePool
+
+    pool = ValuePool(iter(range(100)).__next__, 100, "zipf")
+    draws = [pool.sample() for _ in range(5000)] + pool.sample_batch(5000)
+    assert draws.count(0) > draws.count(99) * 10
+
+
+def test_pool_generator_invalid_params():
+    """Test pool parameter validation"""
+    with pytest.raises(ValueError, match="Pool size must be an integer"):
+        ConfigSchema.from_dict({"name": "$pool(name, many)"})
+
+    schema = ConfigSchema.from_dict({"name": "$pool(name, 10, gaussian)"})
+    with pytest.raises(ValueError, match="Unknown pool distribution"):
+        schema.validate()
+
+
+def test_key_store():
+    """Test that key stores keep the most recent keys compactly"""
+    from array import array
+
+    from glassgen.generator.generators import KeyStore
+
+    store = KeyStore(capacity=5)
+    with pytest.raises(ValueError, match="No keys have been recorded"):
+        store.sample()
+    store.extend([1, 2, 3])
+    store.extend([4, 5, 6, 7])
+    assert isinstance(store.values, array)
+    assert len(store) == 5
+    draws = [store.sample() for _ in range(500)] + store.sample_batch(500)
+    assert set(draws) == {3, 4, 5, 6, 7}
+    # Zipf favours the oldest key held
+    zipf = [store.sample("zipf") for _ in range(1000)] + store.sample_batch(
+        1000, "zipf"
+    )
+    assert zipf.count(3) > zipf.count(7) * 2
+
+    # Keys that are not 64-bit integers fall back to a list
+    store.extend(["a", "b"])
+    assert isinstance(store.values, list)
+    assert set(store.sample_batch(200)) == {5, 6, 7, "a", "b"}
+
+
+def test_ref_generator():
+    """Test that $ref fields draw keys recorded in the registry's key store"""
+    from glassgen.generator.generators import registry
+
+    schema = ConfigSchema.from_dict(
+        {"user_id": "$ref(test_users.id)", "hot_user": "$ref(test_users.id, zipf)"}
+    )
+    schema.validate()
+    registry.get_key_store("test_users.id").extend([10, 20, 30])
+    records = [schema._generate_record() for _ in range(50)]
+    columns = schema._generate_columns(50)
+    assert {r["user_id"] for r in records} <= {10, 20, 30}
+    assert set(columns["hot_user"]) <= {10, 20, 30}
+    assert schema.value_types()["user_id"] is None
+
+    with pytest.raises(ValueError, match="Unknown ref distribution"):
+        ConfigSchema.from_dict({"user_id": "$ref(test_users.id, latest)"}).validate()
+
+
+def test_entity_generators():
+    """Test that entity generators advance one state per entity"""
+    schema = ConfigSchema.from_dict(
+        {
+            "device": "$intrange(1,5)",
+            "reading": {"temp": "$random_walk(device, 20, 0.5, 15, 25)"},
+            "events": "$counter(device, 10, 2)",
+            "page": "$markov(device, home>product|search*2, search>product, "
+            "product>cart|home, cart>home)",
+        }
+    )
+    schema.validate()
+    records = [schema._generate_record() for _ in range(100)]
+    columns = schema._generate_columns(100)
+    records += [
+        {
+            "device": device,
+            "reading": {"temp": temp},
+            "events": events,
+            "page": page,
+        }
+        for device, temp, events, page in zip(
+            columns["device"],
+            columns["reading"]["temp"],
+            columns["events"],
+            columns["page"],
+        )
+    ]
+    transitions = {
+        "home": {"product", "search"},
+        "search": {"product"},
+        "product": {"cart", "home"},
+        "cart": {"home"},
+    }
+    last = {}
+    for record in records:
+        previous = last.get(record["device"])
+        assert 15 <= record["reading"]["temp"] <= 25
+        if previous is None:
+            assert record["events"] == 10 and record["page"] == "home"
+            assert record["reading"]["temp"] == 20
+        else:
+            assert record["events"] == previous["events"] + 2
+            assert record["page"] in transitions[previous["page"]]
+        last[record["device"]] = record
+    assert list(record) == ["device", "reading", "events", "page"]
+    assert schema.value_types()["events"] == "int"
+
+
+def test_entity_index_evicts_oldest_entity():
+    """Test that entity state stays bounded to the index capacity"""
+    from glassgen.generator.entity import EntityCounter, EntityIndex
+
+    index, counter = EntityIndex(capacity=2), EntityCounter()
+    assert [counter(*index.slot(e)) for e in "aabab"] == [1, 2, 1, 3, 2]
+    # "c" takes the slot of "a", seen first; "a" starts over when seen again
+    assert [counter(*index.slot(e)) for e in "cba"] == [1, 3, 1]
+    assert len(index) == 2 and len(counter.values) == 2
+
+
+def test_entity_generator_invalid_params():
+    """Test that entity generators need a stateless entity field"""
+    invalid_schemas = [
+        {"n": "$counter"},
+        {"n": "$counter(user)"},
+        {"user": "$uuid", "n": "$counter(user)", "m": "$counter(n)"},
+        {"user": {"id": "$uuid"}, "n": "$counter(user)"},
+        {"user": "$uuid", "page": "$markov(user, home>nowhere)"},
+        # Template slots are compiled on first use, without a record around them
+        {"path": "$template(/{counter(user)})"},
+    ]
+    for schema_dict in invalid_schemas:
+        with pytest.raises(ValueError):
+            schema = ConfigSchema.from_dict(schema_dict)
+            schema.validate()
+            schema._generate_record()
+
+    from glassgen.generator.entity import EntityGenerator, MarkovChain
+    from glassgen.generator.generators import registry
+
+    with pytest.raises(ValueError, match="keeps state per entity"):
+        registry.get_generator("counter")()
+    with pytest.raises(ValueError, match="at most 65536 states"):
+        MarkovChain(*(f"s{i}" for i in range(65537)), rng=registry.random)
+    with pytest.raises(TypeError):
+        EntityGenerator()
+
+
+def test_uuid_batch_generator():
+    """Test bulk UUID4 generation"""
+    import uuid
+
+    schema = ConfigSchema.from_dict({"id": "$uuid", "id4": "$uuid4"})
+    schema.validate()
+    columns = schema._generate_columns(50)
+
+    for value in columns["id"] + columns["id4"]:
+        parsed = uuid.UUID(value)
+        assert str(parsed) == value
+        assert parsed.version == 4
+        assert parsed.variant == uuid.RFC_4122
+    assert len(set(columns["id"])) == 50
+
+
+def test_uuid7_generator_is_time_ordered():
+    """Test that uuid7 values are valid and strictly increasing"""
+    import uuid
+
+    schema = ConfigSchema.from_dict({"id": "$uuid7"})
+    schema.validate()
+    values = [schema._generate_record()["id"] for _ in range(100)]
+    values += schema._generate_columns(5000)["id"]
+
+    assert values == sorted(values)
+    assert len(set(values)) == len(values)
+    for value in values[:10]:
+        parsed = uuid.UUID(value)
+        assert parsed.version == 7
+        assert parsed.variant == uuid.RFC_4122
+
+
+def test_uuid7_keeps_seeded_fields_reproducible(monkeypatch):
+    """Test that uuid7 draws, which follow the clock, leave other fields alone"""
+    import time
+    from types import SimpleNamespace
+
+    from glassgen.generator.generators import registry
+
+    def run():
+        registry.seed(42)
+        schema = ConfigSchema.from_dict({"id": "$uuid7", "n": "$intrange(1,1000)"})
+        schema.validate()
+        return [schema._generate_record()["n"] for _ in range(300)]
+
+    first = run()
+    # Every uuid7 now lands on a new millisecond, and draws a new counter
+    ticks = iter(range(10**9))
+    monkeypatch.setattr(
+        "glassgen.generator.generators.time",
+        SimpleNamespace(time_ns=lambda: next(ticks) * 1_000_000, time=time.time),
+    )
+    assert run() == first
+
+
+def test_sequence_generator():
+    """Test that each sequence field keeps its own counter"""
+    schema = ConfigSchema.from_dict(
+        {"id": "$sequence", "order_no": "$sequence(1000, 10)"}
+    )
+    schema.validate()
+
+    records = [schema._generate_record() for _ in range(3)]
+    assert [r["id"] for r in records] == [1, 2, 3]
+    assert [r["order_no"] for r in records] == [1000, 1010, 1020]
+
+    columns = schema._generate_columns(3)
+    assert columns["id"] == [4, 5, 6]
+    assert columns["order_no"] == [1030, 1040, 1050]
+
+
+def test_prefixed_id_batch_generator():
+    """Test vectorized prefixed IDs"""
+    schema = ConfigSchema.from_dict({"id": "$prefixed_id(prod, 1, 100)"})
+    schema.validate()
+    for value in schema._generate_columns(100)["id"]:
+        prefix, number = value.split("_")
+        assert prefix == "prod"
+        assert 1 <= int(number) <= 100
+
+
+def test_template_generator():
+    """Test that templates render slots with registered generators"""
+    schema = ConfigSchema.from_dict(
+        {
+            "line": "$template(GET /items/{intrange(1,9)}?c={choice(a,b)} {})",
+            "url": "$template(https://example.com/{sequence(10)})",
+        }
+    )
+    schema.validate()
+
+    record = schema._generate_record()
+    assert re.fullmatch(r"GET /items/[1-9]\?c=[ab] \{\}", record["line"])
+    assert record["url"] == "https://example.com/10"
+
+    columns = schema._generate_columns(3)
+    for line in columns["line"]:
+        assert re.fullmatch(r"GET /items/[1-9]\?c=[ab] \{\}", line)
+    assert columns["url"] == [f"https://example.com/{n}" for n in (11, 12, 13)]
+
+
+def test_template_stateful_slots_are_per_field():
+    """Test that fields sharing a template keep their own sequence"""
+    schema = ConfigSchema.from_dict(
+        {"a": "$template(id-{sequence})", "b": "$template(id-{sequence})"}
+    )
+    schema.validate()
+    records = [schema._generate_record() for _ in range(3)]
+    assert [r["a"] for r in records] == ["id-1", "id-2", "id-3"]
+    assert [r["b"] for r in records] == ["id-1", "id-2", "id-3"]
+    assert schema._generate_columns(2)["b"] == ["id-4", "id-5"]
+
+
+def test_template_stateful_slots_restart_per_run(yield_sink_config):
+    """Test that a new run starts the sequences of its templates over"""
+    from glassgen import generate
+
+    yield_sink_config["schema"] = {"id": "$template(id-{sequence})"}
+    yield_sink_config["generator"] = {"num_records": 3}
+    for _ in range(2):
+        assert [r["id"] for r in generate(yield_sink_config)] == [
+            "id-1",
+            "id-2",
+            "id-3",
+        ]
+
+
+def test_query_string_generator():
+    """Test that query_string renders every expected parameter"""
+    schema = ConfigSchema.from_dict({"qs": "$query_string"})
+    schema.validate()
+    values = [schema._generate_record()["qs"]] + schema._generate_columns(20)["qs"]
+    pattern = (
+        r"v=2&cid=\d{9}\.\d{13}&sid=\d{10}&sct=\d+&seg=[01]&_et=\d+"
+        r"&en=(page_view|scroll|click|purchase|add_to_cart)&ep\.event_id=\d{13}\.\d"
+        r"&dt=(Home%20Page|Product%20Page|Checkout|About%20Us|Test%20Page%20Title)"
+        r"&ul=(en-us|de-de|fr-fr|es-es)&ur=US-[A-Z]{2}"
+    )
+    for value in values:
+        assert re.fullmatch(pattern, value)
@@ -1,18 +1,24 @@
+import asyncio
+import csv
 import json
 import os
 
 import pytest
 import requests
+from pydantic import ValidationError
 
+import glassgen.sinks.kafka_sink as kafka_sink_module
 from glassgen.schema import ConfigSchema
 from glassgen.sinks import (
     BaseSink,
     CSVSink,
+    KafkaSink,
     NDJSONSink,
     SinkFactory,
     WebHookSink,
     YieldSink,
 )
+from glassgen.sinks.serializers import available_serializers, get_serializer
 
 
 def test_yield_sink():
@@ -32,6 +38,32 @@ def test_yield_sink():
     assert events == more_data
 
 
+def test_yield_sink_batch_modes():
+    """Test that batch and columns mode yield whole batches"""
+    records = [{"id": 1, "user": {"name": "a"}}, {"id": 2, "user": {"name": "b"}}]
+
+    sink = YieldSink({"mode": "batch"})
+    assert list(sink.publish_bulk(records)) == [records]
+    assert list(sink.publish_columns({"id": [1]})) == [[{"id": 1}]]
+
+    sink = YieldSink({"mode": "columns"})
+    assert sink.supports_columns
+    columns = {"id": [1, 2], "user": {"name": ["a", "b"]}}
+    assert list(sink.publish_bulk(records)) == [columns]
+
+    with pytest.raises(ValidationError):
+        YieldSink({"mode": "rows"})
+
+
+def test_yield_sink_reuses_buffers():
+    sink = YieldSink({"mode": "columns", "reuse_buffers": True})
+    (first,) = sink.publish_columns({"id": [1, 2], "user": {"name": ["a", "b"]}})
+    name_column = first["user"]["name"]
+    (second,) = sink.publish_columns({"id": [3], "user": {"name": ["c"]}})
+    assert second is first and second["user"]["name"] is name_column
+    assert second == {"id": [3], "user": {"name": ["c"]}}
+
+
 def test_csv_sink_publish(temp_csv_file):
     """Test the CSV sink publish method"""
     sink = CSVSink({"path": temp_csv_file})
@@ -73,6 +105,78 @@ def test_csv_sink_bulk_publish(temp_csv_file):
     os.unlink(temp_csv_file)
 
 
+def test_csv_sink_publish_columns(temp_csv_file):
+    """Test that the CSV sink writes columnar batches in schema order"""
+    sink = CSVSink({"path": temp_csv_file})
+    columns = {"name": ["Alice", "Bob"], "address": {"city": ["Paris", "Rome"]}}
+    sink.publish_columns(columns)
+    sink.publish_columns({"name": ["Carol"], "address": {"city": ["Oslo"]}})
+    sink.close()
+
+    with open(temp_csv_file, "r") as f:
+        lines = f.read().splitlines()
+    assert lines == ["name,address_city", "Alice,Paris", "Bob,Rome", "Carol,Oslo"]
+
+    os.unlink(temp_csv_file)
+
+
+def test_csv_sink_records_with_missing_fields(temp_csv_file):
+    """Test that columns a record lacks are written empty"""
+    sink = CSVSink({"path": temp_csv_file})
+    sink.publish_bulk([{"a": 1, "b": 2}, {"a": 3}])
+    sink.publish({"b": 4})
+    sink.publish_bulk([{"a": 5, "b": {"c": 6}}])
+    sink.close()
+
+    with open(temp_csv_file, "r") as f:
+        lines = f.read().splitlines()
+    assert lines == ["a,b", "1,2", "3,", ",4", "5,{'c': 6}"]
+
+    nested_file = temp_csv_file + ".nested"
+    sink = CSVSink({"path": nested_file})
+    sink.publish_bulk([{"id": 1, "user": {"name": "Ann"}}, {"id": 2, "user": {}}])
+    sink.publish({"id": 3})
+    sink.close()
+    with open(nested_file, "r") as f:
+        assert f.read().splitlines() == ["id,user_name", "1,Ann", "2,", "3,"]
+
+    os.unlink(temp_csv_file)
+    os.unlink(nested_file)
+
+
+def test_csv_sink_header_from_schema(temp_csv_file):
+    """Test that the CSV header follows the schema, nested keys joined by _"""
+    schema = ConfigSchema.from_dict(
+        {"id": "$sequence", "user": {"name": "$name", "address": {"city": "$city"}}}
+    )
+    sink = CSVSink({"path": temp_csv_file})
+    sink.set_schema(schema)
+    records = [schema._generate_record() for _ in range(3)]
+    sink.publish_bulk(records[:2])
+    sink.publish(records[2])
+    sink.close()
+
+    with open(temp_csv_file, "r", newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["id", "user_name", "user_address_city"]
+    assert rows[3] == [
+        "3",
+        records[2]["user"]["name"],
+        records[2]["user"]["address"]["city"],
+    ]
+
+    os.unlink(temp_csv_file)
+
+
+def test_base_sink_publish_columns_falls_back_to_records():
+    """Test that sinks without native column support receive records"""
+    sink = NDJSONSink({"path": "unused.ndjson"})
+    published = []
+    sink.publish_bulk = published.extend
+    sink.publish_columns({"a": [1, 2], "b": {"c": ["x", "y"]}})
+    assert published == [{"a": 1, "b": {"c": "x"}}, {"a": 2, "b": {"c": "y"}}]
+
+
 def test_ndjson_sink_publish(temp_ndjson_file):
     """Test the NDJSON sink publish method"""
     sink = NDJSONSink({"path": temp_ndjson_file})
@@ -220,12 +324,15 @@ def test_webhook_sink(mock_webhook, webhook_sink_config):
     sink.publish(data)
 
     # Verify the request was made correctly
-    mock_webhook.assert_called_once_with(
-        "https://example.com/webhook",
-        json=data,
-        headers={"Authorization": "Bearer token", "Content-Type": "application/json"},
-        timeout=30,
-    )
+    mock_webhook.assert_called_once()
+    args, kwargs = mock_webhook.call_args
+    assert args == ("https://example.com/webhook",)
+    assert json.loads(kwargs["data"]) == data
+    assert kwargs["headers"] == {
+        "Authorization": "Bearer token",
+        "Content-Type": "application/json",
+    }
+    assert kwargs["timeout"] == 30
 
     # Test bulk publish
     more_data = [{"name": "Alice", "age": 25}, {"name": "Bob", "age": 35}]
@@ -246,3 +353,280 @@ def test_webhook_sink_error_handling(mock_webhook, webhook_sink_config):
     with pytest.raises(Exception) as exc_info:
         sink.publish({"test": "data"})
     assert "Failed to publish to webhook" in str(exc_info.value)
+
+
+@pytest.mark.parametrize("name", ["auto"] + available_serializers())
+def test_serializers_encode_batches(name):
+    from datetime import datetime
+
+    serializer = get_serializer(name)
+    records = [{"name": "Zoë", "nested": {"n": 1}}, {"at": datetime(2024, 1, 2)}]
+    assert json.loads(serializer.dumps(records[0])) == records[0]
+    assert [json.loads(v) for v in serializer.dumps_batch(records)] == [
+        records[0],
+        {"at": "2024-01-02T00:00:00"},
+    ]
+    lines = serializer.dumps_lines(records).decode("utf-8").splitlines()
+    assert json.loads(lines[0]) == records[0]
+    assert len(lines) == 2
+    assert serializer.dumps_lines([]) == b""
+
+
+def test_default_serializer_matches_json_dumps(tmp_path):
+    """Test that the default NDJSON output is unchanged json.dumps lines"""
+    path = tmp_path / "out.ndjson"
+    records = [{"id": 1, "name": "Zoë", "tags": ["a", "b"]}]
+    sink = NDJSONSink({"path": str(path)})
+    sink.publish_bulk(records)
+    sink.close()
+    assert path.read_text() == json.dumps(records[0]) + "\n"
+
+
+def test_unknown_serializer():
+    with pytest.raises(ValueError, match="Unknown serializer"):
+        get_serializer("yaml")
+    with pytest.raises(ValueError, match="Unknown serializer"):
+        NDJSONSink({"path": "out.ndjson", "serializer": "yaml"})
+
+
+@pytest.fixture
+def webhook_server():
+    """Local HTTP server recording request bodies; answers 503 to the first
+    ``fail_first`` requests"""
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    state = {"bodies": [], "content_types": [], "fail_first": 0, "requests": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            with lock:
+                state["requests"] += 1
+                failed = state["requests"] <= state["fail_first"]
+                if not failed:
+                    state["bodies"].append(body)
+                    state["content_types"].append(self.headers["Content-Type"])
+            self.send_response(503 if failed else 200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    state["url"] = "http://127.0.0.1:%d/" % server.server_address[1]
+    yield state
+    server.shutdown()
+    server.server_close()
+
+
+def test_webhook_sink_concurrent_batches(webhook_server):
+    """Test batched JSON array bodies sent over a concurrent pooled session"""
+    sink = WebHookSink(
+        {"url": webhook_server["url"], "concurrency": 4, "batch_size": 10}
+    )
+    records = [{"id": i} for i in range(95)]
+    sink.publish_bulk(records)
+    sink.close()
+
+    batches = [json.loads(body) for body in webhook_server["bodies"]]
+    assert sorted(len(batch) for batch in batches) == [5] + [10] * 9
+    assert sorted(r["id"] for batch in batches for r in batch) == list(range(95))
+    assert sink.stats() == {"requests_sent": 10}
+
+
+def test_webhook_sink_ndjson_batches_and_retries(webhook_server):
+    """Test NDJSON bodies and that 503 responses are retried"""
+    webhook_server["fail_first"] = 2
+    sink = WebHookSink(
+        {
+            "url": webhook_server["url"],
+            "batch_size": 3,
+            "batch_format": "ndjson",
+            "backoff_factor": 0,
+        }
+    )
+    sink.publish_bulk([{"id": i} for i in range(3)])
+    sink.close()
+
+    assert webhook_server["requests"] == 3
+    [body] = webhook_server["bodies"]
+    assert [json.loads(line) for line in body.splitlines()] == [
+        {"id": 0},
+        {"id": 1},
+        {"id": 2},
+    ]
+    assert webhook_server["content_types"] == ["application/x-ndjson"]
+
+
+def test_webhook_sink_gives_up_after_retries(webhook_server):
+    """Test that a request still failing after the retries raises"""
+    webhook_server["fail_first"] = 10
+    sink = WebHookSink(
+        {"url": webhook_server["url"], "retries": 1, "backoff_factor": 0}
+    )
+    with pytest.raises(Exception, match="Failed to publish to webhook"):
+        sink.publish({"id": 1})
+    assert webhook_server["requests"] == 2
+
+
+class FakeProducer:
+    """Producer stand-in: queues messages, raises BufferError when full and
+    reports delivery (failing messages whose value contains 'fail') on poll"""
+
+    def __init__(self, config, queue_size=3):
+        self.config = config
+        self.queue_size = queue_size
+        self.queue = []
+        self.produced = []
+        self.flushes = 0
+        self.buffer_errors = 0
+
+    def produce(self, topic, value=None, callback=None):
+        if len(self.queue) >= self.queue_size:
+            self.buffer_errors += 1
+            raise BufferError("Local: Queue full")
+        self.queue.append((value, callback))
+        self.produced.append(value)
+
+    def poll(self, timeout=None):
+        served = len(self.queue)
+        for value, callback in self.queue:
+            callback("Broker: rejected" if b"fail" in value else None, None)
+        self.queue = []
+        return served
+
+    def flush(self, timeout=None):
+        self.flushes += 1
+        self.poll()
+        return 0
+
+
+@pytest.fixture
+def fake_producer(monkeypatch):
+    monkeypatch.setattr(kafka_sink_module, "Producer", FakeProducer)
+
+
+def test_kafka_sink_streams_without_flushing(fake_producer, kafka_sink_config):
+    """Test that the default delivery mode polls instead of flushing per batch"""
+    sink = KafkaSink(kafka_sink_config)
+    assert "delivery" not in sink.producer.config
+    records = [{"id": i} for i in range(10)]
+    sink.publish_bulk(records)
+    sink.publish_bulk(records)
+    # Queue-full errors were absorbed by polling, nothing was flushed
+    assert sink.producer.buffer_errors > 0
+    assert len(sink.producer.produced) == 20
+    assert sink.producer.flushes == 0
+
+    sink.close()
+    assert sink.producer.flushes == 1
+    assert sink.stats()["delivery"] == {
+        "delivered": 20,
+        "failed": 0,
+        "undelivered": 0,
+        "errors": {},
+    }
+
+
+def test_kafka_sink_batch_delivery_and_errors(fake_producer, kafka_sink_config):
+    """Test that batch delivery flushes every batch and counts failed messages"""
+    sink = KafkaSink({**kafka_sink_config, "delivery": "batch"})
+    sink.publish_bulk([{"id": 1}, {"id": "fail"}])
+    assert sink.producer.flushes == 1
+    sink.publish_bulk([{"id": "fail"}])
+    sink.close()
+    delivery = sink.stats()["delivery"]
+    assert delivery["delivered"] == 1
+    assert delivery["failed"] == 2
+    assert delivery["errors"] == {"Broker: rejected": 2}
+
+
+def test_kafka_sink_message_bytes(fake_producer, kafka_sink_config):
+    """Test that strings are sent as-is and records as json.dumps output"""
+    sink = KafkaSink(kafka_sink_config)
+    sink.publish_bulk([{"id": 1, "name": "Zoë"}, "raw message"])
+    assert sink.producer.produced == [
+        json.dumps({"id": 1, "name": "Zoë"}).encode("utf-8"),
+        b"raw message",
+    ]
+
+
+def test_kafka_sink_async_publish(fake_producer, kafka_sink_config):
+    """Test that a full queue is drained without blocking the event loop"""
+    sink = KafkaSink({**kafka_sink_config, "delivery": "batch"})
+
+    async def main():
+        await sink.apublish_bulk([{"id": i} for i in range(10)])
+        await sink.aclose()
+
+    asyncio.run(main())
+    assert sink.producer.buffer_errors > 0
+    assert len(sink.producer.produced) == 10
+    assert sink.stats()["delivery"]["delivered"] == 10
+
+
+def _decompress(path, compression):
+    import bz2
+    import gzip
+
+    with open(path, "rb") as f:
+        data = f.read()
+    if compression == "gzip":
+        return gzip.decompress(data)
+    if compression == "bz2":
+        return bz2.decompress(data)
+    if compression == "zstd":
+        zstandard = pytest.importorskip("zstandard")
+        return zstandard.ZstdDecompressor().stream_reader(data).read()
+    lz4_frame = pytest.importorskip("lz4.frame")
+    with lz4_frame.open(path, "rb") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("compression", ["gzip", "bz2", "zstd", "lz4"])
+@pytest.mark.parametrize("threads", [1, 2])
+def test_compressed_file_sinks(tmp_path, compression, threads):
+    """Test CSV and NDJSON output with every codec, single and multi-threaded"""
+    module = {"zstd": "zstandard", "lz4": "lz4"}.get(compression)
+    if module:
+        pytest.importorskip(module)
+    records = [{"id": i, "user": {"name": f"n{i}"}} for i in range(50)]
+    params = {"compression": compression, "compression_threads": threads}
+
+    csv_path = tmp_path / "out.csv.z"
+    sink = CSVSink({"path": str(csv_path), **params})
+    sink.publish_bulk(records)
+    sink.close()
+    lines = _decompress(csv_path, compression).decode().splitlines()
+    assert lines[0] == "id,user_name"
+    assert lines[-1] == "49,n49"
+
+    ndjson_path = tmp_path / "out.ndjson.z"
+    sink = NDJSONSink({"path": str(ndjson_path), **params})
+    sink.publish_bulk(records)
+    sink.close()
+    lines = _decompress(ndjson_path, compression).decode().splitlines()
+    assert [json.loads(line) for line in lines] == records
+
+
+def test_block_compress_writer_keeps_block_order(tmp_path):
+    """Test that blocks compressed in parallel are written in order"""
+    import gzip
+
+    from glassgen.sinks.compression import BlockCompressWriter
+
+    path = tmp_path / "out.gz"
+    writer = BlockCompressWriter(open(path, "wb"), gzip.compress, 4, block_size=10)
+    data = b"".join(b"%05d\n" % i for i in range(1000))
+    for i in range(0, len(data), 7):
+        writer.write(data[i : i + 7])
+    writer.close()
+    with gzip.open(path, "rb") as f:
+        assert f.read() == data